@@ -0,0 +1 @@
+"""Benchmarks for the O3C capture and render paths, run against the emulator."""
@@ -0,0 +1,97 @@
+"""Capture path benchmark for both viewers against the emulated O3C.
+
+Runs ``HIDListener.read_frame_buffer_optimized`` from ``main_opengl.py`` and
+``main_tkinter.py`` in a loop without creating any window, and reports
+frames/s, p50/p99 frame latency and CPU time per frame. ``--telemetry``
+runs every case a second time with stage telemetry on, to show its cost.
+
+    python -m benchmarks.bench_capture --duration 5 --latency 1 --jitter 0.5
+"""
+import argparse
+import importlib
+import time
+
+from benchmarks.common import Measurement, add_emulator_arguments, emulator_from_args, print_table
+import o3c_listener
+
+VIEWERS = ("main_opengl", "main_tkinter")
+COLUMNS = ('name', 'frames', 'fps', 'p50_ms', 'p99_ms', 'cpu_ms_per_frame', 'wait_ms_per_frame', 'busy_pct')
+
+
+def create_listener(module, window=0, blocking=False, telemetry=False):
+    """Create a viewer's ``HIDListener`` without touching the display."""
+    # The window is only created by ``start``, the request packets are all that is needed to capture
+    listener = module.HIDListener(fps_limit=0, pipeline_window=window, blocking_reads=blocking, telemetry=telemetry)
+    listener.prepare_packets()
+    return listener
+
+
+def take_frame(listener):
+    """Take the newest published frame like the renderer does, returning whether there was one."""
+    slot = listener.frame_ring.acquire_latest(listener.frame_sequence)
+    if slot is None:
+        return False
+    listener.frame_sequence = slot.sequence
+    listener.frame_ring.release(slot)
+    return True
+
+
+def bench_viewer(name, emulator, duration, window=0, blocking=False, telemetry=False):
+    """Capture frames from the emulator with one viewer for ``duration`` seconds."""
+    module = importlib.import_module(name)
+    o3c_listener.hid = emulator
+
+    listener = create_listener(module, window, blocking, telemetry)
+    if not listener.find_and_open_device():
+        raise SystemExit(f"{name}: could not open the emulated device")
+
+    try:
+        # Warm up caches and the emulator's frame renderer
+        listener.read_frame_buffer_optimized()
+        take_frame(listener)
+        reader = listener.frame_reader
+        wait_time, work_time = reader.wait_time, reader.work_time
+
+        label = f"{name} ({'blocking' if blocking else 'poll'}, window {window}{', telemetry' if telemetry else ''})"
+        with Measurement(label) as measurement:
+            end = time.perf_counter() + duration
+            while time.perf_counter() < end:
+                start = time.perf_counter()
+                listener.read_frame_buffer_optimized()
+                latency = time.perf_counter() - start
+                if take_frame(listener):
+                    measurement.add_frame(latency)
+    finally:
+        listener.device.close()
+
+    row = measurement.row()
+    wait_time, work_time = reader.wait_time - wait_time, reader.work_time - work_time
+    row['wait_ms_per_frame'] = wait_time / max(measurement.frames, 1) * 1000
+    row['busy_pct'] = work_time / (wait_time + work_time) * 100 if wait_time + work_time else 0.0
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per viewer (default: 3)")
+    parser.add_argument("--viewer", choices=VIEWERS, action="append", help="only run the given viewer(s)")
+    parser.add_argument("--window", type=int, action="append",
+                        help="pipeline window(s) to compare, 0 is lockstep (default: 0)")
+    parser.add_argument("--mode", choices=("poll", "blocking"), action="append",
+                        help="read mode(s) to compare (default: poll)")
+    parser.add_argument("--telemetry", action="store_true", help="also run every case with stage telemetry on")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    rows = []
+    for name in args.viewer or VIEWERS:
+        for window in args.window or [0]:
+            for mode in args.mode or ["poll"]:
+                for telemetry in (False, True) if args.telemetry else (False,):
+                    rows.append(bench_viewer(name, emulator_from_args(args), args.duration, window,
+                                             mode == "blocking", telemetry))
+    print_table(rows, columns=COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Microbenchmark of RGB565 color conversion.
+
+Compares the per-channel lookups the viewers used (shift, mask and a 32 or
+64 entry table per channel) with ``o3c_color.ColorConverter``'s single
+gather through a 65,536-entry table, one frame at a time and in batches as
+when converting a recording, for every output format.
+
+    python -m benchmarks.bench_color --repeat 2000 --batch 256
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import print_table
+from o3c_color import FORMATS, ColorConverter
+from o3c_emulator import render_scene
+
+
+class ChannelLookups:
+    """The three lookups per frame ``o3c_gl.Renderer.convert_frame`` did before ``o3c_color``."""
+
+    def __init__(self, width=160, height=80):
+        self.index = np.zeros((height, width), dtype=np.uint16)
+        self.r_lut = np.array([(i << 3) | (i >> 2) for i in range(32)], dtype=np.uint8)
+        self.g_lut = np.array([(i << 2) | (i >> 4) for i in range(64)], dtype=np.uint8)
+
+    def convert(self, frame, out):
+        index = self.index
+        np.right_shift(frame, 11, out=index)
+        np.take(self.r_lut, index, out=out[:, :, 0], mode='clip')
+        np.right_shift(frame, 5, out=index)
+        np.bitwise_and(index, 0x3F, out=index)
+        np.take(self.g_lut, index, out=out[:, :, 1], mode='clip')
+        np.bitwise_and(frame, 0x1F, out=index)
+        np.take(self.r_lut, index, out=out[:, :, 2], mode='clip')
+        return out
+
+
+def bench(name, pixel_format, convert, frames, out, repeat, batch=1):
+    """Time ``convert(frames, out)`` ``repeat`` times, per frame."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        convert(frames, out)
+    elapsed = (time.perf_counter() - start) / (repeat * batch)
+    return {'name': name, 'format': pixel_format, 'batch': batch, 'us_per_frame': elapsed * 1e6,
+            'frames_per_s': 1 / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=1000, help="frames to convert per case (default: 1000)")
+    parser.add_argument("--batch", type=int, default=64, help="frames per batched conversion (default: 64)")
+    parser.add_argument("--format", choices=FORMATS, action="append", help="only the given format(s)")
+    args = parser.parse_args()
+
+    frames = np.stack([render_scene("bars", index, 160, 80) for index in range(args.batch)])
+    frame = frames[0]
+
+    channels = ChannelLookups()
+    legacy = channels.convert(frame, np.zeros((80, 160, 3), dtype=np.uint8))
+    if not np.array_equal(legacy, ColorConverter("rgb24").convert(frame)):
+        raise SystemExit("ColorConverter does not match the per-channel lookups")
+
+    rows = [bench("per-channel lookups", "rgb24", channels.convert, frame, legacy, args.repeat)]
+    for pixel_format in args.format or FORMATS:
+        converter = ColorConverter(pixel_format)
+        out = converter.empty(frame.shape)
+        batch_out = converter.empty(frames.shape)
+        rows.append(bench("64K table", pixel_format, converter.convert, frame, out, args.repeat))
+        rows.append(bench("64K table, batched", pixel_format, converter.convert, frames, batch_out,
+                          max(1, args.repeat // args.batch), args.batch))
+
+    print_table(rows, columns=('name', 'format', 'batch', 'us_per_frame', 'frames_per_s'))
+    table = next((row for row in rows[1:] if row['format'] == "rgb24"), None)
+    if table is not None:
+        print(f"rgb24 speedup: {rows[0]['us_per_frame'] / table['us_per_frame']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Microbenchmark of response report decoding.
+
+Compares the original per-pixel Python loop with ``o3c_protocol.decode_report``
+on a full frame worth of emulated responses, as hidapi hands them over
+(lists of ints).
+
+    python -m benchmarks.bench_decode --repeat 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import print_table
+from o3c_emulator import O3CEmulator
+from o3c_protocol import CHUNK_SIZE, decode_report
+
+
+def legacy_decode(response, frame):
+    """The per-pixel loop ``read_frame_buffer_optimized`` used before ``decode_report``."""
+    data_len = min(response[4] | (response[5] << 8), 0x3FC) - 8
+    if data_len <= 0:
+        return 0
+    pos = response[8] | (response[9] << 8) | (response[10] << 16) | (response[11] << 24)
+    pos = pos // 2
+    resp_offset = 0xC
+    for j in range(0, data_len, 2):
+        idx = pos + j//2
+        if idx < frame.size:
+            frame[idx] = response[resp_offset + j] | (response[resp_offset + j + 1] << 8)
+    return data_len // 2
+
+
+def frame_responses(width=160, height=80):
+    """One frame of emulated responses as lists of ints."""
+    emulator = O3CEmulator(scene="bars", width=width, height=height)
+    device = emulator.device()
+    device.open(emulator.vendor_id, emulator.product_id)
+    total = width * height * 2
+    return [list(device.build_response(offset)) for offset in range(0, total, CHUNK_SIZE)]
+
+
+def bench(name, decode, responses, frame, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for response in responses:
+            decode(response, frame)
+    elapsed = (time.perf_counter() - start) / repeat
+    return {'name': name, 'us_per_frame': elapsed * 1e6, 'frames_per_s': 1 / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100, help="frames to decode per variant (default: 100)")
+    args = parser.parse_args()
+
+    responses = frame_responses()
+    legacy_frame = np.zeros(160 * 80, dtype=np.uint16)
+    frame = np.zeros(160 * 80, dtype=np.uint16)
+
+    rows = [
+        bench("per-pixel loop", legacy_decode, responses, legacy_frame, args.repeat),
+        bench("decode_report", decode_report, responses, frame, args.repeat),
+    ]
+    if not np.array_equal(legacy_frame, frame):
+        raise SystemExit("decode_report does not match the per-pixel loop")
+
+    print_table(rows, columns=('name', 'us_per_frame', 'frames_per_s'))
+    print(f"speedup: {rows[0]['us_per_frame'] / rows[1]['us_per_frame']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
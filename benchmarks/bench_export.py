@@ -0,0 +1,124 @@
+"""Background frame export: what it costs the capture and what reaches the file.
+
+Reads the emulated O3C as fast as it answers while a ``FrameExporter``
+samples the frame ring at ``--fps`` and encodes on its worker threads.
+Reports the capture rate kept, the frames exported, merged as repeats and
+dropped for a full queue, the peak backlog and how long ``close`` waited
+for the encoders. ``no export`` is the capture alone, and ``png, inline``
+encodes every sampled frame on the capture thread, as a viewer doing it in
+its redraw would.
+
+    python -m benchmarks.bench_export --duration 5 --fps 60
+    python -m benchmarks.bench_export --fps 240 --screen-fps 240 --backlog 4
+"""
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from PIL import Image
+
+from benchmarks.common import add_emulator_arguments, emulator_from_args, percentile, print_table
+from o3c_capture import FrameReader, FrameRing, open_device
+from o3c_color import ColorConverter
+from o3c_export import FrameExporter
+from o3c_protocol import CHUNK_SIZE, get_request_plan
+
+COLUMNS = ('name', 'workers', 'capture_fps', 'p99_gap_ms', 'max_gap_ms', 'exported', 'merged', 'dropped', 'peak_backlog', 'close_s')
+
+
+def new_ring():
+    plan = get_request_plan(160, 80, CHUNK_SIZE)
+    return FrameRing(plan, FrameReader.ring_slots(plan, 26))
+
+
+def capture(ring, args, inline=None):
+    """Read the emulated device into ``ring`` for the duration, returning frames/s and the gaps between frames."""
+    hid = emulator_from_args(args)
+    device = open_device(hid, 0x8089, 0x0009, 0xFF12, False)
+    reader = FrameReader(device, ring, window=26)
+    try:
+        start = last = time.perf_counter()
+        next_sample = start
+        gaps = []
+        while (now := time.perf_counter()) - start < args.duration:
+            slot = reader.read_frame()
+            if slot is None:
+                continue
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+            if inline is not None and now >= next_sample:
+                inline(slot.frame)
+                next_sample += 1 / args.fps
+        return {
+            'capture_fps': reader.frames / (time.perf_counter() - start),
+            'p99_gap_ms': percentile(gaps, 99) * 1000,
+            'max_gap_ms': max(gaps) * 1000,
+        }
+    finally:
+        device.close()
+
+
+def bench_export(name, path, args, workers):
+    ring = new_ring()
+    exporter = FrameExporter(path, 160, 80, args.fps, workers, args.backlog)
+    exporter.follow(ring)
+    captured = capture(ring, args)
+    start = time.perf_counter()
+    exporter.close()
+    if exporter.error is not None:
+        raise SystemExit(f"{name}: {exporter.error}")
+    return {
+        'name': name,
+        'workers': len(exporter.workers),
+        **captured,
+        'exported': exporter.frames_written,
+        'merged': exporter.frames_merged,
+        'dropped': exporter.frames_dropped,
+        'peak_backlog': exporter.max_backlog,
+        'close_s': time.perf_counter() - start,
+    }
+
+
+def bench_capture(name, args, inline=None):
+    return {'name': name, 'workers': 0, **capture(new_ring(), args, inline), 'exported': "-", 'merged': "-",
+            'dropped': "-", 'peak_backlog': "-", 'close_s': 0.0}
+
+
+def encode_png(frame):
+    """Encode a frame as a PNG in memory, as the workers of a PNG export do."""
+    Image.fromarray(ColorConverter("rgb24").convert(frame)).save(io.BytesIO(), format="png", compress_level=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds of capture per case (default: 3)")
+    parser.add_argument("--fps", type=float, default=30, help="export sampling rate (default: 30)")
+    parser.add_argument("--backlog", type=int, default=32, help="frames queued for the encoders (default: 32)")
+    parser.add_argument("--workers", type=int, action="append", help="encoder threads to try (default: 1 and 2)")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    outputs = [("png", "frames/%06d.png"), ("gif", "clip.gif"), ("webp", "clip.webp")]
+    if shutil.which("ffmpeg"):
+        outputs.append(("ffmpeg", "clip.mp4"))
+    else:
+        print("ffmpeg not found, skipping the video export")
+
+    rows = [bench_capture("no export", args), bench_capture("png, inline", args, encode_png)]
+    with tempfile.TemporaryDirectory() as directory:
+        for name, output in outputs:
+            for workers in args.workers or (1, 2):
+                os.mkdir(os.path.join(directory, f"{name}-{workers}"))
+                rows.append(bench_export(name, os.path.join(directory, f"{name}-{workers}", output), args, workers))
+    print_table(rows, columns=COLUMNS)
+    print("capture_fps: frames read from the emulated device per second while exporting; "
+          "p99/max_gap_ms: time between two frames read")
+    print("close_s: time close() waited for the encoders after the capture stopped")
+
+
+if __name__ == "__main__":
+    main()
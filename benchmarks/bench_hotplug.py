@@ -0,0 +1,90 @@
+"""Unplugging the emulated O3C mid-stream and plugging it back in.
+
+Captures with ``main_opengl``'s reader loop, pulls the device out for a
+while and reports how long after it came back frames flowed again, how many
+attempts that took, the CPU the reader used while the device was gone and
+whether the last good frame stayed available to the renderer.
+
+    python -m benchmarks.bench_hotplug --outage 0.2 --outage 1 --window 0 --window 26
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.common import add_emulator_arguments, emulator_from_args, print_table
+import main_opengl
+import o3c_listener
+
+COLUMNS = ('name', 'outage_s', 'recover_s', 'late_ms', 'attempts', 'outage_cpu_pct', 'last_frame', 'fps_after')
+
+
+def bench(outage, window, args):
+    """Capture, unplug for ``outage`` seconds and wait for the capture to come back."""
+    emulator = emulator_from_args(args)
+    o3c_listener.hid = emulator
+    listener = main_opengl.HIDListener(fps_limit=0, pipeline_window=window, capture_rate=args.capture_rate)
+    if not listener.find_and_open_device():
+        raise SystemExit("Could not open the emulated device")
+    listener.prepare_packets()
+    listener.running = True
+    reader = threading.Thread(target=listener.read_loop, daemon=True)
+    reader.start()
+    try:
+        time.sleep(0.3)
+        supervisor = listener.supervisor
+        before = listener.frame_ring.latest.sequence
+
+        cpu = time.process_time()
+        emulator.unplug(0, outage)
+        time.sleep(outage)
+        outage_cpu = (time.process_time() - cpu) / outage
+
+        # The renderer still gets the last frame captured before the device went away
+        slot = listener.frame_ring.acquire_latest()
+        last_frame = slot is not None and slot.sequence <= before + 1
+        if slot is not None:
+            listener.frame_ring.release(slot)
+
+        deadline = time.perf_counter() + supervisor.max_backoff + 2
+        while not supervisor.recover_times and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        frames = supervisor.frames
+        time.sleep(args.after)
+        fps_after = (supervisor.frames - frames) / args.after
+    finally:
+        listener.running = False
+        reader.join()
+        if listener.device:
+            listener.device.close()
+
+    recovered = supervisor.recover_times[0] if supervisor.recover_times else float("nan")
+    return {
+        'name': f"window {window}, {outage:g} s out",
+        'outage_s': outage,
+        'recover_s': recovered,
+        'late_ms': (recovered - outage) * 1000,  # From plugged back in to reading again
+        'attempts': supervisor.attempts,
+        'outage_cpu_pct': outage_cpu * 100,
+        'last_frame': "yes" if last_frame else "no",
+        'fps_after': fps_after,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--outage", type=float, action="append", help="seconds unplugged (default: 0.2, 1 and 3)")
+    parser.add_argument("--window", type=int, action="append", help="pipeline windows to compare (default: 0 and 26)")
+    parser.add_argument("--after", type=float, default=1.0, help="seconds measured after reconnecting (default: 1)")
+    parser.add_argument("--capture-rate", type=float, default=0, help="frames read per second, 0 is unlimited")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    rows = [bench(outage, window, args)
+            for window in args.window or (0, 26) for outage in args.outage or (0.2, 1.0, 3.0)]
+    print_table(rows, columns=COLUMNS)
+    print("late_ms: from plugging the device back in to reading from it again, bounded by the longest backoff")
+    print("outage_cpu_pct: CPU the whole process used while the device was unplugged")
+
+
+if __name__ == "__main__":
+    main()
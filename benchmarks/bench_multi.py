@@ -0,0 +1,133 @@
+"""Several O3Cs at once: one window with a texture atlas vs a window per device.
+
+Emulates 1, 2, 4 and 8 devices, captures each with its own worker and runs
+``HIDListener.update_devices`` in hidden windows for a while. Reports how
+often the screens were redrawn, the render cost of a redraw and the frames
+each device captured, then checks every screen against the CPU color
+conversion of its device's last frame.
+
+    xvfb-run -a env LIBGL_ALWAYS_SOFTWARE=1 python -m benchmarks.bench_multi
+    python -m benchmarks.bench_multi --devices 4 --layout atlas --scene ticker
+"""
+import argparse
+import time
+
+import glfw
+import numpy as np
+from OpenGL.GL import GL_RGB, GL_UNSIGNED_BYTE, glFinish, glReadPixels
+
+from benchmarks.bench_render import init_glfw
+from benchmarks.common import Measurement, add_emulator_arguments, emulator_from_args, print_table
+import main_opengl
+import o3c_listener
+
+LAYOUTS = ("atlas", "windows")
+COLUMNS = ('name', 'frames', 'fps', 'p50_ms', 'p99_ms', 'cpu_ms_per_frame', 'captured_fps_per_device', 'max_diff')
+
+
+def read_view(listener, window, renderer):
+    """Read back what a window shows, top row first, at frame resolution."""
+    scale = listener.display_scale
+    width, height = renderer.texture_size
+    glfw.make_context_current(window)
+    pixels = np.frombuffer(glReadPixels(0, 0, width * scale, height * scale, GL_RGB, GL_UNSIGNED_BYTE), dtype=np.uint8)
+    pixels = pixels.reshape(height * scale, width * scale, 3)[::-1]
+    return pixels[scale // 2::scale, scale // 2::scale]
+
+
+def check_screens(listener):
+    """Largest channel difference between every screen and the conversion of its device's last frame."""
+    for worker in listener.workers:
+        worker.stop()
+    # Draw the last frames again, all of them
+    listener.device_sequences = [-1] * len(listener.workers)
+    for changes in listener.device_changes:
+        changes.reset()
+    listener.next_redraw = 0.0
+    listener.update_devices()
+
+    difference = 0
+    screens = [read_view(listener, window, renderer) for window, renderer, _ in listener.views]
+    for index, worker in enumerate(listener.workers):
+        if listener.window_per_device:
+            renderer, screen = listener.views[index][1], screens[index]
+            x, y = 0, 0
+        else:
+            renderer, screen = listener.renderer, screens[0]
+            x, y = renderer.tile_origin(index)
+        slot = worker.acquire_latest()
+        expected = np.zeros((listener.height, listener.width, 3), dtype=np.uint8)
+        renderer.convert_frame(slot.frame, expected)
+        worker.release(slot)
+        tile = screen[y:y + listener.height, x:x + listener.width]
+        difference = max(difference, int(np.abs(tile.astype(int) - expected.astype(int)).max()))
+    return difference
+
+
+def bench(devices, layout, args):
+    """Render ``devices`` emulated O3Cs for ``args.duration`` seconds in one of the layouts."""
+    o3c_listener.hid = emulator_from_args(args, devices=devices)
+    listener = main_opengl.HIDListener(fps_limit=args.fps, pipeline_window=args.window,
+                                       capture_rate=args.capture_rate, renderer=args.renderer, window_per_device=(layout == "windows"),
+                                       all_devices=True)
+    if not listener.open_all_devices():
+        raise SystemExit("Could not open the emulated devices")
+
+    init_glfw(args.osmesa)
+    try:
+        if not listener.setup_opengl():
+            raise SystemExit("Failed to setup OpenGL")
+        # Let the capture settle before measuring
+        time.sleep(0.2)
+        captured = [worker.supervisor.frames for worker in listener.workers]
+
+        measurement = Measurement(f"{devices} devices, {layout}")
+        listener.display_scheduler = main_opengl.FrameScheduler(listener.fps_limit)
+        began = time.perf_counter()
+        while time.perf_counter() - began < args.duration:
+            start, cpu_start = time.perf_counter(), time.process_time()
+            if listener.update_devices():
+                for window, _, _ in listener.views:
+                    glfw.make_context_current(window)
+                    glFinish()
+                measurement.cpu += time.process_time() - cpu_start
+                measurement.add_frame(time.perf_counter() - start)
+            listener.display_scheduler.wait()
+        measurement.wall = time.perf_counter() - began
+        captured = [worker.supervisor.frames - before for worker, before in zip(listener.workers, captured)]
+        difference = check_screens(listener)
+    finally:
+        listener.close_source()
+        for window, _, _ in listener.views:
+            glfw.destroy_window(window)
+        glfw.terminate()
+
+    row = measurement.row()
+    row['captured_fps_per_device'] = sum(captured) / devices / measurement.wall
+    row['max_diff'] = difference
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per run (default: 3)")
+    parser.add_argument("--devices", type=int, action="append", help="devices to compare (default: 1, 2, 4 and 8)")
+    parser.add_argument("--layout", choices=LAYOUTS, action="append", help="only run the given layout(s)")
+    parser.add_argument("--fps", type=int, default=60, help="display rate limit (default: 60)")
+    parser.add_argument("--window", type=int, default=26, help="pipeline window of each capture (default: 26)")
+    parser.add_argument("--capture-rate", type=float, default=30,
+                        help="frames read per second from each device, 0 is unlimited (default: 30)")
+    parser.add_argument("--renderer", choices=("auto", "shader", "legacy"), default="auto")
+    parser.add_argument("--osmesa", action="store_true", help="use GLFW's null platform with an OSMesa context")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    rows = [bench(devices, layout, args)
+            for devices in args.devices or (1, 2, 4, 8) for layout in args.layout or LAYOUTS]
+    print_table(rows, columns=COLUMNS)
+    print("fps: redraws per second; p50/p99_ms: time of a redraw, every window included")
+    print("max_diff: largest channel difference between a screen and the CPU conversion of its last frame")
+
+
+if __name__ == "__main__":
+    main()
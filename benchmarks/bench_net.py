@@ -0,0 +1,147 @@
+"""Frame server fan-out over loopback, with 1, 10 and 100 clients.
+
+Captures from the emulated O3C, serves the frames with ``o3c_net`` on
+127.0.0.1 and connects that many clients, which decode every frame and
+check it against the one the server took from the ring. Reports the
+frames/s each client got, capture-to-decoded latency, the share of frames
+dropped for busy clients and the total bandwidth.
+
+    python -m benchmarks.bench_net --clients 1 --clients 10 --clients 100 --scene ticker
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.common import add_emulator_arguments, emulator_from_args, percentile, print_table
+from o3c_net import ACK, HELLO, MAGIC, MESSAGE, FrameServer, open_connection
+from o3c_record import KEYFRAME, DeltaDecoder
+import main_opengl
+import o3c_listener
+
+COLUMNS = ('name', 'frames', 'fps_per_client', 'p50_ms', 'p99_ms', 'dropped_pct', 'keyframe_pct', 'mbit_s', 'wrong')
+
+
+class RecordingSource:
+    """Hands the ring's frames to the server and keeps a copy of each to check the clients against."""
+
+    def __init__(self, ring, history=256):
+        self.ring = ring
+        self.history = history
+        self.frames = {}
+
+    def acquire_latest(self, after=-1):
+        slot = self.ring.acquire_latest(after)
+        if slot is not None:
+            self.frames[slot.sequence] = slot.frame.copy()
+            self.frames.pop(slot.sequence - self.history, None)
+        return slot
+
+    def release(self, slot):
+        self.ring.release(slot)
+
+
+async def run_client(port, source, report):
+    """Receive and decode frames until cancelled."""
+    reader, writer = await open_connection("127.0.0.1", port)
+    try:
+        magic, width, height, tile = HELLO.unpack(await reader.readexactly(HELLO.size))
+        assert magic == MAGIC
+        decoder = DeltaDecoder(width, height, tile)
+        while True:
+            kind, length, sequence, captured = MESSAGE.unpack(await reader.readexactly(MESSAGE.size))
+            payload = await reader.readexactly(length)
+            decoder.apply(kind, payload)
+            writer.write(ACK.pack(sequence))
+            report['latencies'].append(time.time() - captured)
+            report['frames'] += 1
+            report['keyframes'] += kind == KEYFRAME
+            report['bytes'] += MESSAGE.size + length
+            expected = source.frames.get(sequence)
+            if expected is not None and not np.array_equal(decoder.frame, expected):
+                report['wrong'] += 1
+    finally:
+        writer.close()
+
+
+async def run_clients(count, port, source, duration):
+    reports = [{'frames': 0, 'keyframes': 0, 'bytes': 0, 'wrong': 0, 'latencies': []} for _ in range(count)]
+    tasks = [asyncio.create_task(run_client(port, source, report)) for report in reports]
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return reports
+
+
+def bench(clients, args):
+    o3c_listener.hid = emulator_from_args(args)
+    listener = main_opengl.HIDListener(fps_limit=0, pipeline_window=args.window, capture_rate=args.capture_rate)
+    if not listener.find_and_open_device():
+        raise SystemExit("Could not open the emulated device")
+    listener.prepare_packets()
+    listener.running = True
+    reader = threading.Thread(target=listener.read_loop, daemon=True)
+    reader.start()
+
+    source = RecordingSource(listener.frame_ring)
+    server = FrameServer(source, host="127.0.0.1", port=0)
+    started, stop = threading.Event(), threading.Event()
+
+    async def serve():
+        await server.start()
+        started.set()
+        try:
+            await server.run(stop)
+        finally:
+            await server.close()
+
+    server_thread = threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)
+    server_thread.start()
+    try:
+        started.wait()
+        wall = time.perf_counter()
+        reports = asyncio.run(run_clients(clients, server.port, source, args.duration))
+        wall = time.perf_counter() - wall
+    finally:
+        stop.set()
+        server_thread.join()
+        listener.running = False
+        reader.join()
+        listener.device.close()
+
+    received = sum(report['frames'] for report in reports)
+    latencies = [latency for report in reports for latency in report['latencies']]
+    offered = server.frames_sent + server.frames_dropped
+    return {
+        'name': f"{clients} clients",
+        'frames': server.frames,
+        'fps_per_client': received / clients / wall,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'dropped_pct': server.frames_dropped / offered * 100 if offered else 0.0,
+        'keyframe_pct': sum(report['keyframes'] for report in reports) / received * 100 if received else 0.0,
+        'mbit_s': sum(report['bytes'] for report in reports) * 8 / wall / 1e6,
+        'wrong': sum(report['wrong'] for report in reports),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per run (default: 3)")
+    parser.add_argument("--clients", type=int, action="append", help="clients to compare (default: 1, 10 and 100)")
+    parser.add_argument("--window", type=int, default=26, help="pipeline window of the capture (default: 26)")
+    parser.add_argument("--capture-rate", type=float, default=0, help="frames read per second, 0 is unlimited")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    rows = [bench(clients, args) for clients in args.clients or (1, 10, 100)]
+    print_table(rows, columns=COLUMNS)
+    print("frames: frames the server took from the ring, identical ones are not sent to clients that have them")
+    print("wrong: decoded frames that differ from the server's, must be 0")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Threaded vs separate process capture, with the OpenGL viewer rendering.
+
+Runs ``main_opengl``'s render loop in a hidden window for a while, once
+with the reader in a thread of the same interpreter and once with
+``HIDListener(capture_process=True)``, against the emulated O3C. Reports
+captured and displayed frames/s and the request-to-screen latency of the
+frames shown, as measured by the viewer's telemetry.
+
+    xvfb-run -a env LIBGL_ALWAYS_SOFTWARE=1 python -m benchmarks.bench_process --latency 1
+"""
+import argparse
+import functools
+import threading
+import time
+
+import glfw
+
+from benchmarks.bench_render import init_glfw
+from benchmarks.common import add_emulator_arguments, emulator_from_args, emulator_options, print_table
+from o3c_emulator import O3CEmulator
+import main_opengl
+import o3c_listener
+
+MODES = ("thread", "process")
+COLUMNS = ('name', 'captured_fps', 'displayed_fps', 'p50_latency_ms', 'p99_latency_ms', 'missed', 'torn')
+
+
+def bench_mode(mode, args):
+    """Render for ``args.duration`` seconds with the capture in a thread or a process."""
+    o3c_listener.hid = emulator_from_args(args)
+    listener = main_opengl.HIDListener(fps_limit=args.fps, pipeline_window=args.window, telemetry=True,
+                                       capture_process=(mode == "process"),
+                                       hid_factory=functools.partial(O3CEmulator, **emulator_options(args)))
+    if not (listener.start_capture_process() if mode == "process" else listener.find_and_open_device()):
+        raise SystemExit("Could not open the emulated device")
+    listener.running = True
+
+    init_glfw(args.osmesa)
+    try:
+        if mode == "thread":
+            listener.prepare_packets()
+        if not listener.setup_opengl():
+            raise SystemExit("Failed to setup OpenGL")
+
+        if mode == "thread":
+            reader = threading.Thread(target=listener.device_loop, daemon=True)
+            reader.start()
+        # Let the capture settle before measuring
+        time.sleep(0.2)
+        telemetry = listener.telemetry
+        captured = captured_frames(listener)
+        displayed = telemetry.displayed
+
+        listener.display_scheduler = main_opengl.FrameScheduler(listener.fps_limit)
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.duration:
+            if listener.capture is not None and not listener.capture.poll():
+                raise SystemExit(f"Capture process stopped: {listener.capture.error}")
+            listener.update_display()
+            listener.display_scheduler.wait()
+        wall = time.perf_counter() - start
+        captured = captured_frames(listener) - captured
+        displayed = telemetry.displayed - displayed
+    finally:
+        listener.running = False
+        if mode == "thread":
+            reader.join()
+            listener.device.close()
+        else:
+            listener.stop_capture_process()
+        glfw.destroy_window(listener.window)
+        glfw.terminate()
+
+    p50, _, p99 = telemetry.percentiles('latency')
+    return {
+        'name': mode,
+        'captured_fps': captured / wall,
+        'displayed_fps': displayed / wall,
+        'p50_latency_ms': p50,
+        'p99_latency_ms': p99,
+        'missed': listener.display_scheduler.missed,
+        'torn': listener.capture.torn_frames if listener.capture is not None else "-",
+    }
+
+
+def captured_frames(listener):
+    """Frames the reader published so far, wherever it runs."""
+    if listener.capture is not None:
+        return listener.capture.client.frames
+    return listener.frame_reader.frames if listener.frame_reader else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per mode (default: 3)")
+    parser.add_argument("--fps", type=int, default=0, help="display rate, 0 is the viewer's unlimited rate")
+    parser.add_argument("--window", type=int, default=26, help="pipeline window of the capture (default: 26)")
+    parser.add_argument("--mode", choices=MODES, action="append", help="only run the given mode(s)")
+    parser.add_argument("--osmesa", action="store_true", help="use GLFW's null platform with an OSMesa context")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    rows = [bench_mode(mode, args) for mode in args.mode or MODES]
+    print_table(rows, columns=COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
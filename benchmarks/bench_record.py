@@ -0,0 +1,115 @@
+"""Recorded session size, write cost and seek time.
+
+Records frames of the emulator's scenes with ``o3c_record`` and reports
+the file size against raw RGB565, the cost of ``write_frame`` per frame,
+and how long the player takes to step forward and to seek to a random
+frame. Every decoded frame is checked against the one recorded, also
+when two threads decode at once, each from its own ``fork`` of a player.
+
+    python -m benchmarks.bench_record --frames 1800 --keyframe-interval 300
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.common import percentile, print_table
+from o3c_emulator import render_scene
+from o3c_record import SessionPlayer, SessionRecorder
+
+SCENES = ("static", "ticker", "bars")
+COLUMNS = ('name', 'frames', 'keyframes', 'bytes_per_frame', 'ratio', 'write_ms', 'step_us', 'p50_seek_us',
+           'p99_seek_us')
+
+
+def check_threads(scene, player, frames, seed):
+    """Decode on two threads at once, one stepping and one seeking, each from a fork of ``player``."""
+    rng = random.Random(seed)
+    orders = [range(len(frames)), [rng.randrange(len(frames)) for _ in range(len(frames))]]
+    wrong = []
+
+    def decode(fork, order):
+        try:
+            wrong.extend(i for i in order if not np.array_equal(fork.frame_at(i), frames[i]))
+        finally:
+            fork.close()
+
+    threads = [threading.Thread(target=decode, args=(player.fork(), order)) for order in orders]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if wrong:
+        raise SystemExit(f"{scene}: {len(wrong)} frames decoded wrong by concurrent readers, the first {wrong[0]}")
+
+
+def bench_scene(scene, args, path):
+    # The emulated screen changes at 30 fps, as would a real one
+    frames = [render_scene(scene, i, 160, 80) for i in range(args.frames)]
+    recorder = SessionRecorder(path, 160, 80, tile=args.tile, keyframe_interval=args.keyframe_interval,
+                               level=args.level)
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        recorder.write_frame(frame, i / 30)
+    write = time.perf_counter() - start
+    recorder.close()
+
+    player = SessionPlayer(path)
+    try:
+        start = time.perf_counter()
+        for i in range(len(player)):
+            if not np.array_equal(player.frame_at(i), frames[i]):
+                raise SystemExit(f"{scene}: frame {i} decoded wrong")
+        step = time.perf_counter() - start
+        check_threads(scene, player, frames, args.seed)
+
+        seeks = []
+        rng = random.Random(args.seed)
+        for _ in range(args.seeks):
+            i = rng.randrange(len(player))
+            start = time.perf_counter()
+            frame = player.frame_at(i)
+            seeks.append(time.perf_counter() - start)
+            if not np.array_equal(frame, frames[i]):
+                raise SystemExit(f"{scene}: seek to frame {i} decoded wrong")
+    finally:
+        player.close()
+
+    size = os.path.getsize(path)
+    return {
+        'name': scene,
+        'frames': args.frames,
+        'keyframes': recorder.keyframe_count,
+        'bytes_per_frame': size / args.frames,
+        'ratio': args.frames * 160 * 80 * 2 / size,
+        'write_ms': write / args.frames * 1000,
+        'step_us': step / args.frames * 1e6,
+        'p50_seek_us': percentile(seeks, 50) * 1e6,
+        'p99_seek_us': percentile(seeks, 99) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=1800, help="frames per scene (default: 1800, a minute)")
+    parser.add_argument("--scene", choices=SCENES, action="append", help="only record the given scene(s)")
+    parser.add_argument("--tile", type=int, default=16, help="tile size of the deltas (default: 16)")
+    parser.add_argument("--keyframe-interval", type=int, default=300, help="frames between keyframes (default: 300)")
+    parser.add_argument("--level", type=int, default=1, help="zlib level (default: 1)")
+    parser.add_argument("--seeks", type=int, default=200, help="random seeks to time (default: 200)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.o3c")
+        rows = [bench_scene(scene, args, path) for scene in args.scene or SCENES]
+    print_table(rows, columns=COLUMNS)
+    print("ratio: raw RGB565 size / recording size")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Render path benchmark for main_opengl, headless on Mesa's software rasterizer.
+
+Feeds frames from the emulated O3C through ``HIDListener.update_display`` in a
+hidden GLFW window and reports the per-frame render cost of each renderer
+(shader/VBO/PBO and legacy immediate mode) with each texture upload path,
+checking the screen against the CPU color conversion. With change detection
+on, frames identical to the one on screen are skipped and changed ones only
+upload the rows that differ; ``skipped_pct`` is the share of frames skipped.
+
+    xvfb-run -a env LIBGL_ALWAYS_SOFTWARE=1 python -m benchmarks.bench_render
+    python -m benchmarks.bench_render --osmesa    # GLFW null platform, no X server
+    python -m benchmarks.bench_render --scene ticker --changes off --changes on
+"""
+import argparse
+import time
+
+import glfw
+import numpy as np
+from OpenGL.GL import GL_RGB, GL_UNSIGNED_BYTE, glFinish, glGetString, glReadPixels, GL_RENDERER
+
+from benchmarks.common import Measurement, add_emulator_arguments, emulator_from_args, print_table
+import main_opengl
+import o3c_listener
+
+RENDERERS = ("shader", "legacy")
+PATHS = ("packed", "lut")
+CHANGES = ("off", "on")
+
+
+def init_glfw(osmesa=False):
+    """Initialise GLFW for an invisible window, optionally without any window system."""
+    if osmesa:
+        glfw.init_hint(glfw.PLATFORM, glfw.PLATFORM_NULL)
+    if not glfw.init():
+        raise SystemExit("Failed to initialize GLFW")
+    glfw.window_hint(glfw.VISIBLE, glfw.FALSE)
+    if osmesa:
+        glfw.window_hint(glfw.CONTEXT_CREATION_API, glfw.OSMESA_CONTEXT_API)
+
+
+def read_screen(listener):
+    """Read back what the window shows, top row first, at frame resolution."""
+    scale = listener.display_scale
+    width, height = listener.width * scale, listener.height * scale
+    pixels = np.frombuffer(glReadPixels(0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE), dtype=np.uint8)
+    pixels = pixels.reshape(height, width, 3)[::-1]
+    return pixels[scale // 2::scale, scale // 2::scale]
+
+
+def bench_path(renderer_type, path, emulator, frames, osmesa=False, changes="on"):
+    """Render ``frames`` emulated frames with one renderer and upload path."""
+    o3c_listener.hid = emulator
+    listener = main_opengl.HIDListener(fps_limit=0, packed_upload=(path == "packed"), renderer=renderer_type,
+                                       skip_unchanged=(changes == "on"))
+    if not listener.find_and_open_device():
+        raise SystemExit("Could not open the emulated device")
+    listener.prepare_packets()
+
+    init_glfw(osmesa)
+    if not listener.setup_opengl():
+        raise SystemExit("Failed to setup OpenGL")
+    glfw.swap_interval(0)
+    renderer = listener.renderer
+    print(f"{renderer.name} renderer on {glGetString(GL_RENDERER).decode()}")
+    if path == "packed" and not renderer.use_packed_upload:
+        print("No packed RGB565 uploads, measuring the fallback")
+
+    measurement = Measurement(f"{renderer.name}, {path}, changes {changes}")
+    try:
+        for _ in range(frames):
+            # Capture is not part of the measured render cost
+            listener.read_frame_buffer_optimized()
+            start, cpu_start = time.perf_counter(), time.process_time()
+            listener.update_display()
+            glFinish()
+            measurement.wall += time.perf_counter() - start
+            measurement.cpu += time.process_time() - cpu_start
+            measurement.add_frame(time.perf_counter() - start)
+
+        # Compare what is on screen with the CPU conversion of the same frame
+        slot = listener.frame_ring.acquire_latest()
+        expected = np.zeros_like(renderer.texture_data)
+        renderer.convert_frame(slot.frame, expected)
+        listener.frame_ring.release(slot)
+        listener.frame_sequence = -1
+        listener.next_redraw = 0.0  # Draw even if the frame did not change
+        listener.update_display()
+        difference = np.abs(read_screen(listener).astype(int) - expected.astype(int)).max()
+    finally:
+        listener.device.close()
+        glfw.destroy_window(listener.window)
+        glfw.terminate()
+
+    row = measurement.row()
+    row['max_diff'] = int(difference)
+    row['skipped_pct'] = listener.changes.skip_ratio() * 100 if listener.changes else 0.0
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300, help="frames per upload path (default: 300)")
+    parser.add_argument("--osmesa", action="store_true", help="use GLFW's null platform with an OSMesa context")
+    parser.add_argument("--renderer", choices=RENDERERS, action="append", help="only run the given renderer(s)")
+    parser.add_argument("--changes", choices=CHANGES, action="append",
+                        help="with change detection off and/or on (default: on)")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    rows = []
+    for renderer_type in args.renderer or RENDERERS:
+        for path in PATHS:
+            for changes in args.changes or ("on",):
+                rows.append(bench_path(renderer_type, path, emulator_from_args(args), args.frames, args.osmesa,
+                                       changes))
+    print_table(rows, columns=('name', 'frames', 'fps', 'p50_ms', 'p99_ms', 'cpu_ms_per_frame', 'skipped_pct',
+                               'max_diff'))
+    # GL expands 5/6-bit channels by rounding where the LUT replicates bits, so a step of 1 is fine
+    print("max_diff: largest channel difference between the screen and the CPU conversion")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Shared memory frame ring benchmark with concurrent reader processes.
+
+A writer publishes frames into an ``o3c_shm`` ring while several
+``SharedFrameClient`` processes read the newest frame in place. Reports
+reads/s per reader, how old frames were when read and how often a reader
+caught the writer overwriting its slot.
+
+``synthetic`` publishes as fast as it can with every pixel set to the frame
+number, and each reader checks the pixels it saw: ``torn`` counts frames
+that passed the seqlock check with wrong pixels and must be 0.
+``emulator`` runs the OpenGL viewer's capture against the emulated O3C.
+
+    python -m benchmarks.bench_shm --readers 1 --readers 4 --duration 3
+"""
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from benchmarks.common import add_emulator_arguments, emulator_from_args, percentile, print_table
+from o3c_shm import SharedFrameClient, SharedFrameRing
+
+RING_NAME = "o3c_bench_frames"
+COLUMNS = ('name', 'readers', 'written', 'write_fps', 'reads_per_s', 'p50_age_ms', 'p99_age_ms', 'retries', 'torn')
+
+
+def reader_process(name, duration, check, ready, start, results):
+    """Read the newest frame until ``duration`` runs out, then report."""
+    client = SharedFrameClient(name)
+    ready.set()
+    start.wait()
+
+    reads = retries = torn = 0
+    ages = []
+    last = -1
+    frame = None
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        frame = client.latest(last)
+        if frame is None:
+            time.sleep(0)
+            continue
+        correct = not check or (frame.frame == (frame.number & 0xFFFF)).all()
+        if not frame.valid():
+            retries += 1  # Overwritten while we looked, the seqlock caught it
+            continue
+        if not correct:
+            torn += 1
+        ages.append(time.perf_counter() - frame.timestamp)
+        reads += 1
+        last = frame.number
+
+    del frame
+    client.close()
+    results.put({'reads': reads, 'retries': retries, 'torn': torn, 'ages': ages})
+
+
+def write_synthetic(duration):
+    """Publish frames filled with their frame number as fast as possible."""
+    ring = SharedFrameRing(160, 80, name=RING_NAME)
+    frame = np.zeros((80, 160), dtype=np.uint16)
+
+    def run():
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            frame.fill(ring.frames & 0xFFFF)
+            ring.publish(frame, time.perf_counter())
+        return ring.frames
+
+    return ring.close, run
+
+
+def write_emulator(duration, emulator, window):
+    """Capture from the emulated O3C with the OpenGL viewer, publishing to the ring."""
+    import main_opengl
+    import o3c_listener
+    o3c_listener.hid = emulator
+    listener = main_opengl.HIDListener(fps_limit=0, pipeline_window=window, shared_memory=RING_NAME)
+    if not listener.find_and_open_device():
+        raise SystemExit("Could not open the emulated device")
+    listener.prepare_packets()
+
+    def run():
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            listener.read_frame_buffer_optimized()
+        return listener.shared_ring.frames
+
+    def close():
+        listener.device.close()
+        listener.close_shared_ring()
+
+    return close, run
+
+
+def bench(source, readers, duration, args):
+    if source == "synthetic":
+        close, run = write_synthetic(duration)
+    else:
+        close, run = write_emulator(duration, emulator_from_args(args), args.window)
+
+    context = multiprocessing.get_context("spawn")
+    start, results = context.Event(), context.Queue()
+    processes = []
+    try:
+        for _ in range(readers):
+            ready = context.Event()
+            process = context.Process(target=reader_process,
+                                      args=(RING_NAME, duration, source == "synthetic", ready, start, results))
+            process.start()
+            ready.wait()
+            processes.append(process)
+
+        start.set()
+        wall = time.perf_counter()
+        written = run()
+        wall = time.perf_counter() - wall
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        close()
+
+    ages = [age for report in reports for age in report['ages']]
+    return {
+        'name': source,
+        'readers': readers,
+        'written': written,
+        'write_fps': written / wall,
+        'reads_per_s': sum(report['reads'] for report in reports) / readers / duration,
+        'p50_age_ms': percentile(ages, 50) * 1000,
+        'p99_age_ms': percentile(ages, 99) * 1000,
+        'retries': sum(report['retries'] for report in reports),
+        'torn': sum(report['torn'] for report in reports),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per run (default: 3)")
+    parser.add_argument("--readers", type=int, action="append", help="reader processes to compare (default: 1 and 4)")
+    parser.add_argument("--source", choices=("synthetic", "emulator"), action="append",
+                        help="frame source(s) (default: both)")
+    parser.add_argument("--window", type=int, default=26, help="pipeline window of the emulator capture (default: 26)")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    rows = []
+    for source in args.source or ("synthetic", "emulator"):
+        for readers in args.readers or (1, 4):
+            rows.append(bench(source, readers, args.duration, args))
+    print_table(rows, columns=COLUMNS)
+    print("retries: reads the seqlock caught being overwritten, torn: wrong pixels it let through (must be 0)")
+
+
+if __name__ == "__main__":
+    main()
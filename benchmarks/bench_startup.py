@@ -0,0 +1,127 @@
+"""Startup time of the viewers: importing them and getting the first frame on screen.
+
+Every run is a fresh interpreter, so nothing is cached but the .pyc files.
+``import`` rows time ``import main_opengl`` and ``import main_tkinter``
+alone. ``first frame`` rows start a viewer against the emulated O3C and
+stop it as soon as the first frame was drawn; ``concurrent`` is the viewer
+as it is, looking for the device while the window is created, and
+``sequential`` does one after the other like it used to. ``--enumerate-ms``
+makes the emulated ``hid.enumerate`` as slow as on a host with many USB
+devices. The first frame rows need a display:
+
+    xvfb-run -a env LIBGL_ALWAYS_SOFTWARE=1 python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --no-window
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import ROOT, add_emulator_arguments, emulator_options, print_table
+
+VIEWERS = ("main_opengl", "main_tkinter")
+MODES = ("concurrent", "sequential")
+TIMINGS = re.compile(r"[0-9.]+( [0-9.]+)*")
+
+IMPORT = """
+import time
+began = time.perf_counter()
+import {module}
+print(time.perf_counter() - began, flush=True)
+"""
+
+FIRST_FRAME = """
+import time
+began = time.perf_counter()
+import {module} as viewer
+imported = time.perf_counter()
+import o3c_listener
+from o3c_emulator import O3CEmulator
+o3c_listener.hid = O3CEmulator(**{options!r})
+listener = viewer.HIDListener(pipeline_window={window})
+if {sequential}:
+    listener.open_source_and_window = {sequential_open}
+draw = listener.update_display
+def update_display():
+    draw()
+    if listener.frame_sequence >= 0 and listener.running:
+        print(imported - began, time.perf_counter() - began, flush=True)
+        listener.running = False
+        {stop}
+listener.update_display = update_display
+listener.start()
+"""
+
+# How each viewer opened its source and window before they were opened at the same time,
+# and how it stops once the first frame is up
+SEQUENTIAL_OPEN = {
+    "main_opengl": "lambda: (True, listener.setup_opengl()) if listener.open_source() else (False, False)",
+    "main_tkinter": "lambda: listener.setup_gui() or listener.open_source()",
+}
+STOP = {
+    "main_opengl": "pass",
+    "main_tkinter": "listener.root.after_idle(listener.on_close)",
+}
+
+
+def run(code):
+    """Run ``code`` in a new interpreter, returning the seconds it printed and the seconds until it did."""
+    began = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    finished = time.perf_counter() - began
+    # The viewers print what they connected to, or why they failed, the timings are a line of their own
+    timings = [line for line in result.stdout.splitlines() if TIMINGS.fullmatch(line.strip())]
+    if result.returncode or not timings:
+        raise SystemExit(f"Startup run failed:\n{result.stdout}{result.stderr}")
+    return [float(value) for value in timings[-1].split()], finished
+
+
+def bench(name, code, runs):
+    """Median timings of ``runs`` starts of ``code``."""
+    imports, first_frames, processes = [], [], []
+    for _ in range(runs):
+        times, process = run(code)
+        imports.append(times[0])
+        if len(times) > 1:
+            first_frames.append(times[1])
+        processes.append(process)
+    return {
+        'name': name,
+        'runs': runs,
+        'import_ms': statistics.median(imports) * 1000,
+        'first_frame_ms': statistics.median(first_frames) * 1000 if first_frames else "-",
+        'process_ms': statistics.median(processes) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="starts per row, the median is shown (default: 5)")
+    parser.add_argument("--viewer", choices=VIEWERS, action="append", help="only start the given viewer(s)")
+    parser.add_argument("--mode", choices=MODES, action="append", help="only run the given first frame mode(s)")
+    parser.add_argument("--window", type=int, default=26, help="pipeline window of the capture (default: 26)")
+    parser.add_argument("--enumerate-ms", type=float, default=50.0,
+                        help="time the emulated hid.enumerate takes in ms (default: 50)")
+    parser.add_argument("--no-window", action="store_true", help="only time the imports, no display needed")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    viewers = args.viewer or VIEWERS
+    rows = [bench(f"import {module}", IMPORT.format(module=module), args.runs) for module in viewers]
+    if not args.no_window:
+        options = emulator_options(args, enumerate_delay=args.enumerate_ms / 1000)
+        for module in viewers:
+            for mode in args.mode or MODES:
+                code = FIRST_FRAME.format(module=module, options=options, window=args.window,
+                                          sequential=(mode == "sequential"), sequential_open=SEQUENTIAL_OPEN[module],
+                                          stop=STOP[module])
+                rows.append(bench(f"{module} first frame, {mode}", code, args.runs))
+    print_table(rows, columns=('name', 'runs', 'import_ms', 'first_frame_ms', 'process_ms'))
+    print("first_frame_ms: from the start of the import until the first frame was drawn")
+    print("process_ms: the whole run, interpreter start and exit included")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Display cost of the Tkinter viewer, in place photo updates vs a new photo per frame.
+
+Feeds frames from the emulated O3C through ``main_tkinter``'s
+``update_display`` as fast as Tk draws them and reports the frames shown
+per second and the CPU per frame. ``zoom`` is the viewer as it is: the
+frame goes into a native size photo and Tk zooms the changed rows into the
+one on the canvas. ``resize`` is how it used to draw, resizing every frame
+4x with PIL and building a new ``PhotoImage`` for it. Needs a display:
+
+    xvfb-run -a python -m benchmarks.bench_tkinter
+    xvfb-run -a python -m benchmarks.bench_tkinter --scene ticker --changes off --changes on
+"""
+import argparse
+import threading
+import time
+
+from PIL import Image, ImageTk
+
+from benchmarks.common import Measurement, add_emulator_arguments, emulator_from_args, print_table
+import main_tkinter
+import o3c_listener
+
+MODES = ("resize", "zoom")
+CHANGES = ("off", "on")
+
+
+class ResizeListener(main_tkinter.HIDListener):
+    """The viewer with the display path it had before: a resized PIL image and a new photo per frame."""
+
+    def show_rows(self, bands):
+        self.pil_image = Image.fromarray(self.image_data)
+        self.pil_image = self.pil_image.resize((160 * self.scale, 80 * self.scale), Image.NEAREST)
+        self.photo_image = ImageTk.PhotoImage(self.pil_image)
+        self.canvas.itemconfig(self.canvas_image, image=self.photo_image)
+
+
+def bench(mode, changes, args):
+    """Show emulated frames for ``args.duration`` seconds with one display path."""
+    o3c_listener.hid = emulator_from_args(args)
+    listener_class = ResizeListener if mode == "resize" else main_tkinter.HIDListener
+    listener = listener_class(fps_limit=0, pipeline_window=args.window, skip_unchanged=(changes == "on"))
+    if not listener.find_and_open_device():
+        raise SystemExit("Could not open the emulated device")
+    listener.prepare_packets()
+    listener.setup_gui()
+    listener.running = True
+    reader = threading.Thread(target=listener.device_loop, daemon=True)
+    reader.start()
+
+    measurement = Measurement(f"{mode}, changes {changes}")
+    try:
+        time.sleep(0.2)
+        shown = listener.frame_sequence
+        began = time.perf_counter()
+        while time.perf_counter() - began < args.duration:
+            start, cpu_start = time.perf_counter(), time.process_time()
+            listener.update_display()
+            # Let Tk draw the canvas, which is where a new photo costs the most
+            listener.root.update()
+            if listener.frame_sequence != shown:
+                shown = listener.frame_sequence
+                measurement.cpu += time.process_time() - cpu_start
+                measurement.add_frame(time.perf_counter() - start)
+            else:
+                time.sleep(0.0005)  # Wait for the next frame
+        measurement.wall = time.perf_counter() - began
+    finally:
+        listener.running = False
+        reader.join()
+        listener.device.close()
+        listener.root.destroy()
+
+    row = measurement.row()
+    row['skipped_pct'] = listener.changes.skip_ratio() * 100 if listener.changes else 0.0
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per run (default: 3)")
+    parser.add_argument("--mode", choices=MODES, action="append", help="only run the given display path(s)")
+    parser.add_argument("--changes", choices=CHANGES, action="append",
+                        help="with change detection off and/or on (default: off)")
+    parser.add_argument("--window", type=int, default=26, help="pipeline window of the capture (default: 26)")
+    add_emulator_arguments(parser)
+    # A new picture for every frame read, so the display path is the limit rather than the screen
+    parser.set_defaults(screen_fps=1000)
+    args = parser.parse_args()
+
+    rows = [bench(mode, changes, args) for mode in args.mode or MODES for changes in args.changes or ("off",)]
+    print_table(rows, columns=('name', 'frames', 'fps', 'p50_ms', 'p99_ms', 'cpu_ms_per_frame', 'skipped_pct'))
+    print("fps: new frames shown per second, capped by what the emulated device delivers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Transfer tuning against the emulated O3C: what ``o3c_tuning.calibrate`` picks and what it gains.
+
+Runs the calibration sweep on an emulated device, then reads frames for a
+while with the old fixed settings (0x3F4 byte chunks, lockstep, 50 ms
+timeout) and with the tuned ones, and reports frames/s and lost chunks of
+both. Nothing is saved unless ``--profile`` is given.
+
+    python -m benchmarks.bench_tuning
+    python -m benchmarks.bench_tuning --drop-rate 0.01 --latency 2 --jitter 1
+"""
+import argparse
+
+from benchmarks.common import add_emulator_arguments, emulator_from_args, print_table
+from o3c_capture import device_infos, open_device
+from o3c_protocol import CHUNK_SIZE
+from o3c_tuning import calibrate, measure, profile_key, save_profile
+
+COLUMNS = ('name', 'chunk_size', 'window', 'timeout_ms', 'fps', 'lost_pct')
+
+
+def row(name, profile):
+    return {
+        'name': name,
+        'chunk_size': profile.chunk_size,
+        'window': profile.window,
+        'timeout_ms': profile.timeout * 1000,
+        'fps': profile.fps,
+        'lost_pct': profile.error_rate * 100,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per comparison run (default: 3)")
+    parser.add_argument("--trial", type=float, default=0.5, help="seconds per calibration setting (default: 0.5)")
+    parser.add_argument("--blocking", action="store_true", help="tune and compare with blocking reads")
+    parser.add_argument("--profile", help="save the tuned profile to this file")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    hid = emulator_from_args(args)
+    info = device_infos(hid, 0x8089, 0x0009, 0xFF12)[0]
+    device = open_device(hid, 0x8089, 0x0009, 0xFF12, args.blocking, info['path'])
+    try:
+        tuned = calibrate(device, blocking=args.blocking, duration=args.trial)
+        rows = [
+            row("fixed", measure(device, 160, 80, CHUNK_SIZE, 0, 0.05, args.blocking, args.duration)),
+            row("tuned", measure(device, 160, 80, tuned.chunk_size, tuned.window, tuned.timeout, args.blocking,
+                                 args.duration)),
+        ]
+    finally:
+        device.close()
+    print()
+    print_table(rows, columns=COLUMNS)
+    print("fps: frames per second with every chunk; lost_pct: chunks that never arrived")
+    if args.profile:
+        save_profile(profile_key(info), tuned, args.profile)
+        print(f"Saved to {args.profile}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Shared helpers for the benchmark scripts."""
+import os
+import sys
+import time
+
+# Benchmarks import the viewer scripts from the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from o3c_emulator import O3CEmulator
+
+
+def add_emulator_arguments(parser):
+    """Add the emulated device knobs to an argparse parser."""
+    group = parser.add_argument_group("emulated device")
+    group.add_argument("--latency", type=float, default=0.5, help="USB round trip in ms (default: 0.5)")
+    group.add_argument("--jitter", type=float, default=0.0, help="extra random delay in ms (default: 0)")
+    group.add_argument("--drop-rate", type=float, default=0.0, help="probability of a lost report")
+    group.add_argument("--reorder-rate", type=float, default=0.0, help="probability of an out-of-order report")
+    group.add_argument("--report-interval", type=float, default=0.0, help="minimum ms between reports")
+    group.add_argument("--scene", default="bars", choices=("bars", "static", "ticker"))
+    group.add_argument("--screen-fps", type=float, default=30)
+    group.add_argument("--seed", type=int, default=1)
+    return group
+
+
+def emulator_options(args, **overrides):
+    """``O3CEmulator`` keyword arguments from parsed benchmark arguments."""
+    options = dict(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        drop_rate=args.drop_rate,
+        reorder_rate=args.reorder_rate,
+        report_interval=args.report_interval / 1000,
+        scene=args.scene,
+        screen_fps=args.screen_fps,
+        seed=args.seed,
+    )
+    options.update(overrides)
+    return options
+
+
+def emulator_from_args(args, **overrides):
+    """Create an ``O3CEmulator`` from parsed benchmark arguments."""
+    return O3CEmulator(**emulator_options(args, **overrides))
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of ``samples`` (0 <= q <= 100)."""
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Measurement:
+    """Collects per-frame latencies plus wall and CPU time for one benchmark run."""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.frames = 0
+        self.wall_start = self.cpu_start = 0.0
+        self.wall = self.cpu = 0.0
+
+    def __enter__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self.wall_start
+        self.cpu = time.process_time() - self.cpu_start
+        return False
+
+    def add_frame(self, latency):
+        self.frames += 1
+        self.latencies.append(latency)
+
+    def row(self):
+        frames = max(self.frames, 1)
+        return {
+            'name': self.name,
+            'frames': self.frames,
+            'fps': self.frames / self.wall if self.wall else 0.0,
+            'p50_ms': percentile(self.latencies, 50) * 1000,
+            'p99_ms': percentile(self.latencies, 99) * 1000,
+            'cpu_ms_per_frame': self.cpu / frames * 1000,
+        }
+
+
+def print_table(rows, columns=('name', 'frames', 'fps', 'p50_ms', 'p99_ms', 'cpu_ms_per_frame')):
+    """Print benchmark rows as an aligned text table."""
+    cells = [[c for c in columns]]
+    for row in rows:
+        cells.append([f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c]) for c in columns])
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    for n, line in enumerate(cells):
+        print("  ".join(cell.rjust(widths[i]) if i else cell.ljust(widths[i]) for i, cell in enumerate(line)))
+        if n == 0:
+            print("  ".join("-" * w for w in widths))
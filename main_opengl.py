@@ -1,354 +1,521 @@
-import hid
+import functools
+import math
 import time
 import threading
-import numpy as np
-import queue
-import sys
-from OpenGL.GL import *
-from OpenGL.GLUT import *
-from OpenGL.GLU import *
-import glfw
 
-from PIL import Image
+# Nothing heavy is imported up front: GLFW and OpenGL when the window is created, numpy, the
+# capture and hid when the device is opened, on a thread of their own, and the optional parts when used
+from o3c_listener import CaptureListener, load_hid
+from o3c_pacing import FrameScheduler
 
-# Icon only
-import base64
-from io import BytesIO
+glfw = None  # The glfw module once the window is created
 
-ICON = "AAABAAEAIBcAAAEAIAAEDAAAFgAAACgAAAAgAAAALgAAAAEAIAAAAAAAgAsAAAAAAAAAAAAAAAAAAAAAAAAZHCH/Ghsl/w4JCf8OCwz/DgwM/xAKCf8YGB//GBMX/xUODf8YExT/CgYI/2xrb/9CQET/ERAR/252e/8qKi3/EQwL/xUTFP8UEhP/GBQT/xsWFf8ZFRX/ERAS/w0LDf8kJiz/SlZl/0VQX/9ATFr/OUVT/zZEUv8fJi//ExYd/xYXGf8VExP/Eg0N/xAMDP8QDAz/EQ0N/w8KCv8TDQ3/FhIR/xYUFf8VFBb/RUdL/3h9g/8ODhD/R0pO/1BVWv81MjP/GBQU/xUTFf8YFRX/HRkX/xsXFv8PDhD/DAsN/xwcIP9GTl3/LjQ+/zU7Rf8xNTz/Jygt/xkZHf8XFhj/FRca/xYXGP8UEhL/EA0O/xEMDv8QDA3/EQ8P/xQQEP8XFRf/DAwO/05RVv+Kk5r/ho6V/1FVWv9scnf/anN6/3N5ff8oJif/EQ4Q/xgWFv8eGRf/HhoZ/xEQEf8PDQ7/FRQW/z9HVP8pLjj/FRMW/xUQD/8PCQj/DQgJ/xIOD/8WGBn/Fxkc/x4hJf8VFBX/EA0N/xAND/8REBD/ExER/xQTFf8TFBb/FhcY/xwcH/8jJCf/Ghod/0NHS/8/Qkj/eoOK/z9AQ/8NCQv/GRcY/x0ZGP8dGRj/Eg8Q/w0LDf8QDhD/KCgu/ycpMf8SDhD/Ew4N/xIODv8RDQ7/CgoO/xcbIP8mLzj/KC43/xYUFv8SEBD/EQ8R/xMREv8TEhT/ExMV/xMUFv8TFBb/EhIU/xEQEv8TEhb/DQsN/wkGCP83OT3/SEpO/w0KC/8YFxf/GRYV/xoWFv8UERH/CggK/w4MDv8tHBP/MBwS/yYYEv8aEA3/HRIP/xcPDf8QDQ7/P0RN/zk9SP8vLzf/FhIS/xUSFP8UERT/FBIU/xQTFv8UFBb/ExMV/xQTFf8TExX/EhAR/xEOD/8TERP/FBQW/xQVGP8eHiH/FBQV/xYWFv8VFBT/EhAR/xYSEv8LCQr/BwcI/0UrHf9jOyX/Nh8V/xYMCf8VCgf/EAkI/xIPEv+cmqH/U0lP/zM0Qf8rKDP/FRIT/xYVF/8UExb/FBUY/xQUF/8TFBb/FRQY/xIRFP8SFBv/Fhok/xMTHP8QERT/EhIV/xMUF/8VFhn/FRUX/xUUFf8RDxH/ExAR/xINDv8CAwT/Qywf/2Q+Kf8WEhX/DQwQ/xAMDf8QDQ7/FBQX/6Shp/9UUmD/KCYt/01Sb/8bGR3/FRQW/xcYHP8YGR3/FRYZ/xUVGP8VFBj/EBAV/yo3Tv9IX4T/R1+H/yo4Uv8SEhf/FBUX/xUWGf8WFxj/FBQV/xMREv8UEBD/Eg0O/xwbI/8pISP/VjIe/zUfFf8iGxz/Ix4g/xUTFv8ZGR3/mp2n/1tgev8dGyH/NTdJ/zY6UP8hIyv/GBkb/xgaHv8WFxz/Fhca/w0MDv8fJDT/UHCf/2aSzv9qmtr/VYO8/x4pQf8ODRD/FRcb/xUWGf8UExb/FBET/xIOEP80M0L/TE5k/z5CWP88OUT/SC8m/zYbEf8XCwr/DQgI/xgVFf+NmKX/ZWqJ/y8pM/8nJi//YWmT/1Ffh/80QFf/Iigx/xgYG/8QEBH/DgwQ/0FTdf9TebP/VnLD/1Vzwv9Yh8X/RWaX/xQWIf8UFhr/FRYa/xQUF/8QDA3/Jygz/2R0mP9da47/U1x8/0ZPbP86QVj/MC45/ykmKP8oIin/MSs2/36Upv9cbJD/ZlRj/1lUb/9cZY//T2OQ/01pnP9IZJL/N0lo/yAmNP8vNUz/Xn+2/16Du/9Ta6b/YIG9/2aT0P9ehsL/Lz5f/xESF/8WGR//FBUY/w4KC/89SF3/d5XC/3GJs/9leqP/VWSI/0NOa/8/SGD/IyMo/w0KFP8jIDD/fZaq/0VjkP9GSFz/SlZ7/1Fpmv9JZpf/SWye/0psoP9KbqT/R2uf/1Jjiv9rga7/WHm2/3ue2f9vmNj/XH+7/3iRwP9FWIP/FBgh/yAmLf8cHyX/DgsN/z5PZ/97oNH/eZvL/3CPvf9jfqf/V2yT/z9Ocv9ARVb/Y1tF/0xENP9/l6z/QGeZ/y5GZP84V4f/Qmuj/0JqoP9Eap//SHKm/0t3q/9KcqX/YXOf/3uWy/9jhsP/f6fk/3yp4v9nj83/c5jW/16Dvv8rNE3/FRQW/0Rgdf8rNTv/MkFV/3Gf1v90n9H/a5bI/2mMuv9qibb/WnOe/0FSd/9VVFj/XlJD/3yXr/8+bKD/LEpy/zJZjv8/drD/QHOq/zxpo/9Cd7D/P3q2/zxejP9mgKz/XHam/1p3p/9khbf/ZIi7/1l2pv9ZcJr/Z5LN/zpLaf8REBP/aY+p/0dVW/9DTUr/UXuk/1OJxf9HcKP/W4Kx/22Twf9qjLn/V3al/0RZhP9NUVT/fZmy/ztnm/8mLz//L1J+/z9+uv9AebD/PG+o/z96tv86dK//IjFJ/111nP9UZoj/Slp8/26Kwf9visb/SGGP/1RtlP9ZhL3/KkRq/ywxO/+AqMT/VXB//725lf/g4Ln/gY6S/yQ1Xv9OapX/XIKu/1+Ds/9fhrr/WXuu/0xfgP98mbL/PGyh/ztnk/84bKD/QoK7/0B9tf88dK3/RIPA/z5qnf8Ej7b/LprK/1NhjP99ndD/esz+/0zL/v+Ptef/hJzC/16Owv8MuOj/BjpK/3GHnf9hhp7/9fLJ/9fXwP9SXnb/Xnum/2uPvP9slcf/bpvQ/3Cd1f9bhb7/Umub/3uas/88b6P/Onmz/zh0sP9Cgbr/P323/zx1r/9EiMj/NE9//wCPtP8nvvP/d5nQ/5K99/9Jx/n/AMz9/53R//+x1Pz/hbzn/wDQ//8FLj7/eo6k/3mbr/+Mj4T/VnKb/2eQw/97pdX/f6zd/36w4v90qd//aZvX/2SR0P9yjbr/e5u2/z9ypv86d6//N3Ov/0ODvf9Bfbn/O3Wy/0WJyv87YZX/CEph/xXO//93odX/ibHn/yzL//8B1f//dsn4/73I7f962f//AKPO/yEiLP+Eo7n/XHaT/0Zol/9umcz/eaXW/3qr3f98r+H/d6vf/3Sp4P9yqeb/e6jd/2d/nf98nbn/RHir/zh1rv81baj/PXmz/z53s/8+e7f/RIO//0qIxf8lNFH/AXmX/0e27P9Qsuj/Ha3d/zSVwv8qvu7/e7nk/yjC7/8MQVn/LC89/0JfgP9Jbp3/bZrN/3Sj2P93q+H/e7Hl/4G46v+GvvD/fK/a/2aNrv9YdZH/T2N4/3yfu/9Bd6v/O3q0/0F8t/9CgLv/Q4O//0iKxv9Pjsn/UpTQ/0yIwf8tQV//IGSI/xRXdf8bJTT/Kic3/xs+T/8eaYb/LWaS/yI1Vv8vTnL/Un2v/2eaz/9xqd7/gb3u/5DN9v+X0ff/jMLp/3SixP9Zfpn/TGuC/01qg/9NZXz/e567/zx0q/84eLP/OHm2/zp+vf89gb//QoG9/0GGx/9Hjc3/UZXU/12a1v9PfrL/T2qP/ypEXf8pS2X/M0tp/0pjh/9ikcn/T4jD/2+l1/+Gv+r/j8jv/5XN8P+WzOr/jsDc/3+syv9wlrP/Zoql/1+EoP9We5b/SmmE/0dheP96nrv/Onau/zh3tP81d7b/OXy8/zyBwP9DhMH/P4XH/0eOz/9MkND/TJDQ/1ec2f+dx+j/lMHk/4y64f+NvOn/msnv/5zJ7v+Uxuz/pdXz/5/O6v+YxeH/kLvY/4Wxz/99p8b/eKC+/3GYtf9mjqr/WoGd/1B1kP9GZ4H/RV92/3OYtv85c6r/OXSu/zVuqf84c67/PHm1/0iHwv9IiMP/S43J/1GV0f9QltX/VpzZ/4quyP+vzuL/veD1/7ba8P+y1+3/q9Pq/6jQ5/+fyOL/mMPe/5K+2/+MuNb/hLHP/3ynxv91nbv/bJOv/2GIpP9XfJj/THCL/0NhfP9CWnD/AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA="
+# Window icon, 32x23 RGBA pixels row by row, decoded from the original .ico ahead of time
+ICON_SIZE = (32, 23)
+ICON_PIXELS = (
+    b"\xb6\x98\x73\xff\xaa\x73\x39\xff\xae\x74\x39\xff\xa9\x6e\x35\xff\xae\x73\x38\xff\xb5\x79\x3c\xff\xc2\x87\x48\xff\xc3\x88\x48\xff\xc9\x8d\x4b\xff\xd1\x95\x51\xff\xd5\x96\x50\xff\xd9\x9c\x56\xff\xc8\xae\x8a\xff\xe2\xce\xaf\xff\xf5\xe0\xbd\xff\xf0\xda\xb6\xff"
+    b"\xed\xd7\xb2\xff\xea\xd3\xab\xff\xe7\xd0\xa8\xff\xe2\xc8\x9f\xff\xde\xc3\x98\xff\xdb\xbe\x92\xff\xd6\xb8\x8c\xff\xcf\xb1\x84\xff\xc6\xa7\x7c\xff\xbb\x9d\x75\xff\xaf\x93\x6c\xff\xa4\x88\x61\xff\x98\x7c\x57\xff\x8b\x70\x4c\xff\x7c\x61\x43\xff\x70\x5a\x42\xff"
+    b"\xbb\x9e\x7a\xff\xae\x76\x3a\xff\xb4\x77\x38\xff\xb6\x77\x35\xff\xbc\x7c\x39\xff\xc0\x81\x3c\xff\xc1\x84\x43\xff\xc7\x85\x3f\xff\xcf\x8e\x47\xff\xd0\x90\x4c\xff\xd0\x90\x4c\xff\xd9\x9c\x57\xff\xe8\xc7\x9d\xff\xe4\xc1\x94\xff\xe1\xba\x8c\xff\xe9\xbc\x8d\xff"
+    b"\xef\xc9\x9a\xff\xee\xc9\x9c\xff\xec\xc6\x94\xff\xf3\xd5\xa5\xff\xea\xce\x9f\xff\xe1\xc5\x98\xff\xd8\xbb\x90\xff\xcf\xb1\x85\xff\xc6\xa7\x7d\xff\xbe\xa0\x78\xff\xb5\x98\x71\xff\xaa\x8e\x66\xff\x9d\x81\x5a\xff\x90\x75\x50\xff\x81\x67\x46\xff\x76\x5f\x45\xff"
+    b"\xbb\x9e\x7b\xff\xab\x74\x3c\xff\xb3\x78\x38\xff\xb6\x79\x38\xff\xbd\x7e\x3a\xff\xbf\x81\x3d\xff\xbd\x81\x42\xff\xc7\x86\x41\xff\xcd\x8d\x47\xff\xd4\x95\x51\xff\xd6\x9a\x5d\xff\xb2\x7e\x4f\xff\x8f\x6a\x4f\xff\x5d\x44\x2a\xff\x65\x4b\x29\xff\x69\x4b\x33\xff"
+    b"\x87\x63\x4a\xff\xc9\x91\x62\xff\xc3\x88\x4f\xff\xd7\xa5\x6f\xff\xea\xbf\x86\xff\xef\xc8\x8f\xff\xf0\xcd\x95\xff\xea\xcc\x96\xff\xdc\xc0\x8e\xff\xca\xac\x7f\xff\xb3\x96\x70\xff\xa5\x8a\x66\xff\xa0\x84\x5f\xff\x96\x7b\x56\xff\x84\x69\x4a\xff\x78\x61\x47\xff"
+    b"\xbb\x9f\x7c\xff\xab\x77\x41\xff\xb4\x7a\x3b\xff\xb7\x7c\x41\xff\xbb\x80\x42\xff\xbf\x83\x43\xff\xc6\x8a\x48\xff\xc9\x8e\x4f\xff\xd0\x94\x52\xff\xc1\x88\x4c\xff\x5f\x41\x2d\xff\x88\x64\x20\xff\x75\x57\x14\xff\x34\x25\x1b\xff\x37\x27\x2a\xff\x4f\x3e\x1b\xff"
+    b"\x86\x69\x1e\xff\x92\x66\x2d\xff\x56\x35\x22\xff\x72\x4e\x2f\xff\xaf\x7d\x52\xff\xcf\x9a\x67\xff\xde\xa9\x71\xff\xee\xbd\x81\xff\xf6\xcd\x90\xff\xf7\xd1\x97\xff\xe9\xc2\x8c\xff\xc4\xa2\x74\xff\x99\x7e\x59\xff\x82\x6b\x4c\xff\x83\x6a\x4d\xff\x7c\x65\x4d\xff"
+    b"\xb9\x9d\x7c\xff\xab\x78\x44\xff\xae\x75\x38\xff\xa8\x6d\x35\xff\xb3\x79\x3d\xff\xb3\x77\x3e\xff\xb7\x7b\x3e\xff\xbf\x83\x44\xff\xc5\x88\x4a\xff\x51\x34\x25\xff\x97\x79\x01\xff\xec\xb6\x47\xff\xe8\xb2\x50\xff\xdd\xad\x1d\xff\xc2\x95\x34\xff\xee\xbe\x2a\xff"
+    b"\xe4\xb9\x7b\xff\xef\xc2\x28\xff\x59\x41\x0c\xff\x3d\x2f\x2c\xff\x80\x5f\x42\xff\x9d\x6e\x49\xff\xcd\x9a\x6d\xff\xd8\xa3\x74\xff\xe1\xab\x77\xff\xe5\xb1\x7b\xff\xea\xb8\x81\xff\xf0\xbe\x86\xff\xda\xaf\x7c\xff\xae\x8d\x66\xff\x91\x75\x58\xff\x78\x63\x4f\xff"
+    b"\xb6\x9b\x7b\xff\xa6\x72\x3f\xff\xaf\x77\x3a\xff\xaf\x73\x37\xff\xbd\x83\x43\xff\xb9\x7d\x41\xff\xb2\x75\x3b\xff\xca\x89\x45\xff\x95\x61\x3b\xff\x61\x4a\x08\xff\xff\xce\x15\xff\xd5\xa1\x77\xff\xe7\xb1\x89\xff\xff\xcb\x2c\xff\xff\xd5\x01\xff\xf8\xc9\x76\xff"
+    b"\xed\xc8\xbd\xff\xff\xd9\x7a\xff\xce\xa3\x00\xff\x2c\x22\x21\xff\xb9\xa3\x84\xff\x93\x76\x5c\xff\x97\x68\x46\xff\xcc\x99\x6e\xff\xd6\xa5\x79\xff\xdd\xab\x7a\xff\xe1\xaf\x7c\xff\xdf\xab\x77\xff\xe0\xa9\x74\xff\xe6\xa9\x72\xff\xdd\xa8\x7b\xff\x9d\x7f\x67\xff"
+    b"\xb3\x9a\x7b\xff\xa3\x6f\x3c\xff\xb3\x79\x3a\xff\xb0\x74\x38\xff\xba\x81\x42\xff\xb7\x7d\x3f\xff\xaf\x75\x3c\xff\xc8\x88\x44\xff\x7f\x4f\x34\xff\xb4\x8f\x00\xff\xf3\xbe\x27\xff\xd0\x99\x77\xff\xf7\xbd\x92\xff\xf9\xc7\x49\xff\xfd\xcc\x00\xff\xff\xd1\x9d\xff"
+    b"\xfc\xd4\xb1\xff\xe7\xbc\x85\xff\xff\xd0\x00\xff\x3e\x2e\x05\xff\xa4\x8e\x7a\xff\xaf\x9b\x79\xff\x84\x8f\x8c\xff\x9b\x72\x56\xff\xc3\x90\x67\xff\xd5\xa5\x7b\xff\xdd\xac\x7f\xff\xe2\xb0\x7e\xff\xdf\xa9\x74\xff\xd7\x9b\x69\xff\xd0\x91\x64\xff\xba\x8d\x72\xff"
+    b"\xb2\x99\x7c\xff\xa1\x6c\x3c\xff\x93\x67\x3b\xff\xa0\x6c\x38\xff\xbb\x82\x42\xff\xb5\x7d\x40\xff\xad\x74\x3c\xff\xc0\x83\x44\xff\x9d\x6a\x3e\xff\xb6\x8f\x04\xff\xca\x9a\x2e\xff\x8c\x61\x53\xff\xd0\x9d\x7d\xff\xfe\xcc\x7a\xff\xfe\xcb\x4c\xff\xe7\xb5\x8f\xff"
+    b"\xc2\x9c\x84\xff\xc2\x8e\x5e\xff\xe8\xb8\x0c\xff\x4a\x3a\x06\xff\x9d\x87\x71\xff\x9e\x86\x61\xff\xc9\xf2\xf5\xff\xc0\xd7\xd7\xff\x76\x5e\x52\xff\xa6\x7b\x5e\xff\xbc\x8f\x6b\xff\xc7\x95\x6c\xff\xd0\x9b\x6e\xff\xd5\x9d\x70\xff\xbe\x85\x5b\xff\x9b\x6b\x52\xff"
+    b"\xb2\x99\x7d\xff\x9b\x67\x3b\xff\x3f\x2f\x26\xff\x7e\x52\x2f\xff\xba\x7e\x3f\xff\xb0\x79\x40\xff\xa8\x6f\x3c\xff\xb6\x7a\x3f\xff\xaf\x74\x3a\xff\x49\x31\x22\xff\x9c\x75\x5d\xff\x88\x66\x54\xff\x7c\x5a\x4a\xff\xc1\x8a\x6e\xff\xc6\x8a\x6f\xff\x8f\x61\x48\xff"
+    b"\x94\x6d\x54\xff\xbd\x84\x59\xff\x6a\x44\x2a\xff\x3b\x31\x2c\xff\xc4\xa8\x80\xff\x7f\x70\x55\xff\x95\xb9\xbd\xff\xb9\xe0\xe0\xff\x92\x8e\x81\xff\x5e\x35\x24\xff\x95\x6a\x4e\xff\xae\x82\x5c\xff\xb3\x83\x5f\xff\xba\x86\x5f\xff\xae\x7b\x59\xff\x80\x5f\x4c\xff"
+    b"\xaf\x97\x7c\xff\xa0\x6c\x3e\xff\x72\x4a\x2c\xff\x8e\x59\x32\xff\xb0\x76\x3f\xff\xaa\x73\x40\xff\xa3\x69\x3c\xff\xb0\x77\x42\xff\xb6\x7a\x3f\xff\x8c\x5e\x3c\xff\xac\x80\x66\xff\xa6\x76\x5c\xff\xa7\x77\x5a\xff\xb7\x85\x64\xff\xbb\x88\x64\xff\xa6\x76\x59\xff"
+    b"\x9a\x70\x59\xff\xcd\x92\x67\xff\x69\x4b\x3a\xff\x13\x10\x11\xff\xa9\x8f\x69\xff\x5b\x55\x47\xff\x4a\x4d\x43\xff\xa4\x7b\x51\xff\xc5\x89\x53\xff\xa3\x70\x47\xff\xb1\x82\x5b\xff\xc1\x93\x6d\xff\xb9\x8c\x6a\xff\xa5\x76\x57\xff\x84\x59\x44\xff\x54\x51\x4d\xff"
+    b"\xac\x97\x7f\xff\x99\x67\x40\xff\x64\x46\x2e\xff\x87\x57\x38\xff\xa3\x6b\x42\xff\xa0\x6a\x42\xff\x9f\x6a\x44\xff\xa6\x72\x48\xff\xab\x77\x4b\xff\xa5\x72\x4a\xff\x9f\x73\x61\xff\xcb\x96\x7b\xff\xc3\x86\x63\xff\xe4\xa7\x7f\xff\xe2\xa9\x7c\xff\xcd\x8f\x67\xff"
+    b"\xd6\x98\x73\xff\xbe\x83\x5e\xff\x4d\x34\x2b\xff\x16\x14\x15\xff\x75\x60\x44\xff\x3b\x35\x2b\xff\x55\x41\x32\xff\xd6\x9f\x71\xff\xd1\x9f\x74\xff\xc8\x96\x6b\xff\xba\x8c\x69\xff\xb6\x89\x6a\xff\x9e\x73\x5a\xff\x77\x52\x41\xff\x58\x54\x55\xff\x43\x52\x5e\xff"
+    b"\xaa\x96\x7d\xff\x90\x63\x45\xff\x5c\x48\x46\xff\x7b\x56\x4a\xff\x9a\x69\x51\xff\x97\x66\x49\xff\x9e\x6c\x49\xff\xa0\x6c\x4a\xff\xa4\x6e\x4a\xff\x9f\x6b\x47\xff\x8a\x63\x52\xff\xae\x81\x6b\xff\xb6\x79\x58\xff\xd9\x9e\x7b\xff\xd8\x98\x6f\xff\xbb\x7f\x5c\xff"
+    b"\xc0\x91\x78\xff\x83\x58\x45\xff\x21\x18\x14\xff\x2d\x26\x20\xff\x25\x1f\x1c\xff\x0d\x0b\x0e\xff\x67\x4f\x3e\xff\xd1\xa0\x7b\xff\xcb\x9b\x79\xff\xbd\x8f\x70\xff\xa7\x7e\x63\xff\x93\x6c\x57\xff\x72\x4e\x3f\xff\x56\x45\x40\xff\x45\x5b\x63\xff\x34\x44\x4c\xff"
+    b"\xa6\x94\x7e\xff\x90\x6c\x5c\xff\x63\x54\x66\xff\x6f\x54\x59\xff\x8f\x65\x5c\xff\x90\x63\x4f\xff\x9c\x69\x4d\xff\x92\x64\x48\xff\x68\x49\x37\xff\x34\x26\x20\xff\x4c\x35\x2f\xff\xb6\x7f\x5e\xff\xbb\x83\x5e\xff\xa6\x6b\x53\xff\xbd\x81\x60\xff\xd0\x93\x66\xff"
+    b"\xc2\x86\x5e\xff\x5f\x3e\x2f\xff\x17\x12\x11\xff\x1f\x19\x16\xff\x18\x15\x14\xff\x0b\x0a\x0e\xff\x5d\x48\x3d\xff\xc2\x95\x77\xff\xb3\x89\x71\xff\xa3\x7a\x65\xff\x88\x64\x55\xff\x6b\x4e\x43\xff\x60\x48\x3f\xff\x28\x23\x23\xff\x14\x0a\x0d\xff\x30\x20\x23\xff"
+    b"\xa5\x98\x8d\xff\x89\x6a\x65\xff\x33\x29\x2f\xff\x2f\x26\x27\xff\x93\x69\x61\xff\x87\x5f\x51\xff\x57\x40\x34\xff\x31\x28\x22\xff\x1b\x18\x18\xff\x11\x10\x10\xff\x10\x0c\x0e\xff\x75\x53\x41\xff\xb3\x79\x53\xff\xc3\x72\x56\xff\xc2\x73\x55\xff\xc5\x87\x58\xff"
+    b"\x97\x66\x45\xff\x21\x16\x14\xff\x1a\x16\x14\xff\x1a\x16\x15\xff\x17\x14\x14\xff\x0d\x0c\x10\xff\x33\x28\x27\xff\x98\x74\x64\xff\x8e\x6b\x5d\xff\x7c\x5c\x53\xff\x6c\x4f\x46\xff\x58\x41\x3a\xff\x39\x2e\x30\xff\x28\x26\x29\xff\x29\x22\x28\xff\x36\x2b\x31\xff"
+    b"\xa7\x9d\x9a\xff\x7a\x60\x5b\xff\x21\x1b\x1d\xff\x49\x37\x35\xff\x50\x3a\x36\xff\x2b\x23\x21\xff\x1b\x19\x18\xff\x1e\x1a\x18\xff\x1c\x17\x16\xff\x1a\x17\x16\xff\x0e\x0c\x0d\xff\x34\x24\x1f\xff\x9f\x70\x50\xff\xce\x92\x66\xff\xda\x9a\x6a\xff\xbc\x83\x55\xff"
+    b"\x41\x29\x1e\xff\x10\x0d\x0e\xff\x1b\x17\x15\xff\x19\x16\x15\xff\x16\x13\x14\xff\x13\x11\x14\xff\x10\x0e\x12\xff\x42\x33\x34\xff\x64\x4e\x4c\xff\x58\x42\x3e\xff\x44\x39\x3c\xff\x26\x2f\x48\xff\x11\x1b\x36\xff\x0a\x0b\x17\xff\x08\x08\x0d\xff\x15\x15\x18\xff"
+    b"\xa7\xa1\xa4\xff\x60\x52\x54\xff\x2d\x26\x28\xff\x6f\x52\x4d\xff\x1d\x19\x1b\xff\x16\x14\x15\xff\x1c\x18\x17\xff\x1d\x19\x18\xff\x19\x16\x15\xff\x18\x15\x15\xff\x18\x14\x15\xff\x15\x10\x10\xff\x4e\x37\x2a\xff\x84\x5f\x48\xff\x87\x5f\x47\xff\x52\x38\x2a\xff"
+    b"\x17\x12\x12\xff\x17\x15\x14\xff\x19\x16\x15\xff\x18\x17\x16\xff\x15\x14\x14\xff\x12\x11\x13\xff\x10\x10\x14\xff\x0e\x0d\x12\xff\x23\x1b\x1c\xff\x23\x21\x29\xff\x1e\x32\x56\xff\x15\x1f\x35\xff\x1c\x1b\x22\xff\x20\x1e\x23\xff\x16\x13\x15\xff\x1d\x19\x19\xff"
+    b"\xa1\x9a\x9c\xff\x4f\x49\x53\xff\x41\x34\x33\xff\x33\x28\x2b\xff\x13\x12\x15\xff\x17\x15\x16\xff\x16\x13\x14\xff\x18\x15\x14\xff\x17\x14\x14\xff\x16\x14\x13\xff\x18\x14\x15\xff\x14\x11\x12\xff\x1b\x14\x12\xff\x24\x1a\x16\xff\x1c\x13\x13\xff\x14\x11\x10\xff"
+    b"\x15\x12\x12\xff\x17\x14\x13\xff\x19\x16\x15\xff\x17\x15\x15\xff\x15\x14\x15\xff\x11\x0f\x11\xff\x11\x10\x13\xff\x0e\x0d\x12\xff\x04\x03\x02\xff\x1f\x2c\x43\xff\x29\x3e\x64\xff\x15\x12\x16\xff\x10\x0c\x0d\xff\x0d\x0c\x10\xff\x0e\x0d\x10\xff\x17\x14\x14\xff"
+    b"\x4d\x44\x3f\xff\x48\x3d\x39\xff\x37\x2f\x2f\xff\x12\x12\x16\xff\x14\x12\x15\xff\x14\x11\x14\xff\x14\x12\x14\xff\x16\x13\x14\xff\x16\x14\x14\xff\x15\x13\x13\xff\x15\x13\x14\xff\x15\x13\x13\xff\x11\x10\x12\xff\x0f\x0e\x11\xff\x13\x11\x13\xff\x16\x14\x14\xff"
+    b"\x18\x15\x14\xff\x21\x1e\x1e\xff\x15\x14\x14\xff\x16\x16\x16\xff\x14\x14\x15\xff\x11\x10\x12\xff\x12\x12\x16\xff\x0a\x09\x0b\xff\x08\x07\x07\xff\x1d\x2b\x45\xff\x25\x3b\x63\xff\x15\x1f\x36\xff\x09\x0c\x16\xff\x07\x0a\x15\xff\x08\x09\x10\xff\x12\x0f\x12\xff"
+    b"\x20\x1b\x17\xff\x38\x2f\x26\xff\x37\x2e\x28\xff\x16\x14\x16\xff\x10\x10\x12\xff\x11\x0f\x11\xff\x12\x11\x13\xff\x14\x12\x13\xff\x15\x13\x13\xff\x16\x14\x13\xff\x16\x14\x13\xff\x14\x12\x12\xff\x12\x10\x11\xff\x16\x12\x13\xff\x0d\x0b\x0d\xff\x08\x06\x09\xff"
+    b"\x3d\x39\x37\xff\x4e\x4a\x48\xff\x0b\x0a\x0d\xff\x17\x17\x18\xff\x15\x16\x19\xff\x16\x16\x1a\xff\x11\x11\x14\xff\x0a\x08\x0a\xff\x0e\x0c\x0e\xff\x13\x1c\x2d\xff\x12\x1c\x30\xff\x12\x18\x26\xff\x0d\x10\x1a\xff\x0f\x12\x1d\xff\x0d\x0f\x17\xff\x0e\x0d\x10\xff"
+    b"\x19\x18\x16\xff\x1c\x19\x17\xff\x25\x21\x1e\xff\x15\x14\x15\xff\x0d\x0d\x10\xff\x0f\x0d\x10\xff\x10\x10\x11\xff\x11\x11\x13\xff\x15\x13\x14\xff\x16\x14\x13\xff\x18\x17\x16\xff\x1f\x1c\x1c\xff\x27\x24\x23\xff\x1d\x1a\x1a\xff\x4b\x47\x43\xff\x48\x42\x3f\xff"
+    b"\x8a\x83\x7a\xff\x43\x40\x3f\xff\x0b\x09\x0d\xff\x18\x17\x19\xff\x18\x19\x1d\xff\x18\x19\x1d\xff\x10\x0f\x12\xff\x0d\x0b\x0d\xff\x10\x0e\x10\xff\x2e\x28\x28\xff\x31\x29\x27\xff\x10\x0e\x12\xff\x0d\x0e\x13\xff\x0e\x0e\x12\xff\x0e\x0d\x11\xff\x0e\x0a\x0a\xff"
+    b"\x1a\x17\x15\xff\x18\x17\x16\xff\x12\x12\x14\xff\x0e\x0d\x10\xff\x0e\x0c\x11\xff\x0d\x0c\x10\xff\x0f\x0f\x11\xff\x10\x10\x14\xff\x17\x15\x17\xff\x0e\x0c\x0c\xff\x56\x51\x4e\xff\x9a\x93\x8a\xff\x95\x8e\x86\xff\x5a\x55\x51\xff\x77\x72\x6c\xff\x7a\x73\x6a\xff"
+    b"\x7d\x79\x73\xff\x27\x26\x28\xff\x10\x0e\x11\xff\x16\x16\x18\xff\x17\x19\x1e\xff\x19\x1a\x1e\xff\x11\x10\x11\xff\x0e\x0d\x0f\xff\x16\x14\x15\xff\x54\x47\x3f\xff\x38\x2e\x29\xff\x16\x13\x15\xff\x0f\x10\x15\xff\x08\x09\x0f\xff\x09\x08\x0d\xff\x0f\x0e\x12\xff"
+    b"\x19\x17\x16\xff\x13\x13\x15\xff\x0d\x0d\x12\xff\x0c\x0c\x10\xff\x0c\x0c\x10\xff\x0d\x0d\x11\xff\x0a\x0a\x0f\xff\x0d\x0d\x13\xff\x11\x12\x16\xff\x15\x14\x16\xff\x16\x14\x15\xff\x4b\x47\x45\xff\x83\x7d\x78\xff\x10\x0e\x0e\xff\x4e\x4a\x47\xff\x5a\x55\x50\xff"
+    b"\x33\x32\x35\xff\x14\x14\x18\xff\x15\x13\x15\xff\x15\x15\x18\xff\x17\x19\x1d\xff\x16\x17\x1b\xff\x10\x0e\x0f\xff\x0d\x0b\x0c\xff\x20\x1c\x1c\xff\x5d\x4e\x46\xff\x3e\x34\x2e\xff\x45\x3b\x35\xff\x3c\x35\x31\xff\x2d\x28\x27\xff\x1d\x19\x19\xff\x18\x16\x17\xff"
+    b"\x21\x1c\x19\xff\x25\x1b\x1a\xff\x09\x09\x0e\xff\x0c\x0b\x0e\xff\x0c\x0c\x0e\xff\x09\x0a\x10\xff\x1f\x18\x18\xff\x17\x13\x18\xff\x0d\x0e\x15\xff\x14\x13\x18\xff\x08\x06\x0a\xff\x6f\x6b\x6c\xff\x44\x40\x42\xff\x11\x10\x11\xff\x7b\x76\x6e\xff\x2d\x2a\x2a\xff"
+    b"\x0b\x0c\x11\xff\x14\x13\x15\xff\x13\x12\x14\xff\x13\x14\x18\xff\x15\x16\x1b\xff\x15\x15\x19\xff\x12\x10\x11\xff\x0d\x0b\x0d\xff\x2c\x26\x24\xff\x65\x56\x4a\xff\x5f\x50\x45\xff\x5a\x4c\x40\xff\x53\x45\x39\xff\x52\x44\x36\xff\x2f\x26\x1f\xff\x1d\x16\x13\xff"
+)
 
 
-HID_DEFAULT_UPDATE_FREQUENCY = 200  # Hardcoded 200, so 1/200 will allow us to display 144 FPS while not pinging the device too often
+RENDERER_CHOICES = {  # Names in o3c_gl.RENDERERS, tried in order
+    "auto": ("shader", "legacy"),
+    "shader": ("shader",),
+    "legacy": ("legacy",),
+}
 
-class HIDListener:
-    def __init__(self, fps_limit=60, vendor_id=0x8089, product_id=0x0009, usage_page=0xFF12):
-        self.vendor_id = vendor_id
-        self.product_id = product_id
-        self.usage_page = usage_page
-        self.device = None
-        self.running = False
-        self.width, self.height = 160, 80
+HID_DEFAULT_UPDATE_FREQUENCY = 200  # Display rate when unlimited, enough for 144 Hz screens without spinning the main loop
+IDLE_REDRAW_INTERVAL = 1.0  # Seconds between redraws when no new frame arrives
+ATLAS_MAX_WIDTH = 1280  # Window width the screens of several devices are scaled down to fit in
+OVERLAY_FULL_SCALE_MS = 20  # Stage time that fills the overlay's whole width
+OVERLAY_COLORS = [  # One per telemetry stage
+    (0.9, 0.6, 0.2), (0.9, 0.3, 0.3), (0.9, 0.3, 0.7), (0.6, 0.4, 0.9), (0.3, 0.5, 0.9),
+    (0.3, 0.8, 0.9), (0.3, 0.9, 0.5), (0.7, 0.9, 0.3), (1.0, 1.0, 1.0),
+]
+
+def load_glfw():
+    """The glfw module, imported the first time a window is created."""
+    global glfw
+    if glfw is None:
+        import glfw
+    return glfw
+
+
+def icon_image():
+    """The window icon as GLFW takes it: width, height and rows of RGBA pixels."""
+    width, height = ICON_SIZE
+    pixels = [ICON_PIXELS[offset:offset + 4] for offset in range(0, len(ICON_PIXELS), 4)]
+    return width, height, [pixels[row * width:(row + 1) * width] for row in range(height)]
+
+
+class HIDListener(CaptureListener):
+    def __init__(self, fps_limit=60, packed_upload=True, renderer="auto", vsync=False, capture_process=False,
+                 hid_factory=None, remote=None, all_devices=False, window_per_device=False, **options):
+        super().__init__(**options)
         self.display_scale = 4
-        self.frame_buffer = np.zeros((self.height, self.width), dtype=np.uint16)
-        self.raw_buffer = np.zeros(self.width * self.height, dtype=np.uint16)
         self.last_update_time = time.time()
         self.fps_limit = fps_limit if fps_limit>0 else HID_DEFAULT_UPDATE_FREQUENCY
+        self.vsync = vsync  # Let swap_buffers wait for the screen refresh
+        self.display_scheduler = None
+        self.next_redraw = 0.0
         self.fps_counter = 0
         self.fps = 0
-        self.frame_queue = queue.Queue(maxsize=2)  # Buffer for frames between threads
-        self.texture_data = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self.packed_upload = packed_upload  # Upload RGB565 as is, the CPU conversion is the fallback
+        self.renderer_type = renderer  # "auto" tries the shader renderer first, then the legacy one
+        self.renderer = None
         self.base_title = "SayoDevice HID Viewer (OpenGL)"
+        self.overlay_bars = []  # Telemetry drawn as bars if asked
+        self.capture_process = capture_process  # Read the device in a child process instead of a thread
+        self.hid_factory = hid_factory  # Gives the child process its hid module, import_hid unless set
+        self.capture = None
+        self.remote = remote  # "host:port" of a frame server to show instead of the device
+        self.client = None
+        # Several O3Cs, each read by its own worker and shown in a tile of one window or in a window of its own
+        self.all_devices = all_devices or window_per_device
+        self.window_per_device = window_per_device
+        self.device_changes = []    # ChangeDetector per worker
+        self.device_sequences = []  # Sequence of the last frame taken from each worker
+        self.atlas = (1, 1)         # Columns and rows of screens in the window
+        self.views = []             # (window, renderer, title) of every window
         
-    def find_and_open_device(self):
-        """Find and open the specified HID device."""
-        devices = hid.enumerate(self.vendor_id, self.product_id)
-        
-        if not devices:
-            print(f"No devices found with VID={hex(self.vendor_id)}, PID={hex(self.product_id)}")
-            return False
-            
-        device_path = None
-        for device in devices:
-            if device['usage_page'] == self.usage_page:
-                device_path = device['path']
-                break
-                
-        if not device_path:
-            print(f"Found devices, but none with usage_page={hex(self.usage_page)}")
-            return False
-            
+    def open_all_devices(self):
+        """Open every O3C and start a capture worker for each."""
+        from o3c_capture import CaptureWorker, ChangeDetector, device_infos, open_device
+        from o3c_protocol import get_request_plan
+        hid = load_hid()
         try:
-            self.device = hid.device()
-            self.device.open_path(device_path)
-            self.device.set_nonblocking(1)  # Set non-blocking mode for faster reads
-            print(f"Connected to {self.device.get_manufacturer_string()} {self.device.get_product_string()}")
-            return True
+            infos = device_infos(hid, self.vendor_id, self.product_id, self.usage_page)
         except Exception as e:
             print(f"Failed to open device: {e}")
             return False
+        self.apply_profile(infos[0])
+        self.resolve_transfer()
+        plan = get_request_plan(self.width, self.height, self.chunk_size)
+        for path in (info['path'] for info in infos):
+            try:
+                device = open_device(hid, self.vendor_id, self.product_id, self.usage_page, self.blocking_reads, path)
+            except Exception as e:
+                print(f"Failed to open device at {path}: {e}")
+                continue
+            description = f"{device.get_product_string()} {device.get_serial_number_string()}"
+            print(f"Connected to {device.get_manufacturer_string()} {description}")
+            # Reopened by its path, the others are taken by their own workers
+            reopen = functools.partial(open_device, hid, self.vendor_id, self.product_id, self.usage_page,
+                                       self.blocking_reads, path)
+            self.workers.append(CaptureWorker(device, plan, reopen, self.pipeline_window, self.blocking_reads,
+                                              self.capture_rate, description, self.read_timeout))
+        if not self.workers:
+            return False
+        if self.telemetry is not None or self.record or self.export or self.shared_memory:
+            print("Telemetry, recording, exporting and shared memory only work with a single device")
+        
+        # Every device is compared with its own last frame
+        if self.skip_unchanged:
+            self.device_changes = [ChangeDetector(self.width, self.height) for _ in self.workers]
+        self.device_sequences = [-1] * len(self.workers)
+        if not self.window_per_device:
+            # As square a grid as it gets, scaled down to keep the window on the screen
+            columns = math.ceil(math.sqrt(len(self.workers)))
+            self.atlas = (columns, math.ceil(len(self.workers) / columns))
+            self.display_scale = max(1, min(self.display_scale, ATLAS_MAX_WIDTH // (self.width * columns)))
+        for worker in self.workers:
+            worker.start()
+        return True
     
     def setup_opengl(self):
         """Initialize OpenGL context and resources."""
+        from o3c_capture import ChangeDetector
         # Initialize GLFW
-        if not glfw.init():
+        if not load_glfw().init():
             print("Failed to initialize GLFW")
             return False
         
+        if self.window_per_device and self.workers:
+            titles = [f"{self.base_title} - {worker.description}" for worker in self.workers]
+        else:
+            titles = [self.base_title]
+        for title in titles:
+            view = self.open_window(*self.atlas, title)
+            if view is None:
+                glfw.terminate()
+                print("Failed to create GLFW window")
+                return False
+            self.views.append(view)
+        self.window, self.renderer, _ = self.views[0]
+        if self.skip_unchanged and not self.workers:
+            self.changes = ChangeDetector(self.width, self.height)
+        return True
+    
+    def open_window(self, columns, rows, title):
+        """Create a window with a renderer for ``columns`` x ``rows`` screens, returns (window, renderer, title) or None."""
         # Create a window without resizing
-        window_width = self.width * self.display_scale
-        window_height = self.height * self.display_scale
-        
-        # Create GLFW window
-        self.window = glfw.create_window(window_width, window_height, self.base_title, None, None)
-        if not self.window:
-            glfw.terminate()
-            print("Failed to create GLFW window")
-            return False
-        
-        # Icon
-        glfw.set_window_icon(self.window, 1, Image.open(BytesIO(base64.b64decode(ICON))))
-
-        # Make the window's context current
-        glfw.make_context_current(self.window)
-        
-        # Set callback for window close
-        glfw.set_window_close_callback(self.window, self.on_close_callback)
-        
-        # Setup OpenGL for 2D rendering
-        glViewport(0, 0, window_width, window_height)
-        glMatrixMode(GL_PROJECTION)
-        glLoadIdentity()
-        glOrtho(0, 1, 0, 1, -1, 1)
-        glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
-        
-        # Disable depth testing as we're doing 2D
-        glDisable(GL_DEPTH_TEST)
+        window_width = self.width * columns * self.display_scale
+        window_height = self.height * rows * self.display_scale
         
-        # Create texture for frame data
-        self.texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        from o3c_gl import RENDERERS
         
-        # Set texture parameters
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        # Prefer the shader renderer on a core profile context, fall back to the legacy one
+        window = None
+        for name in RENDERER_CHOICES[self.renderer_type]:
+            renderer_class = RENDERERS[name]
+            window = self.create_window(window_width, window_height, core_profile=name == "shader", title=title)
+            if not window:
+                continue
+            
+            # Make the window's context current
+            glfw.make_context_current(window)
+            # Only the first window waits for the screen refresh, each one waiting would divide the frame rate
+            glfw.swap_interval(1 if self.vsync and not self.views else 0)
+            
+            renderer = renderer_class(self.width, self.height, packed_upload=self.packed_upload,
+                                      columns=columns, rows=rows)
+            try:
+                renderer.setup(*glfw.get_framebuffer_size(window))
+                break
+            except Exception as e:
+                print(f"Failed to setup the {renderer_class.name} renderer: {e}")
+                glfw.destroy_window(window)
+                window = None
         
-        # Initialize texture data
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, self.width, self.height, 
-                     0, GL_RGB, GL_UNSIGNED_BYTE, self.texture_data)
+        if not window:
+            return None
         
-        # Create lookup tables for RGB565 to RGB888 conversion
-        self.r_lut = np.zeros(32, dtype=np.uint8)
-        self.g_lut = np.zeros(64, dtype=np.uint8)
-        self.b_lut = np.zeros(32, dtype=np.uint8)
+        # Icon
+        glfw.set_window_icon(window, 1, icon_image())
         
-        for i in range(32):
-            self.r_lut[i] = (i << 3) | (i >> 2)
-        for i in range(64):
-            self.g_lut[i] = (i << 2) | (i >> 4)
-        for i in range(32):
-            self.b_lut[i] = (i << 3) | (i >> 2)
-            
-        # Setup buffers for rendering a full-screen quad
-        self.setup_fullscreen_quad()
+        # Set callback for window close
+        glfw.set_window_close_callback(window, self.on_close_callback)
         
-        return True
+        return window, renderer, title
     
-    def setup_fullscreen_quad(self):
-        """Setup vertex data for a fullscreen quad."""
-        # We'll use simple immediate mode for this example
-        # For production, VBOs would be more efficient
-        self.vertices = [
-            # x, y, s, t
-            (0.0, 0.0, 0.0, 0.0),   # Bottom left
-            (1.0, 0.0, 1.0, 0.0),   # Bottom right
-            (1.0, 1.0, 1.0, 1.0),   # Top right
-            (0.0, 1.0, 0.0, 1.0),   # Top left
-        ]
+    def create_window(self, width, height, core_profile, title=None):
+        """Create the GLFW window, with a 3.3 core profile context if asked."""
+        glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3 if core_profile else 1)
+        glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3 if core_profile else 0)
+        glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE if core_profile else glfw.OPENGL_ANY_PROFILE)
+        glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, glfw.TRUE if core_profile else glfw.FALSE)  # Required on macOS
+        return glfw.create_window(width, height, title or self.base_title, None, None)
     
     def on_close_callback(self, window):
         """Handle window close event."""
         self.running = False
         
     def update_display(self):
-        """Update the display with current frame buffer data."""
-        try:
-            # Try to get a new frame if available
-            new_frame = self.frame_queue.get_nowait()
-            self.frame_buffer = new_frame
-            self.frame_queue.task_done()
-            
-            # Use vectorized operations for faster processing
-            r = self.r_lut[(self.frame_buffer >> 11) & 0x1F]
-            g = self.g_lut[(self.frame_buffer >> 5) & 0x3F]
-            b = self.b_lut[self.frame_buffer & 0x1F]
-            
-            # Update texture data
-            self.texture_data = np.stack([r, g, b], axis=2)
-            
-            # Update the texture
-            glBindTexture(GL_TEXTURE_2D, self.texture_id)
-            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.width, self.height,
-                            GL_RGB, GL_UNSIGNED_BYTE, self.texture_data)
-            
-        except queue.Empty:
-            pass  # Use last frame if no new one is available
-        
-        # Clear the screen
-        glClear(GL_COLOR_BUFFER_BIT)
+        """Update the display with current frame buffer data, returns False if nothing was drawn."""
+        # Take the newest frame from the ring, or keep the last one if none arrived
+        slot = self.frame_ring.acquire_latest(self.frame_sequence)
+        if slot is None and time.perf_counter() < self.next_redraw:
+            # Nothing new to show, the screen keeps the last frame
+            glfw.poll_events()
+            return False
+        telemetry = self.telemetry
+        if slot is not None:
+            self.frame_sequence = slot.sequence
+            picked = time.perf_counter()
+            bands = self.changes.update(slot.frame) if self.changes is not None else None
+            if bands == [] and picked < self.next_redraw:
+                # Same picture as on screen, nothing to convert, upload or swap
+                self.frame_ring.release(slot)
+                if telemetry is not None:
+                    telemetry.record_display(slot.sequence, slot.requested, slot.timestamp, picked)
+                glfw.poll_events()
+                return False
+            if telemetry is None:
+                self.renderer.upload(slot.frame, bands)
+            else:
+                # Time the color conversion and the upload apart
+                data = self.renderer.pixel_data(slot.frame, bands)
+                converted = time.perf_counter()
+                self.renderer.upload_pixels(data, bands)
+                timings = (slot.sequence, slot.requested, slot.timestamp, picked, converted, time.perf_counter())
+            self.frame_ring.release(slot)
+        self.next_redraw = time.perf_counter() + IDLE_REDRAW_INTERVAL
         
         # Draw a fullscreen quad with our texture
-        glEnable(GL_TEXTURE_2D)
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        self.renderer.draw()
+        if self.telemetry_overlay:
+            self.renderer.draw_bars(self.overlay_bars)
         
-        glBegin(GL_QUADS)
-        for x, y, s, t in self.vertices:
-            glTexCoord2f(s, 1-t)
-            glVertex2f(x, y)
-        glEnd()
-        
-        # Display FPS in the window title
-        self.fps_counter += 1
-        current_time = time.time()
-        if current_time - self.last_update_time >= 1.0:
-            self.fps = self.fps_counter
-            glfw.set_window_title(self.window, f"{self.base_title} - FPS: {self.fps}")
-            self.fps_counter = 0
-            self.last_update_time = current_time
+        self.count_frame(slot is not None)
         
         # Swap buffers to display the frame
         glfw.swap_buffers(self.window)
+        if telemetry is not None and slot is not None:
+            telemetry.record_display(*timings, time.perf_counter())
         
         # Poll for events
         glfw.poll_events()
+        return True
     
-    def update_packet_checksums(self):
-        """Pre-calculate checksums for all packets."""
-        for packet in self.packets:
-            # Calculate checksum
-            packet[2] = 0
-            packet[3] = 0
-            checksum = 0
-            for j in range(0, len(packet), 2):
-                checksum += (packet[j] | (packet[j+1] << 8))
-            packet[2] = checksum & 0xFF
-            packet[3] = (checksum >> 8) & 0xFF
-    
-    def read_frame_buffer_optimized(self):
-        """Optimized reading from the HID device."""
-        if not self.device:
-            return
-        
-        # Update checksums for packets (only once per batch)
-        self.update_packet_checksums()
-        
-        # Send all packets in batch
-        for packet in self.packets:
-            try:
-                self.device.write(bytes(packet))
-            except Exception as e:
-                print(f"Failed to write to device: {e}")
-                return
-        
-        # Create a new buffer for this frame
-        new_raw_buffer = np.zeros(self.width * self.height, dtype=np.uint16)
-        
-        # Read all responses with minimal delay
-        offset = 0
-        start_read_time = time.time()
-        timeouts = 0
-        
-        while offset < len(new_raw_buffer) and timeouts < 5:
-            try:
-                # Try to read data (non-blocking)
-                response = self.device.read(1024)
-                
-                if not response:
-                    # No data yet, small sleep and try again
-                    time.sleep(0.0001)  # 0.1ms sleep
-                    if time.time() - start_read_time > 0.05:  # 50ms timeout
-                        timeouts += 1
-                    continue
-                
-                # We got data, process it
-                data_len = min(response[4] | (response[5] << 8), 0x3FC) - 8
-                if data_len <= 0:
+    def update_devices(self):
+        """Show the newest frame of every device in its tile of the atlas, or in its own window.
+
+        All the tiles are drawn with a single quad, so another device only
+        adds the upload of its own frame. Returns False if nothing was drawn.
+        """
+        redraw = time.perf_counter() >= self.next_redraw
+        switch = len(self.views) > 1  # Each window has its own context
+        drawn = False
+        new_frame = False
+        for view, (window, renderer, _) in enumerate(self.views):
+            changed = False
+            for index in ([view] if self.window_per_device else range(len(self.workers))):
+                worker = self.workers[index]
+                slot = worker.acquire_latest(self.device_sequences[index])
+                if slot is None:
                     continue
-                
-                # Calculate position in the raw buffer from the response header
-                pos = response[8] | (response[9] << 8) | (response[10] << 16) | (response[11] << 24)
-                pos = pos // 2  # Convert byte offset to 16-bit word offset
-                
-                # Extract data directly to raw buffer
-                resp_offset = 0xC  # Data starts at offset 12
-                
-                for j in range(0, data_len, 2):
-                    idx = pos + j//2
-                    if idx < self.width * self.height:
-                        new_raw_buffer[idx] = response[resp_offset + j] | (response[resp_offset + j + 1] << 8)
-                
-                offset += data_len // 2
-                            
-            except Exception as e:
-                print(f"Error reading from device: {e}")
-                return
+                self.device_sequences[index] = slot.sequence
+                bands = self.device_changes[index].update(slot.frame) if self.device_changes else None
+                if bands != []:
+                    if switch and not changed:
+                        glfw.make_context_current(window)
+                    renderer.upload(slot.frame, bands, 0 if self.window_per_device else index)
+                    changed = new_frame = True
+                worker.release(slot)
+            if not (changed or redraw):
+                continue
+            if switch and not changed:
+                glfw.make_context_current(window)
+            renderer.draw()
+            glfw.swap_buffers(window)
+            drawn = True
         
-        # Direct reshape and put in queue
-        try:
-            self.frame_queue.put_nowait(new_raw_buffer.reshape(self.height, self.width))
-        except queue.Full:
-            pass  # Skip this frame if queue is full
+        if drawn:
+            self.next_redraw = time.perf_counter() + IDLE_REDRAW_INTERVAL
+            self.count_frame(new_frame)
+        glfw.poll_events()
+        return drawn
     
-    def prepare_packets(self):
-        """Build optimized packet structures."""
-        self.packets = []
-        
-        chunk_size = 0x3F4  # Original chunk size
-        total_size = self.width * self.height * 2
-        
-        # Create more optimized chunks for faster retrieval
-        num_chunks = (total_size + chunk_size - 1) // chunk_size
-        
-        for i in range(num_chunks):
-            offset = i * chunk_size
-            
-            # Create packet
-            packet = bytearray([0x22, 0x03, 0x00, 0x00, 0x08, 0x00, 0x25, 0x00, 0x00, 0x00, 0x00, 0x00])
-            packet.extend([0] * (1024 - len(packet)))  # Pad to 1024 bytes
-            
-            # Update packet offset
-            packet[8] = offset & 0xFF
-            packet[9] = (offset >> 8) & 0xFF
-            packet[10] = (offset >> 16) & 0xFF
-            packet[11] = (offset >> 24) & 0xFF
-            
-            self.packets.append(packet)
+    def count_frame(self, new_frame=True):
+        """Count a drawn frame, unless it only redrew the last one, and show the FPS in the window titles once a second."""
+        if new_frame:
+            self.fps_counter += 1
+        current_time = time.time()
+        if current_time - self.last_update_time >= 1.0:
+            self.fps = self.fps_counter
+            status = f" - FPS: {self.fps}"
+            if self.display_scheduler and self.display_scheduler.missed:
+                status += f" - missed: {self.display_scheduler.missed}"
+            detectors = self.device_changes or ([self.changes] if self.changes is not None else [])
+            frames = sum(changes.frames for changes in detectors)
+            if frames:
+                status += f" - unchanged: {sum(changes.unchanged_frames for changes in detectors) / frames:.0%}"
+            lost = sum(1 for supervisor in self.supervisors() if not supervisor.connected)
+            if lost:
+                status += f" - reconnecting: {lost} device{'s' if lost > 1 else ''}"
+            if self.telemetry is not None:
+                p50, _, p99 = self.telemetry.percentiles('latency')
+                status += f" - latency p50/p99: {p50:.1f}/{p99:.1f} ms"
+                if self.telemetry_overlay:
+                    self.update_overlay()
+            for window, _, title in self.views:
+                glfw.set_window_title(window, title + status)
+            self.fps_counter = 0
+            self.last_update_time = current_time
+    
+    def update_overlay(self):
+        """Rebuild the overlay bars, a row per stage with its p99 dimmed behind its p50."""
+        from o3c_telemetry import STAGES
+        scale = self.renderer.viewport[0] / OVERLAY_FULL_SCALE_MS
+        self.overlay_bars = []
+        for stage, color in zip(STAGES, OVERLAY_COLORS):
+            p50, _, p99 = self.telemetry.percentiles(stage)
+            if p50 == p50:  # NaN until the stage has samples
+                dim = tuple(channel * 0.4 for channel in color)
+                self.overlay_bars.append([(p99 * scale, dim), (p50 * scale, color)])
     
     def device_loop(self):
         """Main loop for reading from the device."""
+        # Capture runs at its own rate, independent of the display
+        capture = FrameScheduler(self.capture_rate)
         while self.running:
             if glfw.window_should_close(self.window):
                 self.running = False
                 break
             self.read_frame_buffer_optimized()
+            capture.wait()
+    
+    def start_capture_process(self):
+        """Start reading the device in a child process, frames then come in through shared memory."""
+        from o3c_capture import device_infos, import_hid
+        from o3c_process import CaptureProcess
+        if self.transfer_profile:
+            try:
+                self.apply_profile(device_infos(load_hid(), self.vendor_id, self.product_id, self.usage_page)[0])
+            except IOError:
+                pass  # No device, the child tells why
+        self.resolve_transfer()
+        self.capture = CaptureProcess(self.vendor_id, self.product_id, self.usage_page, self.width, self.height,
+                                      self.chunk_size, self.pipeline_window, self.blocking_reads,
+                                      self.capture_rate, hid_factory=self.hid_factory or import_hid,
+                                      name=self.shared_memory, timeout=self.read_timeout)
+        if not self.capture.start():
+            print(self.capture.error)
+            return False
+        print(f"Connected to {self.capture.description} (capture process)")
+        if self.record:
+            print("Recording needs the reader thread, nothing is recorded with the capture process")
+        # Takes the place of the frame ring, it hands out frames the same way
+        self.frame_ring = self.capture
+        return True
+    
+    def stop_capture_process(self):
+        """Stop the child process and report why it stopped early, if it did."""
+        self.capture.stop()
+        if self.capture.error:
+            print(self.capture.error)
+        print(self.capture.summary())
+    
+    def open_remote(self):
+        """Show the frames of a frame server on another machine instead of the device."""
+        from o3c_net import FrameClient, parse_address
+        self.client = FrameClient(*parse_address(self.remote))
+        if not self.client.start():
+            print(self.client.error)
+            return False
+        print(f"Connected to the frame server at {self.remote}")
+        self.width, self.height = self.client.width, self.client.height
+        # Takes the place of the frame ring, it hands out frames the same way
+        self.frame_ring = self.client
+        return True
+    
+    def open_source(self):
+        """Open where the frames come from: a recording, a frame server, a capture process, every device or one."""
+        if not self.playback:
+            if self.remote:
+                return self.open_remote()
+            if self.capture_process:
+                return self.start_capture_process()
+            if self.all_devices:
+                return self.open_all_devices()
+        return super().open_source()
+    
+    def open_source_and_window(self):
+        """Open the frame source and set up OpenGL, returning whether each of them worked.
+
+        Looking for the device and creating the window both take a while, so
+        they run at the same time, unless the size of the window depends on
+        the source: a recording, a frame server or several devices.
+        """
+        if self.playback or self.remote or self.all_devices:
+            if not self.open_source():
+                return False, False
+            return True, self.setup_opengl()
+        opened = []
+        opener = threading.Thread(target=lambda: opened.append(self.open_source()), daemon=True)
+        opener.start()
+        # GLFW wants the main thread
+        window = self.setup_opengl()
+        opener.join()
+        return bool(opened and opened[0]), window
     
     def start(self):
         """Start the listener."""
-        if self.find_and_open_device():
+        opened, window = self.open_source_and_window()
+        if opened:
             self.running = True
             
-            # Prepare packets once 
-            self.prepare_packets()
-            
             # Setup OpenGL
-            if not self.setup_opengl():
+            if not window:
                 print("Failed to setup OpenGL")
+                self.close_source()
                 return
+            self.start_export()
             
             # Start device reader thread
-            self.reader_thread = threading.Thread(target=self.device_loop, daemon=True)
-            self.reader_thread.start()
+            self.start_reader()
             
-            # Main rendering loop
+            # Main rendering loop, woken on absolute deadlines so the display rate does not drift
+            self.display_scheduler = FrameScheduler(self.fps_limit)
             try:
                 while self.running and not glfw.window_should_close(self.window):
-                    self.update_display()
-                    
-                    # FPS control (kinda meh but whatever)
-                    # musthave not to overload the PC
-                    time.sleep(1/self.fps_limit)
+                    if self.capture is not None and not self.capture.poll():
+                        break  # The capture process stopped, its error is printed below
+                    if self.client is not None and not self.client.poll():
+                        break  # The server went away, same
+                    if self.workers:
+                        if not any(worker.running for worker in self.workers):
+                            break  # Every device failed, their errors were printed
+                        self.update_devices()
+                    else:
+                        self.update_display()
+                    self.display_scheduler.wait()
             except Exception as e:
                 print(f"Error in main loop: {e}")
             finally:
+                if self.display_scheduler.missed:
+                    print(f"Missed {self.display_scheduler.missed} of {self.display_scheduler.ticks} display deadlines")
+                for worker, changes in zip(self.workers, self.device_changes):
+                    print(f"{worker.description}: {changes.summary()}")
                 # Clean up
-                if self.device:
-                    self.device.close()
+                self.finish()
                 glfw.terminate()
         else:
+            if window:
+                glfw.terminate()
             print("Failed to start HID listener - device not found or could not be opened")
+    
+    def close_source(self):
+        """Close whatever ``open_source`` opened."""
+        super().close_source()
+        for worker in self.workers:
+            worker.stop()
+        if self.capture is not None:
+            self.stop_capture_process()
+        if self.client is not None:
+            self.client.stop()
+            if self.client.error:
+                print(self.client.error)
+            if self.client.dropped:
+                print(f"Dropped {self.client.dropped} frames of the server, every frame slot was held")
 
 if __name__ == "__main__":
     # Create and start the HID listener
-    # listener = HIDListener(fps_limit=71)  # 60 +-5 FPS
-    listener = HIDListener(fps_limit=0)     # unlim (144) FPS
+    # listener = HIDListener(fps_limit=60)  # 60 FPS
+    # listener = HIDListener(vsync=True)     # Follow the screen refresh
+    listener = HIDListener(fps_limit=0)     # unlim (200) FPS
     listener.start()
\ No newline at end of file
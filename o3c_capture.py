@@ -0,0 +1,699 @@
+"""Opening an O3C and capturing frames from it, shared by both viewers."""
+import math
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from o3c_pacing import FrameScheduler
+from o3c_protocol import REPORT_SIZE, decode_report, response_offset
+
+
+def import_hid():
+    import hid
+    return hid
+
+
+def device_infos(hid, vendor_id, product_id, usage_page):
+    """``hid.enumerate`` entries of the screen interface of every connected O3C, raising IOError when there is none."""
+    devices = hid.enumerate(vendor_id, product_id)
+    if not devices:
+        raise IOError(f"No devices found with VID={hex(vendor_id)}, PID={hex(product_id)}")
+    infos = [device for device in devices if device['usage_page'] == usage_page]
+    if not infos:
+        raise IOError(f"Found devices, but none with usage_page={hex(usage_page)}")
+    return infos
+
+
+def device_paths(hid, vendor_id, product_id, usage_page):
+    """Paths of the screen interface of every connected O3C, raising IOError when there is none."""
+    return [info['path'] for info in device_infos(hid, vendor_id, product_id, usage_page)]
+
+
+def open_device(hid, vendor_id, product_id, usage_page, blocking, path=None):
+    """Open the screen interface at ``path``, or of the first O3C, raising IOError with the reason when it can't."""
+    if path is None:
+        path = device_paths(hid, vendor_id, product_id, usage_page)[0]
+
+    device = hid.device()
+    device.open_path(path)
+    device.set_nonblocking(0 if blocking else 1)
+    return device
+
+
+def describe_busy(wait_time, work_time):
+    """How long a reader waited on the device and worked, for the exit summaries."""
+    total = wait_time + work_time
+    return (f"reader waited {wait_time:.2f} s for the device and worked {work_time:.2f} s "
+            f"({work_time / total if total else 0.0:.0%} busy)")
+
+
+class FrameSlot:
+    """One preallocated frame of a ``FrameRing``."""
+
+    __slots__ = ('index', 'pixels', 'frame', 'valid', 'sequence', 'timestamp', 'readers', 'writing',
+                 'requested', 'written', 'first_response', 'last_response', 'decode_time')
+
+    def __init__(self, index, width, height, chunks):
+        self.index = index
+        self.pixels = np.zeros(width * height, dtype=np.uint16)  # Flat view the reader decodes into
+        self.frame = self.pixels.reshape(height, width)           # Same memory, shaped for rendering
+        self.valid = np.zeros(chunks, dtype=bool)                 # Which chunks arrived for this frame
+        self.sequence = -1
+        self.timestamp = 0.0
+        self.readers = 0
+        self.writing = False
+        self.reset_timings()
+
+    def reset_timings(self):
+        """Clear the stage timestamps, all but ``requested`` are only filled in when the reader has telemetry."""
+        self.requested = 0.0       # First request of the frame written
+        self.written = 0.0         # Last request of the frame written
+        self.first_response = 0.0
+        self.last_response = 0.0
+        self.decode_time = 0.0     # Seconds spent decoding and publishing
+
+
+class FrameRing:
+    """Preallocated frame slots handed back and forth between reader and renderer.
+
+    The reader takes a free slot with ``acquire_write``, decodes into it and
+    hands it over with ``publish``. Chunks that did not arrive keep the
+    pixels of the previously published frame, so a hiccup on the bus never
+    shows up as black holes. Renderers take the newest frame with
+    ``acquire_latest`` and give it back with ``release``. Nothing is
+    allocated once the ring exists and neither side ever waits for the other.
+    """
+
+    def __init__(self, plan, slots=4):
+        self.plan = plan
+        self.slots = [FrameSlot(i, plan.width, plan.height, len(plan)) for i in range(slots)]
+        self.lock = threading.Lock()
+        self.latest = None
+        self.sequence = 0
+        self.carried_chunks = 0  # Chunks filled in from the previous frame
+
+        # Pixel range each chunk owns, up to where the next one starts
+        starts = [offset // 2 for offset in plan.offsets]
+        ends = starts[1:] + [plan.width * plan.height]
+        self.chunk_ranges = list(zip(starts, ends))
+
+    def acquire_write(self):
+        """Take a slot that nobody is reading, for the reader to decode into."""
+        with self.lock:
+            for slot in self.slots:
+                if not slot.writing and not slot.readers and slot is not self.latest:
+                    slot.writing = True
+                    slot.valid[:] = False
+                    slot.reset_timings()
+                    return slot
+        raise RuntimeError("No free frame slot, the ring is too small for the pipeline window")
+
+    def publish(self, slot):
+        """Make a fully decoded slot the latest frame."""
+        previous = self.latest
+        if previous is not None and not slot.valid.all():
+            # Keep the previous frame's pixels where chunks are missing
+            for chunk in np.flatnonzero(~slot.valid):
+                start, end = self.chunk_ranges[chunk]
+                slot.pixels[start:end] = previous.pixels[start:end]
+                self.carried_chunks += 1
+
+        with self.lock:
+            slot.writing = False
+            slot.sequence = self.sequence
+            slot.timestamp = time.perf_counter()
+            self.sequence += 1
+            self.latest = slot
+
+    def discard(self, slot):
+        """Give a slot back without publishing it."""
+        with self.lock:
+            slot.writing = False
+
+    def discard_writes(self):
+        """Give back every slot still being decoded into, after the reader failed halfway through its frames."""
+        with self.lock:
+            for slot in self.slots:
+                slot.writing = False
+
+    def acquire_latest(self, after=-1):
+        """Take the newest frame if it is newer than sequence ``after``, else None."""
+        with self.lock:
+            slot = self.latest
+            if slot is None or slot.sequence <= after:
+                return None
+            slot.readers += 1
+            return slot
+
+    def release(self, slot):
+        """Give back a slot taken with ``acquire_latest``."""
+        with self.lock:
+            slot.readers -= 1
+
+
+class ChangeDetector:
+    """Finds the rows of a frame that differ from the last frame shown.
+
+    ``update`` returns the changed rows as (start, end) bands, empty for a
+    frame identical to the previous one, so the renderer can skip the
+    conversion and upload or limit them to those rows. Bands less than
+    ``gap`` rows apart are merged, every upload has a fixed cost.
+    """
+
+    def __init__(self, width, height, gap=4):
+        self.gap = gap
+        self.previous = np.zeros((height, width), dtype=np.uint16)  # Copy of the frame on screen
+        self.difference = np.zeros((height, width), dtype=bool)
+        self.all_rows = [(0, height)]
+        self.primed = False
+
+        # Statistics
+        self.frames = 0
+        self.unchanged_frames = 0
+        self.changed_rows = 0
+
+    def reset(self):
+        """Forget the frame on screen, the next one is all changed."""
+        self.primed = False
+
+    def update(self, frame):
+        """The bands of ``frame`` that changed since the last call, empty if none."""
+        self.frames += 1
+        if not self.primed:
+            np.copyto(self.previous, frame)
+            self.primed = True
+            self.changed_rows += self.previous.shape[0]
+            return self.all_rows
+
+        np.not_equal(frame, self.previous, out=self.difference)
+        rows = np.flatnonzero(self.difference.any(axis=1))
+        if not len(rows):
+            self.unchanged_frames += 1
+            return []
+
+        # Split where consecutive changed rows are further apart than the gap
+        breaks = np.flatnonzero(np.diff(rows) > self.gap)
+        starts = rows[np.concatenate(([0], breaks + 1))]
+        ends = rows[np.concatenate((breaks, [len(rows) - 1]))] + 1
+        bands = list(zip(starts.tolist(), ends.tolist()))
+        for start, end in bands:
+            self.previous[start:end] = frame[start:end]
+            self.changed_rows += end - start
+        return bands
+
+    def skip_ratio(self):
+        """Share of the frames that were identical to the previous one."""
+        return self.unchanged_frames / self.frames if self.frames else 0.0
+
+    def summary(self):
+        rows = self.changed_rows / (self.frames * self.previous.shape[0]) if self.frames else 0.0
+        return (f"Unchanged frames: {self.unchanged_frames} of {self.frames} ({self.skip_ratio():.0%} skipped), "
+                f"{rows:.0%} of the rows uploaded")
+
+
+class CaptureWorker:
+    """Captures one device on its own thread, into its own ``FrameRing``.
+
+    Used to show several O3Cs at once: every device is read at its own pace,
+    so a slow one never holds up the others. A ``DeviceSupervisor`` reopens
+    the device with ``reopen`` when it goes away, meanwhile the ring keeps
+    the last frame it published. Frames are taken with ``acquire_latest``
+    and ``release`` like from a ring.
+    """
+
+    def __init__(self, device, plan, reopen, window=0, blocking=False, capture_rate=0, description="", timeout=0.05):
+        self.description = description
+        self.capture_rate = capture_rate
+        self.ring = FrameRing(plan, FrameReader.ring_slots(plan, window))
+        self.supervisor = DeviceSupervisor(device, self.ring, reopen, lambda device: FrameReader(
+            device, self.ring, window=window, timeout=timeout, blocking=blocking), description)
+        self.thread = None
+        self.running = False
+        self.error = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        capture = FrameScheduler(self.capture_rate)
+        try:
+            while self.running:
+                self.supervisor.read_frame()
+                capture.wait()
+        except Exception as e:
+            self.error = e
+            print(f"Error capturing from {self.description}: {e}")
+        finally:
+            self.running = False
+
+    def stop(self):
+        """Stop capturing and close the device."""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.supervisor.close()
+
+    def acquire_latest(self, after=-1):
+        return self.ring.acquire_latest(after)
+
+    def release(self, slot):
+        self.ring.release(slot)
+
+
+class PendingFrame:
+    """A frame whose chunk requests are (partly) in flight."""
+
+    __slots__ = ('sequence', 'started', 'slot', 'unresolved', 'received', 'missing')
+
+    def __init__(self, sequence, slot, chunks):
+        self.sequence = sequence
+        self.started = time.perf_counter()
+        self.slot = slot
+        self.unresolved = chunks  # Chunks neither answered nor timed out yet
+        self.received = 0
+        self.missing = 0
+
+
+class FrameReader:
+    """Reads whole frames from an open device using a ``RequestPlan``.
+
+    With ``window`` set to 0 the reader works in lockstep: every request of a
+    frame is written, then every response is drained before the next frame
+    starts. A positive ``window`` pipelines the capture instead, keeping that
+    many chunk requests in flight at all times so the requests of the next
+    frame go out while the responses of the current one are still arriving.
+    Responses are matched to their frame by the offset in their header. A
+    window smaller than one frame's requests is raised to that: lockstep
+    already has a whole frame in flight, less would only be slower.
+
+    With ``blocking`` the reader sleeps in hidapi's timed ``read`` instead of
+    polling a non-blocking device, bounded by a deadline per chunk
+    (``timeout``) and per frame (``frame_timeout``). Either way the time spent
+    waiting for the device and working is tracked in ``wait_time`` and
+    ``work_time``.
+
+    Frames are decoded into slots of ``ring`` and published there, and also
+    into ``shared`` (a ``SharedFrameRing``) for other processes. Given a
+    ``Telemetry``, the reader also timestamps every stage of each frame.
+    """
+
+    def __init__(self, device, ring, window=0, timeout=0.05, max_timeouts=5, blocking=False, frame_timeout=0.1,
+                 telemetry=None, shared=None):
+        self.device = device
+        self.ring = ring
+        self.plan = plan = ring.plan
+        self.window = window = self.pipeline_window(plan, window)
+        self.timeout = timeout              # Seconds to wait for a response
+        self.max_timeouts = max_timeouts    # Empty polls past the timeout before giving up on a frame
+        self.blocking = blocking
+        self.frame_timeout = frame_timeout  # Seconds a frame may take before its missing chunks are given up
+        self.chunk_index = {offset: index for index, offset in enumerate(plan.offsets)}
+        self.telemetry = telemetry
+        self.shared = shared
+
+        # Pipelined state
+        self.next_sequence = 0
+        self.next_chunk = 0
+        self.in_flight = 0
+        self.waiting = {offset: deque() for offset in plan.offsets}  # offset -> (frame sequence, sent time)
+        self.pending = deque()                                       # PendingFrame, oldest first
+        # Frames resolve oldest first, so while the oldest waits for a lost chunk the window stops
+        # at as many frames as the ring has slots to write into
+        self.max_pending = window // len(plan) + 2
+
+        # Statistics
+        self.frames = 0
+        self.partial_frames = 0
+        self.timeouts = 0
+        self.wait_time = 0.0   # Seconds spent waiting on the device
+        self.work_time = 0.0   # Seconds spent writing requests and decoding
+
+    @staticmethod
+    def pipeline_window(plan, window):
+        """The window a reader uses when asked for ``window``, at least one frame's requests unless 0."""
+        return max(window, len(plan)) if window > 0 else 0
+
+    @staticmethod
+    def ring_slots(plan, window=0, consumers=1):
+        """How many ring slots a reader with this window needs to never run dry."""
+        window = FrameReader.pipeline_window(plan, window)
+        writing = window // len(plan) + 2 if window > 0 else 1  # max_pending of a pipelined reader
+        # Each consumer may briefly hold both its current and the next frame
+        return writing + 1 + 2 * consumers
+
+    def busy_ratio(self):
+        """Fraction of the reader's time spent working rather than waiting."""
+        total = self.wait_time + self.work_time
+        return self.work_time / total if total else 0.0
+
+    def read_frame(self):
+        """Read and publish the next frame, returning its slot or None if nothing arrived."""
+        start = time.perf_counter()
+        wait_time = self.wait_time
+        try:
+            if self.window > 0:
+                return self.read_frame_pipelined()
+            if self.blocking:
+                return self.read_frame_blocking()
+            return self.read_frame_lockstep()
+        finally:
+            self.work_time += time.perf_counter() - start - (self.wait_time - wait_time)
+
+    def read_response(self, deadline=None):
+        """Read one response, blocking until ``deadline`` in blocking mode.
+
+        Returns an empty list when nothing arrived. In polling mode an empty
+        read is followed by a short sleep, which counts as waiting.
+        """
+        start = time.perf_counter()
+        if self.blocking:
+            timeout_ms = max(1, math.ceil((deadline - start) * 1000))
+            response = self.device.read(REPORT_SIZE, timeout_ms)
+        else:
+            # Try to read data (non-blocking)
+            response = self.device.read(REPORT_SIZE)
+            if not response:
+                # No data yet, small sleep and try again
+                time.sleep(0.0001)  # 0.1ms sleep
+        self.wait_time += time.perf_counter() - start
+        return response
+
+    def read_frame_lockstep(self):
+        """Request a whole frame and poll for all of its responses."""
+        # Decode into a free slot of the ring
+        slot = self.ring.acquire_write()
+
+        # Send all packets in batch, they are already checksummed
+        self.write_frame(slot)
+
+        # Read all responses with minimal delay
+        received = 0
+        start_read_time = time.time()
+        timeouts = 0
+
+        while received < len(self.plan) and timeouts < self.max_timeouts:
+            response = self.read_response()
+
+            if not response:
+                if time.time() - start_read_time > self.timeout:
+                    timeouts += 1
+                continue
+
+            # We got data, decode it straight into the frame
+            received += self.decode_into(response, slot)
+
+        return self.finish_frame(slot, received)
+
+    def read_frame_blocking(self):
+        """Request a whole frame and block on its responses until a deadline passes."""
+        slot = self.ring.acquire_write()
+        self.write_frame(slot)
+
+        received = 0
+        now = time.perf_counter()
+        frame_deadline = now + self.frame_timeout
+        chunk_deadline = now + self.timeout
+
+        while received < len(self.plan):
+            deadline = min(chunk_deadline, frame_deadline)
+            if time.perf_counter() >= deadline:
+                break
+
+            response = self.read_response(deadline)
+            if response and self.decode_into(response, slot):
+                received += 1
+                chunk_deadline = time.perf_counter() + self.timeout
+
+        return self.finish_frame(slot, received)
+
+    def write_frame(self, slot):
+        """Write every request of a lockstep frame."""
+        slot.requested = time.perf_counter()
+        for packet in self.plan.packets:
+            self.device.write(packet)
+        if self.telemetry is not None:
+            slot.written = time.perf_counter()
+
+    def decode_into(self, response, slot):
+        """Decode a response into a slot and flag its chunk, returning 1 if it carried pixels."""
+        if self.telemetry is not None:
+            start = time.perf_counter()
+            if not slot.first_response:
+                slot.first_response = start
+            slot.last_response = start
+        if not decode_report(response, slot.pixels):
+            return 0
+        chunk = self.chunk_index.get(response_offset(response))
+        if chunk is not None:
+            slot.valid[chunk] = True
+        if self.telemetry is not None:
+            slot.decode_time += time.perf_counter() - start
+        return 1
+
+    def publish(self, slot, received):
+        """Publish a slot that got ``received`` of its chunks, or give it back if it got none."""
+        if not received:
+            self.ring.discard(slot)
+            slot = None
+        elif self.telemetry is None:
+            self.ring.publish(slot)
+        else:
+            start = time.perf_counter()
+            self.ring.publish(slot)
+            slot.decode_time += time.perf_counter() - start
+        if self.shared is not None and slot is not None:
+            self.shared.publish(slot.frame, slot.timestamp, slot.requested)
+        if self.telemetry is not None:
+            self.telemetry.record_capture(slot, max(0, len(self.plan) - received))
+        return slot
+
+    def finish_frame(self, slot, received):
+        """Publish a lockstep frame that got ``received`` of its chunks."""
+        self.frames += 1
+        if received < len(self.plan):
+            self.partial_frames += 1
+            self.timeouts += len(self.plan) - received
+        return self.publish(slot, received)
+
+    def read_frame_pipelined(self):
+        """Keep the request window full until the oldest pending frame is resolved."""
+        while True:
+            self.fill_window()
+
+            frame = self.pop_resolved_frame()
+            if frame is not None:
+                return self.publish(frame.slot, frame.received)  # None if nothing came back at all
+
+            response = self.read_response(self.next_deadline() if self.blocking else None)
+            if not response:
+                self.expire_requests()
+                continue
+
+            waiting = self.waiting.get(response_offset(response))
+            if not waiting:
+                continue  # Late answer to a request that already timed out
+
+            sequence, _ = waiting.popleft()
+            self.in_flight -= 1
+            frame = self.pending[sequence - self.pending[0].sequence]
+            frame.unresolved -= 1
+            if self.decode_into(response, frame.slot):
+                frame.received += 1
+            else:
+                frame.missing += 1
+
+    def fill_window(self):
+        """Write chunk requests until ``window`` of them are in flight."""
+        plan = self.plan
+        while self.in_flight < self.window:
+            if self.next_chunk == 0:
+                if len(self.pending) >= self.max_pending:
+                    break
+                self.pending.append(PendingFrame(self.next_sequence, self.ring.acquire_write(), len(plan)))
+                self.pending[-1].slot.requested = self.pending[-1].started
+
+            self.device.write(plan.packets[self.next_chunk])
+            self.waiting[plan.offsets[self.next_chunk]].append((self.next_sequence, time.perf_counter()))
+            self.in_flight += 1
+
+            self.next_chunk += 1
+            if self.next_chunk == len(plan):
+                if self.telemetry is not None:
+                    self.pending[-1].slot.written = time.perf_counter()
+                self.next_chunk = 0
+                self.next_sequence += 1
+
+    def pop_resolved_frame(self):
+        """Take the oldest pending frame once all of its chunks have been requested and resolved."""
+        if not self.pending:
+            return None
+        frame = self.pending[0]
+        if frame.unresolved:
+            return None
+
+        self.pending.popleft()
+        self.frames += 1
+        if frame.missing:
+            self.partial_frames += 1
+        return frame
+
+    def next_deadline(self):
+        """When the oldest pending frame or request runs out of time."""
+        deadline = self.pending[0].started + self.frame_timeout if self.pending else math.inf
+        for waiting in self.waiting.values():
+            if waiting:
+                deadline = min(deadline, waiting[0][1] + self.timeout)
+        return deadline
+
+    def expire_requests(self):
+        """Give up on requests past their chunk or frame deadline, returning how many."""
+        expired = 0
+        now = time.perf_counter()
+        sent_before = now - self.timeout
+        # Requests of a frame past its deadline are all given up at once
+        late_frame = self.pending[0].sequence if self.pending and now - self.pending[0].started > self.frame_timeout else -1
+        for waiting in self.waiting.values():
+            while waiting and (waiting[0][1] < sent_before or waiting[0][0] <= late_frame):
+                sequence, _ = waiting.popleft()
+                frame = self.pending[sequence - self.pending[0].sequence]
+                frame.unresolved -= 1
+                frame.missing += 1
+                self.in_flight -= 1
+                expired += 1
+        self.timeouts += expired
+        return expired
+
+
+CONNECTED = "connected"        # Reading frames
+RECONNECTING = "reconnecting"  # The device went away, waiting to look for it again
+
+
+class DeviceSupervisor:
+    """Keeps reading frames from a device that may be unplugged and plugged back in.
+
+    A small state machine around the device handle. While ``CONNECTED``
+    frames are read into ``ring`` by the reader ``make_reader(device)``
+    returns. The first read error closes the device, gives back the slots
+    that were being decoded and switches to ``RECONNECTING``: every attempt
+    calls ``reopen()``, which enumerates the devices again and returns an
+    open one or raises, and failed attempts back off from ``backoff`` up to
+    ``max_backoff`` seconds. Meanwhile nothing is published, so the ring
+    keeps handing out the last good frame. Once the device is back, the time
+    it took is kept in ``recover_times``. Every change of state is told to
+    ``report``, after ``state`` and ``error`` were updated.
+    """
+
+    def __init__(self, device, ring, reopen, make_reader, description="device", backoff=0.1, max_backoff=1.0,
+                 poll_interval=0.05, report=print):
+        self.device = device
+        self.ring = ring
+        self.reopen = reopen
+        self.make_reader = make_reader
+        self.description = description
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.report = report
+        self.reader = make_reader(device)
+        self.state = CONNECTED
+        self.error = None           # Why the device was lost the last time
+        self.delay = backoff        # Current wait between attempts
+        self.retry_at = 0.0
+        self.lost_at = 0.0
+        self.attempts = 0           # Attempts since the device was lost
+
+        # Statistics
+        self.frames = 0             # Frames published, across reconnects
+        self.disconnects = 0
+        self.recover_times = []     # Seconds from losing the device to reading from it again
+        self.wait_time = 0.0        # Seconds the readers before the current one waited on the device
+        self.work_time = 0.0        # And worked
+
+    @property
+    def connected(self):
+        return self.state == CONNECTED
+
+    def read_frame(self):
+        """Read the next frame, or try to get the device back, returning the published slot or None.
+
+        Device errors never get out of here. While reconnecting this sleeps
+        at most ``poll_interval`` seconds, so a caller looping on it neither
+        spins nor takes long to stop.
+        """
+        if self.state == CONNECTED:
+            try:
+                slot = self.reader.read_frame()
+            except Exception as e:
+                self.lose(e)
+                return None
+            if slot is not None:
+                self.frames += 1
+            return slot
+
+        wait = self.retry_at - time.perf_counter()
+        if wait > 0:
+            time.sleep(min(wait, self.poll_interval))
+            return None
+        self.reconnect()
+        return None
+
+    def lose(self, error):
+        """Close the failed device and start reconnecting."""
+        self.error = error
+        self.state = RECONNECTING
+        self.disconnects += 1
+        self.attempts = 0
+        self.delay = self.backoff
+        self.lost_at = time.perf_counter()
+        self.retry_at = self.lost_at + self.delay
+        self.close()
+        # Half decoded frames never get published, their slots go back to the ring
+        self.ring.discard_writes()
+        self.wait_time += self.reader.wait_time
+        self.work_time += self.reader.work_time
+        self.reader = None
+        self.report(f"Lost {self.description}: {error}, reconnecting")
+
+    def reconnect(self):
+        """Look for the device once, returning True if it is back."""
+        self.attempts += 1
+        try:
+            device = self.reopen()
+        except Exception:
+            self.delay = min(self.delay * 2, self.max_backoff)
+            self.retry_at = time.perf_counter() + self.delay
+            return False
+        self.device = device
+        self.reader = self.make_reader(device)
+        self.state = CONNECTED
+        recovered = time.perf_counter() - self.lost_at
+        self.recover_times.append(recovered)
+        self.report(f"Reconnected {self.description} after {recovered:.2f} s ({self.attempts} attempts)")
+        return True
+
+    def close(self):
+        """Close the device, if it is open."""
+        if self.device is not None:
+            try:
+                self.device.close()
+            except Exception:
+                pass  # Already gone
+            self.device = None
+
+    def reader_times(self):
+        """Seconds every reader so far waited on the device and worked."""
+        if self.reader is None:
+            return self.wait_time, self.work_time
+        return self.wait_time + self.reader.wait_time, self.work_time + self.reader.work_time
+
+    def summary(self):
+        if not self.disconnects:
+            return f"{self.description}: never disconnected"
+        times = ", ".join(f"{seconds:.2f}" for seconds in self.recover_times) or "-"
+        pending = "" if self.connected else ", still disconnected"
+        return f"{self.description}: disconnected {self.disconnects} times, recovered after {times} s{pending}"
@@ -0,0 +1,117 @@
+"""RGB565 color conversion through one 65,536-entry lookup table per output format.
+
+Every RGB565 value maps to one output pixel, so a frame converts in a single
+gather (``np.take``) straight into the caller's buffer, instead of one shift,
+mask and lookup pass per channel. A table is built the first time its format
+is used and shared by every ``ColorConverter`` after that.
+
+    converter = ColorConverter("rgb24")
+    rgb = converter.empty(frame.shape)
+    converter.convert(frame, out=rgb)       # One (height, width) frame
+    converter.convert(frames)               # Or a (count, height, width) batch
+
+``yuv420`` is planar I420 as encoders take it (ffmpeg's ``yuv420p``): the Y
+plane, then U and V at half the width and height, each chroma sample the
+average of its 2x2 pixels, BT.601 limited range.
+"""
+import numpy as np
+
+# Output formats and the ffmpeg -pixel_format of each
+FORMATS = {
+    "rgb24": "rgb24",
+    "bgra": "bgra",
+    "rgba": "rgba",
+    "gray": "gray",
+    "yuv420": "yuv420p",
+}
+
+_tables = {}
+
+
+def expand_rgb565(values):
+    """The 8 bit red, green and blue of RGB565 ``values``, low bits filled from the high ones."""
+    r = values >> 11
+    g = (values >> 5) & 0x3F
+    b = values & 0x1F
+    return (r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)
+
+
+def lookup_table(pixel_format):
+    """The 65,536-entry table of a format, one item per output pixel, built on first use."""
+    table = _tables.get(pixel_format)
+    if table is not None:
+        return table
+    if pixel_format not in FORMATS:
+        raise ValueError(f"Unknown pixel format {pixel_format!r}, expected one of {', '.join(FORMATS)}")
+    r, g, b = expand_rgb565(np.arange(0x10000, dtype=np.uint32))
+    if pixel_format == "rgb24":
+        # Three byte items, np.take copies whole pixels
+        table = np.stack([r, g, b], axis=1).astype(np.uint8).view("V3").ravel()
+    elif pixel_format in ("bgra", "rgba"):
+        first, last = (b, r) if pixel_format == "bgra" else (r, b)
+        table = (first | (g << 8) | (last << 16) | (0xFF << 24)).astype("<u4")
+    elif pixel_format == "gray":
+        table = np.rint(0.299 * r + 0.587 * g + 0.114 * b).astype(np.uint8)
+    else:
+        # Y, and U and V side by side in the two halves of a word, so the 2x2 sums of both take one pass
+        y = np.rint(16 + (65.481 * r + 128.553 * g + 24.966 * b) / 255).astype(np.uint8)
+        u = np.rint(128 + (-37.797 * r - 74.203 * g + 112.0 * b) / 255).astype(np.uint32)
+        v = np.rint(128 + (112.0 * r - 93.786 * g - 18.214 * b) / 255).astype(np.uint32)
+        table = (y, u | (v << 16))
+    _tables[pixel_format] = table
+    return table
+
+
+class ColorConverter:
+    """Converts RGB565 frames, or batches of them, to one output format."""
+
+    def __init__(self, pixel_format="rgb24"):
+        self.pixel_format = pixel_format
+        self.table = lookup_table(pixel_format)
+        self.chroma = None  # Scratch for the YUV 4:2:0 chroma, kept for the next frame of the same size
+
+    def output_shape(self, shape):
+        """Shape of the converted array for frames of ``shape``, (height, width) or (count, height, width)."""
+        *count, height, width = shape
+        if self.pixel_format == "yuv420":
+            if height % 2 or width % 2:
+                raise ValueError(f"YUV 4:2:0 needs an even width and height, not {width}x{height}")
+            return (*count, height * width * 3 // 2)
+        if self.pixel_format == "gray":
+            return tuple(shape)
+        return (*count, height, width, 3 if self.pixel_format == "rgb24" else 4)
+
+    def empty(self, shape):
+        """A new output buffer for frames of ``shape``."""
+        return np.empty(self.output_shape(shape), dtype=np.uint8)
+
+    def convert(self, frames, out=None):
+        """Convert an RGB565 frame, some of its rows or a batch of frames, into ``out`` or a new array."""
+        if out is None:
+            out = self.empty(frames.shape)
+        if self.pixel_format == "yuv420":
+            self.convert_yuv420(frames, out)
+        elif self.pixel_format == "gray":
+            np.take(self.table, frames, out=out)
+        else:
+            # One item per pixel, the channels of out seen as a single value
+            np.take(self.table, frames, out=out.view(self.table.dtype)[..., 0])
+        return out
+
+    def convert_yuv420(self, frames, out):
+        """Convert into planar Y, U, V, averaging the chroma of each 2x2 block."""
+        *count, height, width = frames.shape
+        size = height * width
+        luma, chroma = self.table
+        np.take(luma, frames, out=out[..., :size].reshape(frames.shape))
+        if self.chroma is None or self.chroma.shape != frames.shape:
+            self.chroma = np.empty(frames.shape, dtype=np.uint32)
+        np.take(chroma, frames, out=self.chroma)
+        blocks = self.chroma.reshape(*count, height // 2, 2, width // 2, 2)
+        sums = blocks[..., 0, :, 0] + blocks[..., 0, :, 1]
+        sums += blocks[..., 1, :, 0]
+        sums += blocks[..., 1, :, 1]
+        sums += 0x00020002  # Round both halves
+        quarter = (*count, height // 2, width // 2)
+        np.copyto(out[..., size:size + size // 4].reshape(quarter), (sums & 0xFFFF) >> 2, casting='unsafe')
+        np.copyto(out[..., size + size // 4:].reshape(quarter), sums >> 18, casting='unsafe')
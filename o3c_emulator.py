@@ -0,0 +1,292 @@
+"""Software stand-in for a SayoDevice O3C screen.
+
+``O3CEmulator`` mimics the two parts of the ``hid`` module the viewers use
+(``hid.enumerate`` and ``hid.device``), so it can be swapped in wherever the
+real module is imported:
+
+    import o3c_listener
+    from o3c_emulator import O3CEmulator
+
+    o3c_listener.hid = O3CEmulator(latency=0.001, jitter=0.0005)
+
+The emulated device answers the same 0x22/0x03 screen read requests that
+``prepare_packets`` builds and serves synthetic 160x80 RGB565 frames.
+USB latency, jitter, dropped reports and out-of-order chunks can be tuned,
+and ``unplug``/``plug`` pull a device out and put it back.
+"""
+import heapq
+import random
+import threading
+import time
+
+import numpy as np
+
+from o3c_protocol import MAX_RESPONSE_LENGTH, REPORT_ID, REPORT_SIZE, SCREEN_READ_COMMAND, packet_checksum
+
+MAX_CHUNK_DATA = MAX_RESPONSE_LENGTH - 8  # Largest payload a single response can carry
+
+EMULATED_PATH_PREFIX = b"o3c-emulator:"
+
+
+def render_scene(scene, index, width, height):
+    """Render frame ``index`` of a synthetic scene as an RGB565 array."""
+    y, x = np.mgrid[0:height, 0:width]
+    if scene == "bars":
+        # Colour bars scrolling one pixel per frame, every pixel changes
+        r = ((x + index) * 31 // width) % 32
+        g = (y * 63 // max(height - 1, 1)) % 64
+        b = ((x + y + index) // 4) % 32
+    elif scene == "static":
+        # A fixed gradient, the screen never changes
+        r = x * 31 // max(width - 1, 1)
+        g = y * 63 // max(height - 1, 1)
+        b = 31 - r
+    elif scene == "ticker":
+        # Static background with a small moving block, like a clock or meter
+        r = np.full((height, width), 4)
+        g = (y * 24 // max(height - 1, 1))
+        b = np.full((height, width), 10)
+        bx = (index * 2) % max(width - 16, 1)
+        block = (x >= bx) & (x < bx + 16) & (y >= height // 2 - 8) & (y < height // 2 + 8)
+        r = np.where(block, 31, r)
+        g = np.where(block, 63, g)
+        b = np.where(block, 31, b)
+    else:
+        raise ValueError(f"Unknown scene: {scene}")
+    return ((r << 11) | (g << 5) | b).astype(np.uint16)
+
+
+class O3CEmulator:
+    """Drop-in replacement for the ``hid`` module that serves emulated O3C devices."""
+
+    def __init__(self, latency=0.0005, jitter=0.0, drop_rate=0.0, reorder_rate=0.0,
+                 report_interval=0.0, scene="bars", screen_fps=30, devices=1,
+                 width=160, height=80, vendor_id=0x8089, product_id=0x0009,
+                 usage_page=0xFF12, seed=None, enumerate_delay=0.0):
+        self.latency = latency                   # Seconds between request and response
+        self.jitter = jitter                     # Extra uniform random delay, seconds
+        self.drop_rate = drop_rate               # Probability that a request gets no response
+        self.reorder_rate = reorder_rate         # Probability that a response is held back
+        self.report_interval = report_interval   # Minimum spacing between responses (bandwidth)
+        self.scene = scene
+        self.screen_fps = screen_fps
+        self.devices = devices
+        self.width, self.height = width, height
+        self.vendor_id = vendor_id
+        self.product_id = product_id
+        self.usage_page = usage_page
+        self.seed = seed
+        self.enumerate_delay = enumerate_delay  # Seconds ``enumerate`` takes, it scans every USB device
+        self.unplugged = set()  # Indices of the devices pulled out
+        self.connections = {}   # Index -> times it was unplugged, handles opened before that fail
+
+    def unplug(self, index=0, duration=None):
+        """Pull device ``index`` out, back in after ``duration`` seconds if given.
+
+        Its open handles fail like hidapi's do from then on, even once it is
+        plugged back in, and it is missing from ``enumerate`` until then.
+        """
+        self.unplugged.add(index)
+        self.connections[index] = self.connections.get(index, 0) + 1
+        if duration is not None:
+            timer = threading.Timer(duration, self.plug, args=(index,))
+            timer.daemon = True
+            timer.start()
+
+    def plug(self, index=0):
+        """Put device ``index`` back in."""
+        self.unplugged.discard(index)
+
+    def enumerate(self, vendor_id=0, product_id=0):
+        """List the emulated interfaces, mirroring ``hid.enumerate``."""
+        if self.enumerate_delay:
+            time.sleep(self.enumerate_delay)
+        if vendor_id not in (0, self.vendor_id) or product_id not in (0, self.product_id):
+            return []
+
+        interfaces = []
+        for index in range(self.devices):
+            if index in self.unplugged:
+                continue
+            # Every O3C also exposes a keyboard interface, which the viewers must skip
+            for interface, usage_page in enumerate((0x0001, self.usage_page)):
+                interfaces.append({
+                    'path': EMULATED_PATH_PREFIX + f"{index}:{interface}".encode(),
+                    'vendor_id': self.vendor_id,
+                    'product_id': self.product_id,
+                    'serial_number': f"EMU{index:04d}",
+                    'release_number': 0x0100,
+                    'manufacturer_string': "SayoDevice",
+                    'product_string': "O3C (emulated)",
+                    'usage_page': usage_page,
+                    'usage': 0x0001,
+                    'interface_number': interface,
+                })
+        return interfaces
+
+    def device(self):
+        """Create an unopened device handle, mirroring ``hid.device()``."""
+        return EmulatedDevice(self)
+
+
+class EmulatedDevice:
+    """Emulated O3C device handle with the ``hid.device`` API."""
+
+    def __init__(self, emulator):
+        self.emulator = emulator
+        self.index = None
+        self.connection = 0
+        self.nonblocking = False
+        self.pending = []            # Heap of (due time, sequence, response)
+        self.sequence = 0
+        self.last_due = 0.0
+        self.frame_index = None
+        self.frame_bytes = b""
+        self.condition = threading.Condition()
+        self.random = random.Random(emulator.seed)
+        self.start_time = time.perf_counter()
+        self.requests = 0
+        self.responses = 0
+        self.dropped = 0
+        self.reordered = 0
+
+    def open_path(self, path):
+        """Open an emulated interface by its enumeration path."""
+        if isinstance(path, str):
+            path = path.encode()
+        if not path.startswith(EMULATED_PATH_PREFIX):
+            raise OSError("open failed")
+        index, interface = path[len(EMULATED_PATH_PREFIX):].split(b":")
+        if int(index) >= self.emulator.devices or int(index) in self.emulator.unplugged or int(interface) != 1:
+            raise OSError("open failed")
+        self.index = int(index)
+        self.connection = self.emulator.connections.get(self.index, 0)
+
+    def open(self, vendor_id=0, product_id=0, serial_number=None):
+        """Open the first emulated screen interface."""
+        for info in self.emulator.enumerate(vendor_id, product_id):
+            if info['usage_page'] == self.emulator.usage_page:
+                self.open_path(info['path'])
+                return
+        raise OSError("open failed")
+
+    def set_nonblocking(self, value):
+        self.nonblocking = bool(value)
+        return 0
+
+    def get_manufacturer_string(self):
+        return "SayoDevice"
+
+    def get_product_string(self):
+        return "O3C (emulated)"
+
+    def get_serial_number_string(self):
+        return f"EMU{self.index:04d}"
+
+    def close(self):
+        self.index = None
+        with self.condition:
+            self.pending.clear()
+            self.condition.notify_all()
+
+    def current_frame(self):
+        """Bytes of the frame currently shown on the emulated screen."""
+        emu = self.emulator
+        elapsed = time.perf_counter() - self.start_time
+        index = int(elapsed * emu.screen_fps) if emu.screen_fps > 0 else 0
+        if index != self.frame_index:
+            self.frame_index = index
+            self.frame_bytes = render_scene(emu.scene, index, emu.width, emu.height).astype("<u2").tobytes()
+        return self.frame_bytes
+
+    def build_response(self, offset):
+        """Build the response report for a screen read at ``offset``."""
+        data = self.current_frame()[offset:offset + MAX_CHUNK_DATA]
+        length = len(data) + 8
+
+        response = bytearray(REPORT_SIZE)
+        response[0] = REPORT_ID
+        response[1] = 0x03
+        response[4] = length & 0xFF
+        response[5] = (length >> 8) & 0xFF
+        response[6] = SCREEN_READ_COMMAND
+        response[8:12] = offset.to_bytes(4, "little")
+        response[12:12 + len(data)] = data
+
+        checksum = packet_checksum(response)
+        response[2] = checksum & 0xFF
+        response[3] = (checksum >> 8) & 0xFF
+        return bytes(response)
+
+    def check_connected(self, error):
+        """Fail like hidapi once the device was unplugged."""
+        if self.index is None:
+            raise OSError("not open")
+        if self.emulator.connections.get(self.index, 0) != self.connection:
+            raise OSError(error)
+
+    def write(self, data):
+        """Accept a request report and schedule its response."""
+        self.check_connected("write error")
+
+        data = bytes(data)
+        self.requests += 1
+
+        # Silently ignore anything that is not a well formed screen read, like the firmware
+        if len(data) < 12 or data[0] != REPORT_ID or data[1] != 0x03 or data[6] != SCREEN_READ_COMMAND:
+            return len(data)
+        if (data[2] | (data[3] << 8)) != packet_checksum(data):
+            return len(data)
+
+        emu = self.emulator
+        if emu.drop_rate and self.random.random() < emu.drop_rate:
+            self.dropped += 1
+            return len(data)
+
+        offset = int.from_bytes(data[8:12], "little")
+        now = time.perf_counter()
+        due = now + emu.latency
+        if emu.jitter:
+            due += self.random.uniform(0, emu.jitter)
+        if emu.report_interval:
+            due = max(due, self.last_due + emu.report_interval)
+            self.last_due = due
+        if emu.reorder_rate and self.random.random() < emu.reorder_rate:
+            # Hold the response back long enough for later chunks to overtake it
+            due += max(emu.latency, emu.report_interval * 4, 0.001)
+            self.reordered += 1
+
+        response = self.build_response(offset)
+        with self.condition:
+            heapq.heappush(self.pending, (due, self.sequence, response))
+            self.sequence += 1
+            self.condition.notify_all()
+        return len(data)
+
+    def read(self, max_length, timeout_ms=0):
+        """Return the next due response as a list of ints, like hidapi."""
+        self.check_connected("read error")
+
+        if timeout_ms > 0:
+            deadline = time.perf_counter() + timeout_ms / 1000
+        elif self.nonblocking:
+            deadline = 0.0
+        else:
+            deadline = None
+
+        with self.condition:
+            while True:
+                now = time.perf_counter()
+                if self.pending and self.pending[0][0] <= now:
+                    response = heapq.heappop(self.pending)[2]
+                    self.responses += 1
+                    return list(response[:max_length])
+
+                if deadline is not None and now >= deadline:
+                    return []
+
+                # Sleep until the next response is due or the read times out
+                wait = self.pending[0][0] - now if self.pending else None
+                if deadline is not None:
+                    wait = deadline - now if wait is None else min(wait, deadline - now)
+                self.condition.wait(wait)
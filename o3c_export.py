@@ -0,0 +1,302 @@
+"""Exporting O3C frames to a PNG sequence, an animated GIF/WebP or a video through ffmpeg.
+
+    python o3c_export.py session.o3c clip.gif          # A recording, as fast as it encodes
+    python o3c_export.py session.o3c frames/%06d.png   # One PNG per frame and frames/frames.ffconcat
+    python o3c_export.py session.o3c clip.mp4 --fps 60 # Through a local ffmpeg binary
+
+Live, ``HIDListener(export="clip.webp")`` does the same with the frames it
+shows. A ``FrameExporter`` samples the newest frame of a ``FrameRing`` (or
+anything handing out frames the same way: a ``SessionPlayer``, a capture
+process, a frame client) at a fixed rate on its own thread, and hands the
+encoding to a small pool of worker threads, never to the viewer.
+
+Identical consecutive frames are merged into the duration of the first
+one. The queue to the workers is bounded: when it is full the new frame is
+dropped and the one before it simply lasts longer, so an encoder that can't
+keep up costs frames in the export, never a stalled capture.
+"""
+import argparse
+import os
+import queue
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+from o3c_color import ColorConverter
+from o3c_pacing import FrameScheduler
+
+ANIMATED = (".gif", ".webp")
+
+
+class PNGSequence:
+    """One PNG per frame, plus an ffconcat file with the duration of each.
+
+    ``path`` is a pattern like "frames/%06d.png", a name like "clip.png"
+    numbered as "clip_000000.png", or a directory. PNGs encode
+    independently, so any number of workers can write them.
+    ``ffmpeg -f concat -i frames/frames.ffconcat clip.mp4`` turns them into a video.
+    """
+
+    ordered = False
+
+    def __init__(self, path, width, height, fps):
+        root, extension = os.path.splitext(path)
+        if "%" not in path:
+            path = f"{root}_%06d.png" if extension else os.path.join(path, "%06d.png")
+        self.pattern = path
+        self.directory = os.path.dirname(path) or "."
+        os.makedirs(self.directory, exist_ok=True)
+        self.converter = ColorConverter("rgb24")
+        self.durations = {}  # Frame index -> seconds
+
+    def write(self, index, frame, duration):
+        from PIL import Image
+        Image.fromarray(self.converter.convert(frame)).save(self.pattern % index, compress_level=1)
+        self.durations[index] = duration
+
+    def close(self):
+        with open(os.path.join(self.directory, "frames.ffconcat"), "w", encoding="utf-8") as f:
+            f.write("ffconcat version 1.0\n")
+            for index in sorted(self.durations):
+                f.write(f"file '{os.path.basename(self.pattern % index)}'\nduration {self.durations[index]:.6f}\n")
+
+
+class AnimatedImage:
+    """An animated GIF or WebP, every frame shown for its own duration.
+
+    Workers convert the frames, PIL encodes the whole animation on ``close``,
+    so it is meant for clips: every distinct frame is kept until then.
+    """
+
+    ordered = False
+
+    def __init__(self, path, width, height, fps):
+        self.path = path
+        self.converter = ColorConverter("rgb24")
+        self.frames = {}  # Frame index -> (image, seconds)
+
+    def write(self, index, frame, duration):
+        from PIL import Image
+        self.frames[index] = (Image.fromarray(self.converter.convert(frame)), duration)
+
+    def close(self):
+        if not self.frames:
+            return
+        images, durations = zip(*(self.frames[index] for index in sorted(self.frames)))
+        # GIF counts in hundredths of a second, WebP in milliseconds
+        durations = [max(10, round(seconds * 1000)) for seconds in durations]
+        options = dict(lossless=True) if self.path.lower().endswith(".webp") else {}
+        images[0].save(self.path, save_all=True, append_images=images[1:], duration=durations, loop=0, **options)
+
+
+class FFmpegPipe:
+    """Raw frames piped to a local ffmpeg at a constant rate, repeating a frame for as long as it lasts."""
+
+    ordered = True  # The pipe takes the frames in order, one worker
+
+    def __init__(self, path, width, height, fps, ffmpeg="ffmpeg"):
+        self.fps = fps
+        self.converter = ColorConverter("rgb24")
+        self.elapsed = 0.0  # Seconds of video so far
+        self.written = 0    # Frames of video so far
+        command = [ffmpeg, "-loglevel", "error", "-y", "-f", "rawvideo", "-pixel_format", "rgb24",
+                   "-video_size", f"{width}x{height}", "-framerate", f"{fps:g}", "-i", "-",
+                   "-pix_fmt", "yuv420p", path]
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        except FileNotFoundError:
+            raise OSError(f"{ffmpeg} was not found, install it or export to .png, .gif or .webp") from None
+
+    def write(self, index, frame, duration):
+        self.elapsed += duration
+        repeats = round(self.elapsed * self.fps) - self.written
+        if repeats > 0:
+            data = self.converter.convert(frame).tobytes()
+            for _ in range(repeats):
+                self.process.stdin.write(data)
+            self.written += repeats
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        if self.process.wait():
+            raise OSError(f"ffmpeg failed with exit code {self.process.returncode}")
+
+
+def open_writer(path, width, height, fps):
+    """The writer for ``path``: a PNG sequence, an animated image, or a video through ffmpeg."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".png" or not extension:
+        return PNGSequence(path, width, height, fps)
+    if extension in ANIMATED:
+        return AnimatedImage(path, width, height, fps)
+    return FFmpegPipe(path, width, height, fps)
+
+
+class FrameExporter:
+    """Hands frames to a bounded pool of encoder threads, merging repeats and dropping what they can't take.
+
+    ``add_frame`` may be fed directly, or ``follow`` samples a frame ring at
+    ``fps`` on a thread of its own. A frame is only queued once the next
+    different one arrives, with the time between them as its duration.
+    """
+
+    def __init__(self, path, width, height, fps=30, workers=2, backlog=32):
+        self.path = path
+        self.fps = fps
+        self.writer = open_writer(path, width, height, fps)
+        self.queue = queue.Queue(maxsize=backlog)
+        self.backlog_limit = backlog
+        self.held = None       # (frame, timestamp) waiting for its duration
+        self.error = None      # Why the writer failed, nothing is queued after that
+        self.running = False   # Following a ring
+        self.follower = None
+
+        # Statistics
+        self.frames_seen = 0
+        self.frames_merged = 0   # Identical to the one before, added to its duration
+        self.frames_dropped = 0  # The queue was full, the one before lasts longer instead
+        self.frames_written = 0  # Handed to the writer
+        self.max_backlog = 0
+
+        count = 1 if self.writer.ordered else max(1, workers)
+        self.workers = [threading.Thread(target=self.work, daemon=True) for _ in range(count)]
+        for worker in self.workers:
+            worker.start()
+
+    @property
+    def backlog(self):
+        """Frames waiting for a worker."""
+        return self.queue.qsize()
+
+    def add_frame(self, frame, timestamp, block=False):
+        """Export an RGB565 frame shown from ``timestamp`` (seconds) on, copying it if it is kept.
+
+        Returns False when it was dropped. With ``block`` a full queue is
+        waited on instead, for offline exports.
+        """
+        if self.error is not None:
+            return False
+        self.frames_seen += 1
+        if self.held is not None:
+            held, start = self.held
+            if np.array_equal(held, frame):
+                self.frames_merged += 1
+                return True
+            if not self.submit(held, timestamp - start, block):
+                self.frames_dropped += 1
+                return False
+        self.held = (frame.copy(), timestamp)
+        return True
+
+    def submit(self, frame, duration, block=False):
+        """Queue a frame for the workers, False when the queue is full."""
+        try:
+            self.queue.put((self.frames_written, frame, duration), block=block)
+        except queue.Full:
+            return False
+        self.frames_written += 1
+        self.max_backlog = max(self.max_backlog, self.queue.qsize())
+        return True
+
+    def work(self):
+        """Encode queued frames until the end marker."""
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            if self.error is None:
+                try:
+                    self.writer.write(*job)
+                except (OSError, ValueError) as e:
+                    # Keep taking jobs, so nobody waits on a full queue, but stop queueing new ones
+                    self.error = e
+
+    def follow(self, ring):
+        """Sample the newest frame of ``ring`` at ``fps`` on a thread of its own, until ``close``."""
+        self.running = True
+        self.follower = threading.Thread(target=self.follow_loop, args=(ring,), daemon=True)
+        self.follower.start()
+
+    def follow_loop(self, ring):
+        scheduler = FrameScheduler(self.fps)
+        sequence = -1
+        while self.running and self.error is None:
+            slot = ring.acquire_latest(sequence)
+            if slot is not None:
+                try:
+                    sequence = slot.sequence
+                    self.add_frame(slot.frame, slot.timestamp)
+                finally:
+                    ring.release(slot)
+            scheduler.wait()
+
+    def close(self, timestamp=None):
+        """Queue the last frame, shown until ``timestamp`` (now by default), wait for the workers and finish the file."""
+        self.running = False
+        if self.follower is not None:
+            self.follower.join()
+        if self.held is not None and self.error is None:
+            held, start = self.held
+            end = time.perf_counter() if timestamp is None else timestamp
+            self.submit(held, max(end - start, 1 / self.fps), block=True)
+        self.held = None
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        if self.error is None:
+            try:
+                self.writer.close()
+            except (OSError, ValueError) as e:
+                self.error = e
+
+    def summary(self):
+        text = (f"Exported {self.frames_written} frames to {self.path} ({self.frames_merged} identical merged, "
+                f"{self.frames_dropped} dropped, backlog peaked at {self.max_backlog} of {self.backlog_limit})")
+        if self.error is not None:
+            text += f", failed: {self.error}"
+        return text
+
+
+def export_recording(player, path, fps=30, workers=2, report=print):
+    """Export every frame of a ``SessionPlayer`` recording, waiting for the encoders instead of dropping."""
+    exporter = FrameExporter(path, player.width, player.height, fps, workers)
+    try:
+        for index in range(len(player)):
+            exporter.add_frame(player.frame_at(index), float(player.timestamps[index]), block=True)
+    finally:
+        exporter.close(player.duration + 1 / fps)
+    report(exporter.summary())
+    return exporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", help="recording to export, from HIDListener(record=...)")
+    parser.add_argument("output", help="a .png pattern or directory, a .gif or .webp, or a video file for ffmpeg")
+    parser.add_argument("--fps", type=float, default=30, help="frame rate of ffmpeg videos (default: 30)")
+    parser.add_argument("--workers", type=int, default=2, help="encoder threads (default: 2)")
+    args = parser.parse_args()
+
+    from o3c_record import SessionPlayer
+    try:
+        player = SessionPlayer(args.recording, loop=False)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Failed to open recording: {e}")
+    try:
+        exporter = export_recording(player, args.output, args.fps, args.workers)
+    except OSError as e:
+        raise SystemExit(f"Failed to export: {e}")
+    finally:
+        player.close()
+    if exporter.error is not None:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
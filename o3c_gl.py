@@ -0,0 +1,290 @@
+"""OpenGL renderers for the O3C frames.
+
+``ShaderRenderer`` needs a 3.3 core profile context: a static VBO/VAO quad,
+a tiny textured shader and texture uploads through two ping-ponged pixel
+buffer objects. ``LegacyRenderer`` is the original fixed-function path
+(immediate-mode quad, synchronous uploads) for contexts that lack it.
+Both upload RGB565 frames as packed pixels when the driver takes them and
+convert to RGB888 on the CPU otherwise.
+
+With ``columns`` and ``rows`` the texture is an atlas of that many frames
+side by side, one tile per device, still drawn as a single quad.
+"""
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+
+from o3c_color import ColorConverter
+
+VERTEX_SHADER = """
+#version 330 core
+layout(location = 0) in vec2 position;
+layout(location = 1) in vec2 texcoord;
+out vec2 uv;
+void main() {
+    uv = texcoord;
+    gl_Position = vec4(position, 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330 core
+in vec2 uv;
+out vec4 color;
+uniform sampler2D frame;
+void main() {
+    color = vec4(texture(frame, uv).rgb, 1.0);
+}
+"""
+
+# x, y, s, t of a fullscreen triangle strip, the first frame row at the top
+QUAD_VERTICES = np.array([
+    -1.0, -1.0, 0.0, 1.0,   # Bottom left
+     1.0, -1.0, 1.0, 1.0,   # Bottom right
+    -1.0,  1.0, 0.0, 0.0,   # Top left
+     1.0,  1.0, 1.0, 0.0,   # Top right
+], dtype=np.float32)
+
+
+class Renderer:
+    """Frame texture and upload logic shared by the renderers."""
+
+    name = "base"
+
+    def __init__(self, width, height, packed_upload=True, columns=1, rows=1):
+        self.width, self.height = width, height
+        self.columns, self.rows = columns, rows  # Frames the texture holds side by side
+        self.packed_upload = packed_upload  # Upload RGB565 as is, the CPU conversion is the fallback
+        self.use_packed_upload = False
+        self.texture_id = None
+        self.viewport = (0, 0)
+        self.texture_data = np.zeros((height, width, 3), dtype=np.uint8)
+        self.converter = ColorConverter("rgb24")
+
+    @property
+    def upload_format(self):
+        """Pixel format and type of the data handed to the texture."""
+        if self.use_packed_upload:
+            return GL_RGB, GL_UNSIGNED_SHORT_5_6_5
+        return GL_RGB, GL_UNSIGNED_BYTE
+
+    def setup(self, viewport_width, viewport_height):
+        """Create the frame texture, in the current context."""
+        self.viewport = (viewport_width, viewport_height)
+        glViewport(0, 0, viewport_width, viewport_height)
+
+        # Create texture for frame data
+        self.texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+
+        # Set texture parameters
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+
+        # Rows are tightly packed whatever the frame width
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+
+        # Initialize texture data, as raw RGB565 when the driver takes packed pixels
+        self.use_packed_upload = self.packed_upload and self.setup_packed_texture()
+        if not self.use_packed_upload:
+            width, height = self.texture_size
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, width, height,
+                         0, GL_RGB, GL_UNSIGNED_BYTE, np.zeros((height, width, 3), dtype=np.uint8))
+
+    @property
+    def texture_size(self):
+        """Width and height of the whole texture, all the tiles of the atlas."""
+        return self.width * self.columns, self.height * self.rows
+
+    def tile_origin(self, tile):
+        """Texel of the top left corner of an atlas tile, tiles counting left to right, then down."""
+        return tile % self.columns * self.width, tile // self.columns * self.height
+
+    def setup_packed_texture(self):
+        """Allocate the texture for RGB565 uploads, returns False if the driver can't take them."""
+        try:
+            width, height = self.texture_size
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, width, height,
+                         0, GL_RGB, GL_UNSIGNED_SHORT_5_6_5, np.zeros((height, width), dtype=np.uint16))
+            # Drivers without error checking report it here instead of raising
+            error = glGetError()
+            if error != GL_NO_ERROR:
+                raise GLError(err=error, description="glTexImage2D with GL_UNSIGNED_SHORT_5_6_5")
+            return True
+        except GLError as e:
+            print(f"Packed RGB565 textures are not supported, converting on the CPU: {e}")
+            return False
+
+    def convert_frame(self, frame, rgb):
+        """Convert an RGB565 frame, or some of its rows, into a preallocated RGB888 array in place."""
+        self.converter.convert(frame, out=rgb)
+
+    def pixel_data(self, frame, bands=None):
+        """The array to upload for an RGB565 frame, converted if the texture needs it.
+
+        With ``bands``, (start, end) row ranges as from a ``ChangeDetector``,
+        only those rows are converted.
+        """
+        if self.use_packed_upload:
+            return frame  # The GPU expands the colors itself
+        # Convert into the preallocated texture data, no temporaries
+        if bands is None:
+            self.convert_frame(frame, self.texture_data)
+        else:
+            for start, end in bands:
+                self.convert_frame(frame[start:end], self.texture_data[start:end])
+        return self.texture_data
+
+    def upload(self, frame, bands=None, tile=0):
+        """Copy an RGB565 frame, or only the rows in ``bands``, into the texture or a tile of the atlas.
+
+        The frame may be reused once this returns.
+        """
+        self.upload_pixels(self.pixel_data(frame, bands), bands, tile)
+
+    def upload_pixels(self, data, bands=None, tile=0):
+        """Copy the array returned by ``pixel_data``, or the rows in ``bands`` of it, into the texture."""
+        x, y = self.tile_origin(tile)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        if bands is None:
+            glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, self.width, self.height, *self.upload_format, data)
+            return
+        for start, end in bands:
+            glTexSubImage2D(GL_TEXTURE_2D, 0, x, y + start, self.width, end - start, *self.upload_format, data[start:end])
+
+    def draw(self):
+        raise NotImplementedError
+
+    def draw_bars(self, rows, height=6, gap=2):
+        """Draw rows of horizontal bars down from the top left corner.
+
+        Each row is a list of (length in pixels, (r, g, b)) bars drawn over
+        each other in order. Bars are cleared scissor rectangles, so they work
+        the same on every renderer and need no extra state.
+        """
+        glEnable(GL_SCISSOR_TEST)
+        y = self.viewport[1] - gap
+        for bars in rows:
+            y -= height
+            for length, color in bars:
+                glScissor(gap, y, max(1, int(length)), height)
+                glClearColor(*color, 1.0)
+                glClear(GL_COLOR_BUFFER_BIT)
+            y -= gap
+        glDisable(GL_SCISSOR_TEST)
+        glClearColor(0.0, 0.0, 0.0, 1.0)
+
+
+class LegacyRenderer(Renderer):
+    """Fixed-function renderer with an immediate-mode quad."""
+
+    name = "legacy"
+
+    def setup(self, viewport_width, viewport_height):
+        super().setup(viewport_width, viewport_height)
+
+        # Setup OpenGL for 2D rendering
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        glOrtho(0, 1, 0, 1, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+
+        # Disable depth testing as we're doing 2D
+        glDisable(GL_DEPTH_TEST)
+
+        self.vertices = [
+            # x, y, s, t
+            (0.0, 0.0, 0.0, 0.0),   # Bottom left
+            (1.0, 0.0, 1.0, 0.0),   # Bottom right
+            (1.0, 1.0, 1.0, 1.0),   # Top right
+            (0.0, 1.0, 0.0, 1.0),   # Top left
+        ]
+
+    def draw(self):
+        # Clear the screen
+        glClear(GL_COLOR_BUFFER_BIT)
+
+        # Draw a fullscreen quad with our texture
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+
+        glBegin(GL_QUADS)
+        for x, y, s, t in self.vertices:
+            glTexCoord2f(s, 1-t)
+            glVertex2f(x, y)
+        glEnd()
+
+
+class ShaderRenderer(Renderer):
+    """Core profile renderer: static VBO/VAO quad, textured shader and PBO uploads."""
+
+    name = "shader"
+
+    def setup(self, viewport_width, viewport_height):
+        super().setup(viewport_width, viewport_height)
+
+        # Static quad, the VAO must be bound before the program is validated
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, QUAD_VERTICES.nbytes, QUAD_VERTICES, GL_STATIC_DRAW)
+        stride = 4 * QUAD_VERTICES.itemsize
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(2 * QUAD_VERTICES.itemsize))
+
+        self.program = shaders.compileProgram(
+            shaders.compileShader(VERTEX_SHADER, GL_VERTEX_SHADER),
+            shaders.compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+        )
+        glUseProgram(self.program)
+        glUniform1i(glGetUniformLocation(self.program, "frame"), 0)
+
+        # Two pixel buffers used in turn, so a write never waits on the previous transfer
+        self.upload_size = self.pixel_data(np.zeros((self.height, self.width), dtype=np.uint16)).nbytes
+        self.pbos = [int(pbo) for pbo in glGenBuffers(2)]
+        for pbo in self.pbos:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, self.upload_size, None, GL_STREAM_DRAW)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        self.pbo_index = 0
+
+    def upload_pixels(self, data, bands=None, tile=0):
+        """Stream the pixel data, or the rows in ``bands`` of it, into the texture through the next pixel buffer."""
+        pbo = self.pbos[self.pbo_index]
+        self.pbo_index ^= 1
+        if bands is None:
+            bands = [(0, self.height)]
+        row_size = self.upload_size // self.height
+
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+        # Invalidating lets the driver hand out fresh memory instead of syncing with the GPU
+        pointer = glMapBufferRange(GL_PIXEL_UNPACK_BUFFER, 0, self.upload_size,
+                                   GL_MAP_WRITE_BIT | GL_MAP_INVALIDATE_BUFFER_BIT)
+        for start, end in bands:
+            ctypes.memmove(pointer + start * row_size, data.ctypes.data + start * row_size, (end - start) * row_size)
+        glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+
+        # The copy into the texture happens asynchronously from the bound buffer
+        x, y = self.tile_origin(tile)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        for start, end in bands:
+            glTexSubImage2D(GL_TEXTURE_2D, 0, x, y + start, self.width, end - start,
+                            *self.upload_format, ctypes.c_void_p(start * row_size))
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+
+    def draw(self):
+        glClear(GL_COLOR_BUFFER_BIT)
+        glUseProgram(self.program)
+        glBindVertexArray(self.vao)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+
+
+RENDERERS = {renderer.name: renderer for renderer in (ShaderRenderer, LegacyRenderer)}
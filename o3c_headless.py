@@ -0,0 +1,212 @@
+"""Headless capture: raw O3C frames to stdout, a named pipe or a file.
+
+No window is ever created. Frames are written at a fixed cadence, repeating
+the last one when the device has nothing new, so the output can be fed
+straight into ffmpeg::
+
+    python o3c_headless.py --format rgb24 --fps 30 | ffmpeg -f rawvideo -pixel_format rgb24 -video_size 160x80 -framerate 30 -i - out.mp4
+"""
+import argparse
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+
+from o3c_color import FORMATS, ColorConverter
+from o3c_pacing import FrameScheduler
+
+# Pixel formats and the matching ffmpeg -pixel_format
+PIXEL_FORMATS = {"rgb565": "rgb565le", **FORMATS}
+
+
+class FrameSink:
+    """Writes the newest frame of a ``FrameRing`` to a binary output at a fixed rate.
+
+    The sink runs on its own thread and only ever holds one ring slot, so a
+    slow or stalled consumer makes it skip frames but never holds up the
+    reader. RGB565 is written straight from the slot the reader decoded
+    into, the other formats are converted once into a preallocated buffer.
+    ``output`` is "-" for stdout, a path (a named pipe is opened once its
+    reader shows up) or an open binary file.
+    """
+
+    def __init__(self, ring, output="-", pixel_format="rgb24", fps=30):
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"Unknown pixel format {pixel_format!r}, expected one of {', '.join(PIXEL_FORMATS)}")
+        self.ring = ring
+        self.output = output
+        self.pixel_format = pixel_format
+        self.fps = fps
+        self.running = False
+        self.thread = None
+        self.error = None
+
+        # Statistics
+        self.frames_written = 0
+        self.frames_repeated = 0  # Written again because no new frame arrived in time
+        self.frames_dropped = 0   # Ticks of the cadence missed because the output was too slow
+        self.last_sequence = -1
+
+        self.converter = self.buffer = None
+        if pixel_format != "rgb565":
+            self.converter = ColorConverter(pixel_format)
+            self.buffer = self.converter.empty((ring.plan.height, ring.plan.width))
+
+    @property
+    def frame_size(self):
+        """Bytes per frame written."""
+        if self.pixel_format == "rgb565":
+            return self.ring.plan.width * self.ring.plan.height * 2
+        return self.buffer.nbytes
+
+    def encode(self, frame):
+        """The bytes to write for an RGB565 frame, valid until the next call."""
+        if self.pixel_format == "rgb565":
+            return memoryview(frame).cast("B")  # The decoded pixels as they are, no copy
+        self.converter.convert(frame, out=self.buffer)
+        return memoryview(self.buffer).cast("B")
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        if self.thread is not None:
+            # A named pipe nobody opened keeps the thread stuck in open(), it is a daemon anyway
+            self.thread.join(timeout)
+
+    def run(self):
+        """Write frames until stopped or the output goes away."""
+        try:
+            stream, close = self.open_output()
+        except OSError as e:
+            self.error = e
+            self.running = False
+            return
+
+        scheduler = FrameScheduler(self.fps)
+        try:
+            while self.running:
+                slot = self.ring.acquire_latest()
+                if slot is not None:
+                    try:
+                        stream.write(self.encode(slot.frame))
+                    finally:
+                        self.ring.release(slot)
+                    self.frames_written += 1
+                    if slot.sequence == self.last_sequence:
+                        self.frames_repeated += 1
+                    self.last_sequence = slot.sequence
+                scheduler.wait()
+                self.frames_dropped = scheduler.missed
+            stream.flush()
+        except (BrokenPipeError, OSError) as e:
+            # The consumer went away
+            self.error = e
+        finally:
+            self.running = False
+            if close:
+                stream.close()
+
+    def open_output(self):
+        """The stream to write to and whether the sink owns it."""
+        if self.output == "-":
+            return sys.stdout.buffer, False
+        if isinstance(self.output, str):
+            return open(self.output, "wb"), True
+        return self.output, False
+
+
+def write_frames(ring, read_frame, output, pixel_format="rgb24", fps=30, duration=None, capture_rate=0):
+    """Call ``read_frame`` at the capture rate to fill ``ring`` while a ``FrameSink`` writes it to ``output``.
+
+    Runs until ``duration`` seconds passed, the output went away or Ctrl+C,
+    and returns the sink. Messages go to stdout, so when ``output`` is the
+    real stdout the caller must have redirected them to stderr already.
+    """
+    # The sink writes from its own thread, a slow consumer never stalls the reads
+    sink = FrameSink(ring, output, pixel_format, fps)
+    sink.start()
+    capture = FrameScheduler(capture_rate)
+    end = time.perf_counter() + duration if duration else None
+    try:
+        while sink.running and (end is None or time.perf_counter() < end):
+            read_frame()
+            capture.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.stop()
+        if isinstance(sink.error, BrokenPipeError) and not isinstance(output, str):
+            # Keep Python from complaining about stdout at exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.__stdout__.fileno())
+        elif sink.error:
+            print(f"Error writing frames: {sink.error}")
+        print(f"Wrote {sink.frames_written} frames ({sink.frames_repeated} repeated, {sink.frames_dropped} dropped)")
+    return sink
+
+
+def capture(output="-", pixel_format="rgb24", fps=30, duration=None, window=None, blocking=False, capture_rate=0,
+            vendor_id=0x8089, product_id=0x0009, usage_page=0xFF12, hid=None):
+    """Capture the first O3C without any window, writing raw frames to stdout ("-"), a named pipe or a file.
+
+    Neither viewer nor any GUI toolkit is imported. The transfer profile of
+    the device is used where ``window`` is not given, and the device is
+    reconnected when it is unplugged. ``hid`` is the ``hid`` module unless given.
+    """
+    from o3c_capture import DeviceSupervisor, FrameReader, FrameRing, device_infos, import_hid, open_device
+    from o3c_protocol import CHUNK_SIZE, get_request_plan
+    from o3c_tuning import find_profile
+
+    # Raw frames may go to stdout, so every message goes to stderr
+    stdout = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        hid = hid or import_hid()
+        try:
+            info = device_infos(hid, vendor_id, product_id, usage_page)[0]
+            profile = find_profile(info, blocking=blocking)
+            device = open_device(hid, vendor_id, product_id, usage_page, blocking, info['path'])
+        except Exception as e:
+            print(f"Failed to open device: {e}")
+            return None
+        print(f"Connected to {device.get_manufacturer_string()} {device.get_product_string()}")
+        chunk_size, timeout = None, None
+        if profile is not None:
+            chunk_size, window, timeout = profile.settings(None, window, blocking)
+        chunk_size, window, timeout = chunk_size or CHUNK_SIZE, window or 0, timeout or 0.05
+
+        plan = get_request_plan(160, 80, chunk_size)
+        ring = FrameRing(plan, FrameReader.ring_slots(plan, window))
+        reopen = functools.partial(open_device, hid, vendor_id, product_id, usage_page, blocking)
+        supervisor = DeviceSupervisor(device, ring, reopen, lambda device: FrameReader(
+            device, ring, window=window, timeout=timeout, blocking=blocking))
+        try:
+            return write_frames(ring, supervisor.read_frame, stdout.buffer if output == "-" else output,
+                                pixel_format, fps, duration, capture_rate)
+        finally:
+            supervisor.close()
+            if supervisor.disconnects:
+                print(supervisor.summary())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", default="-", help="file or named pipe to write to (default: stdout)")
+    parser.add_argument("--format", choices=PIXEL_FORMATS, default="rgb24", help="pixel format (default: rgb24)")
+    parser.add_argument("--fps", type=float, default=30, help="frames written per second (default: 30)")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    parser.add_argument("--window", type=int,
+                        help="chunk requests kept in flight, 0 is lockstep (default: the tuned profile's, else 0)")
+    parser.add_argument("--blocking", action="store_true", help="wait for responses in timed reads")
+    args = parser.parse_args()
+
+    if capture(args.output, args.format, args.fps, args.duration, args.window, args.blocking) is None:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
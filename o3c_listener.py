@@ -0,0 +1,339 @@
+"""The capture side both viewers share: the device, its transfer settings, recording, exporting and serving.
+
+``CaptureListener`` opens the O3C (or a recording), reads it on a thread of
+its own into a frame ring, and records, shares, exports or serves the
+frames. The OpenGL and the Tkinter viewer each subclass it as their
+``HIDListener`` and only add the window that shows the frames.
+
+Benchmarks swap the device out by setting ``o3c_listener.hid``:
+
+    import o3c_listener
+    from o3c_emulator import O3CEmulator
+
+    o3c_listener.hid = O3CEmulator()
+"""
+import contextlib
+import sys
+import threading
+
+# Nothing heavy is imported up front: numpy, the capture and hid when the device is opened,
+# on a thread of their own, and the optional parts when used
+from o3c_pacing import FrameScheduler
+
+hid = None  # The hid module once the device is looked for, benchmarks put an O3CEmulator here
+
+
+def load_hid():
+    """The hid module, imported the first time a device is looked for."""
+    global hid
+    if hid is None:
+        from o3c_capture import import_hid
+        hid = import_hid()
+    return hid
+
+
+class CaptureListener:
+    def __init__(self, vendor_id=0x8089, product_id=0x0009, usage_page=0xFF12, pipeline_window=None,
+                 blocking_reads=False, capture_rate=0, telemetry=False, telemetry_export=None,
+                 telemetry_overlay=False, shared_memory=None, record=None, playback=None, skip_unchanged=True,
+                 transfer_profile=True, export=None, export_fps=30):
+        self.vendor_id = vendor_id
+        self.product_id = product_id
+        self.usage_page = usage_page
+        self.device = None
+        self.running = False
+        self.width, self.height = 160, 80  # Screen size, that of the recording when playing one
+        self.capture_rate = capture_rate  # Frames per second read from the device, 0 reads as fast as it answers
+        self.frame_ring = None  # Preallocated frame slots shared between threads
+        self.frame_sequence = -1  # Sequence of the last frame taken from the ring
+        self.chunk_size = None  # Bytes of screen data per request, the protocol's CHUNK_SIZE unless set
+        self.request_plan = None
+        self.pipeline_window = pipeline_window  # Chunk requests kept in flight, 0 reads frames in lockstep
+        self.read_timeout = 0.05  # Seconds to wait for a chunk
+        # Chunk size, window and timeout tuned by o3c_tuning.py for the device, used where none were given.
+        # True reads the default profile file, a path another one
+        self.transfer_profile = transfer_profile
+        self.blocking_reads = blocking_reads  # Wait for responses in timed reads instead of polling
+        self.frame_reader = None
+        self.supervisor = None  # Reconnects the device when it is unplugged and plugged back in
+        self.reader_thread = None
+        # Per-stage timings, exported to a .csv or .jsonl file and shown by the viewer if asked
+        self.telemetry = None
+        if telemetry or telemetry_export or telemetry_overlay:
+            from o3c_telemetry import Telemetry
+            self.telemetry = Telemetry(export=telemetry_export)
+        self.telemetry_overlay = telemetry_overlay
+        self.shared_memory = shared_memory  # Name of a shared memory ring other processes can read frames from
+        self.shared_ring = None
+        self.record = record  # Path to record the captured frames to
+        self.recorder = None
+        self.playback = playback  # Path of a recording to show instead of the device
+        # Path to export the frames shown to: .png frames, a .gif or .webp, or a video through ffmpeg
+        self.export = export
+        self.export_fps = export_fps
+        self.exporter = None
+        self.export_source = None  # What the exporter follows, the frame ring or a player of its own
+        # Frames identical to the one shown are not drawn again, changed ones only the rows that differ,
+        # the detector comes with the window
+        self.skip_unchanged = skip_unchanged
+        self.changes = None
+        self.workers = []  # CaptureWorker per device, when the OpenGL viewer reads several
+
+    def find_and_open_device(self):
+        """Find and open the specified HID device."""
+        from o3c_capture import device_infos, open_device
+        try:
+            info = device_infos(load_hid(), self.vendor_id, self.product_id, self.usage_page)[0]
+            self.apply_profile(info)
+            # Non-blocking reads are polled, blocking ones wait in hidapi with a timeout
+            self.device = open_device(hid, self.vendor_id, self.product_id, self.usage_page, self.blocking_reads,
+                                      info['path'])
+        except Exception as e:
+            print(f"Failed to open device: {e}")
+            return False
+        print(f"Connected to {self.device.get_manufacturer_string()} {self.device.get_product_string()}")
+        return True
+
+    def reopen_device(self):
+        """Enumerate the devices again and open the first O3C, for the supervisor."""
+        from o3c_capture import open_device
+        return open_device(load_hid(), self.vendor_id, self.product_id, self.usage_page, self.blocking_reads)
+
+    def apply_profile(self, info):
+        """Take the transfer settings tuned for the device of this ``hid.enumerate`` entry, where none were given."""
+        if not self.transfer_profile:
+            return
+        from o3c_tuning import PROFILE_PATH, find_profile
+        profile = find_profile(info, PROFILE_PATH if self.transfer_profile is True else self.transfer_profile,
+                               self.blocking_reads)
+        if profile is not None:
+            profile.apply_to(self)
+
+    def resolve_transfer(self):
+        """Fall back to the protocol's chunk size and lockstep reads when neither was given nor tuned."""
+        if self.chunk_size is None:
+            from o3c_protocol import CHUNK_SIZE
+            self.chunk_size = CHUNK_SIZE
+        if self.pipeline_window is None:
+            self.pipeline_window = 0
+
+    def prepare_packets(self):
+        """Build the request plan, only when the geometry or chunk size changed."""
+        from o3c_capture import FrameReader, FrameRing
+        from o3c_protocol import get_request_plan
+        self.resolve_transfer()
+        if self.request_plan is None or not self.request_plan.matches(self.width, self.height, self.chunk_size):
+            self.request_plan = get_request_plan(self.width, self.height, self.chunk_size)
+            self.frame_ring = FrameRing(self.request_plan, FrameReader.ring_slots(self.request_plan, self.pipeline_window))
+            self.frame_reader = None  # Rebuilt on the next read with the new plan
+            self.supervisor = None
+            if self.shared_memory:
+                from o3c_shm import SharedFrameRing
+                self.close_shared_ring()
+                try:
+                    self.shared_ring = SharedFrameRing(self.request_plan.width, self.request_plan.height,
+                                                       name=self.shared_memory)
+                except FileExistsError as e:
+                    print(f"Not sharing frames: {e}")
+
+    def create_frame_reader(self, device):
+        from o3c_capture import FrameReader
+        return FrameReader(device, self.frame_ring, window=self.pipeline_window, timeout=self.read_timeout,
+                           blocking=self.blocking_reads, telemetry=self.telemetry, shared=self.shared_ring)
+
+    def read_frame_buffer_optimized(self):
+        """Optimized reading from the HID device, reconnecting it when it went away."""
+        if self.supervisor is None:
+            if not self.device:
+                return
+            from o3c_capture import DeviceSupervisor
+            self.supervisor = DeviceSupervisor(self.device, self.frame_ring, self.reopen_device, self.create_frame_reader)
+
+        # Frames are decoded into the ring and published there for the viewer, which keeps
+        # showing the last one while the device is gone
+        slot = self.supervisor.read_frame()
+        self.device, self.frame_reader = self.supervisor.device, self.supervisor.reader
+        if slot is not None and self.record:
+            self.record_frame(slot)
+
+    def record_frame(self, slot):
+        """Append a captured frame to the recording, starting it with the first one."""
+        if self.recorder is None:
+            from o3c_record import SessionRecorder
+            height, width = slot.frame.shape
+            self.recorder = SessionRecorder(self.record, width, height)
+        self.recorder.write_frame(slot.frame, slot.timestamp)
+
+    def read_loop(self):
+        """Read frames at the capture rate until stopped."""
+        # Capture runs at its own rate, independent of the display
+        capture = FrameScheduler(self.capture_rate)
+        while self.running:
+            self.read_frame_buffer_optimized()
+            capture.wait()
+
+    def device_loop(self):
+        """Main loop for reading from the device, a viewer stops it with its window too."""
+        self.read_loop()
+
+    def start_reader(self, loop=None):
+        """Read the device on a thread of its own with ``loop``, ``device_loop`` unless given, if one is open."""
+        if self.device is not None:
+            self.reader_thread = threading.Thread(target=loop or self.device_loop, daemon=True)
+            self.reader_thread.start()
+
+    def stop_reader(self):
+        """Stop the reader thread and wait for it, it must be done with the device before that is closed."""
+        self.running = False
+        if self.reader_thread is not None:
+            self.reader_thread.join()
+            self.reader_thread = None
+
+    def open_playback(self):
+        """Show a recording instead of the device."""
+        from o3c_record import SessionPlayer
+        try:
+            player = SessionPlayer(self.playback)
+        except (OSError, ValueError) as e:
+            print(f"Failed to open recording: {e}")
+            return False
+        print(f"Playing {self.playback} ({len(player)} frames, {player.duration:.1f} s)")
+        self.width, self.height = player.width, player.height
+        # Takes the place of the frame ring, it hands out frames the same way
+        self.frame_ring = player
+        return True
+
+    def open_source(self):
+        """Open where the frames come from: a recording or the device."""
+        if self.playback:
+            return self.open_playback()
+        if self.find_and_open_device():
+            self.prepare_packets()
+            return True
+        return False
+
+    def close_source(self):
+        """Close whatever ``open_source`` opened."""
+        self.stop_reader()
+        if self.device:
+            self.device.close()
+        if self.playback:
+            self.frame_ring.close()
+
+    def start_export(self):
+        """Export the frames shown to ``export`` on threads of their own, if asked."""
+        if not self.export or self.workers:
+            return
+        from o3c_export import FrameExporter
+        try:
+            self.exporter = FrameExporter(self.export, self.width, self.height, self.export_fps)
+        except OSError as e:
+            print(f"Failed to export: {e}")
+            return
+        # A recording decodes every frame into one buffer, the exporter's thread gets a player of its own
+        self.export_source = self.frame_ring.fork() if self.playback else self.frame_ring
+        self.exporter.follow(self.export_source)
+
+    def close_exporter(self):
+        """Finish the export, if there is one."""
+        if self.exporter is not None:
+            self.exporter.close()
+            print(self.exporter.summary())
+            self.exporter = None
+            if self.export_source is not self.frame_ring:
+                self.export_source.close()
+            self.export_source = None
+
+    def close_recorder(self):
+        """Finish the recording, if there is one."""
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f"Recorded {self.recorder.frames} frames to {self.record} ({self.recorder.bytes_written} bytes)")
+            self.recorder = None
+
+    def close_shared_ring(self):
+        """Remove the shared memory ring, if there is one."""
+        if self.shared_ring is not None:
+            self.shared_ring.close()
+            self.shared_ring = None
+
+    def supervisors(self):
+        """The supervisor of every device read, those not read yet left out."""
+        supervisors = [worker.supervisor for worker in self.workers] + [self.supervisor]
+        return [supervisor for supervisor in supervisors if supervisor is not None]
+
+    def finish(self):
+        """Stop exporting, reading and recording, and print how the session went."""
+        from o3c_capture import describe_busy
+        self.close_exporter()
+        self.close_source()
+        self.close_recorder()
+        self.close_shared_ring()
+        if self.changes is not None:
+            print(self.changes.summary())
+        for supervisor in self.supervisors():
+            if supervisor.disconnects:
+                print(supervisor.summary())
+            print(f"{supervisor.description}: {describe_busy(*supervisor.reader_times())}")
+        if self.telemetry is not None:
+            print(self.telemetry.summary())
+            self.telemetry.close()
+
+    def start_server(self, host="0.0.0.0", port=None, duration=None):
+        """Capture without any window and serve the frames to ``o3c_net`` clients over TCP (``DEFAULT_PORT`` by default)."""
+        import asyncio
+        from o3c_net import DEFAULT_PORT, FrameServer
+
+        if port is None:
+            port = DEFAULT_PORT
+        if not self.open_source():
+            print("Failed to start HID listener - device not found or could not be opened")
+            return
+        self.running = True
+        self.start_reader(self.read_loop)
+
+        source = self.frame_ring
+        if self.workers:
+            print(f"Serving a single device, {self.workers[0].description}")
+            source = self.workers[0]
+        server = FrameServer(source, self.width, self.height, host, port)
+        stop = threading.Event()
+
+        async def serve():
+            await server.start()
+            print(f"Serving frames on {host}:{server.port}")
+            if duration:
+                asyncio.get_running_loop().call_later(duration, stop.set)
+            try:
+                await server.run(stop)
+            finally:
+                await server.close()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            print(f"Failed to serve frames: {e}")
+        finally:
+            print(f"Served {server.frames} frames to {server.connections} clients "
+                  f"({server.frames_sent} sent, {server.frames_dropped} dropped for busy clients)")
+            self.finish()
+
+    def start_headless(self, output="-", pixel_format="rgb24", fps=30, duration=None):
+        """Capture without any window, writing raw frames to stdout ("-"), a named pipe or a file."""
+        from o3c_headless import write_frames
+
+        # Raw frames may go to stdout, so every message goes to stderr
+        stdout = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            if not self.find_and_open_device():
+                print("Failed to start HID listener - device not found or could not be opened")
+                return
+            self.running = True
+            self.prepare_packets()
+            try:
+                write_frames(self.frame_ring, self.read_frame_buffer_optimized, stdout.buffer if output == "-" else output,
+                             pixel_format, fps, duration, self.capture_rate)
+            finally:
+                self.finish()
@@ -0,0 +1,346 @@
+"""Frame server and client, for watching an O3C from another machine.
+
+The server takes frames from a ``FrameRing`` (or anything else with
+``acquire_latest``/``release``) and fans them out over TCP to any number of
+clients as the keyframes and tile deltas of ``o3c_record``. Every frame is
+encoded once whatever the number of clients, and frames identical to the
+previous one are not sent at all. Clients acknowledge every frame they
+decoded; one with too many frames unacknowledged, or whose socket is still
+busy, is skipped instead of queued and gets a keyframe once it has caught
+up, so a slow client sees fewer but fresh frames and never holds up the
+others.
+
+    python o3c_net.py serve --port 5544          # On the machine with the O3C
+    python o3c_net.py view 192.168.1.10:5544     # Anywhere else
+
+Stream layout, little-endian::
+
+    hello    magic "O3CNET01", width, height, tile size (u16)
+    message  kind (u8), payload length (u32), sequence (u64), capture time (f64), payload
+    ack      sequence (u64), sent back by the client for each message
+
+The capture time is ``time.time()`` of the server, the latency a client
+sees is only meaningful with synchronized clocks (or over loopback).
+"""
+import argparse
+import asyncio
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from o3c_capture import FrameReader, FrameRing
+from o3c_protocol import CHUNK_SIZE, get_request_plan
+from o3c_record import KEYFRAME, DeltaDecoder, DeltaEncoder
+
+DEFAULT_PORT = 5544
+MAGIC = b"O3CNET01"
+HELLO = struct.Struct("<8sHHH")
+MESSAGE = struct.Struct("<BIQd")
+ACK = struct.Struct("<Q")
+SEND_BUFFER = 16 * 1024  # Socket buffers of a few frames at most, anything more only adds latency
+RECEIVE_BUFFER = 32 * 1024
+
+
+async def open_connection(host, port):
+    """``asyncio.open_connection`` with buffers small enough that frames don't queue up on the way in."""
+    reader, writer = await asyncio.open_connection(host, port, limit=RECEIVE_BUFFER)
+    sock = writer.get_extra_info('socket')
+    if sock is not None:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+    return reader, writer
+
+
+def parse_address(address, default_port=DEFAULT_PORT):
+    """(host, port) from "host", "host:port" or ":port"."""
+    host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+    return host or "127.0.0.1", int(port) if port else default_port
+
+
+class ServerClient:
+    """A connected client of a ``FrameServer``."""
+
+    __slots__ = ('writer', 'address', 'synced', 'sent', 'acked', 'dropped', 'bytes_sent')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.address = writer.get_extra_info('peername')
+        self.synced = False  # Has the previous frame, so the next delta applies
+        self.sent = 0
+        self.acked = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+
+
+class FrameServer:
+    """Fans the frames of a frame source out to TCP clients.
+
+    A client gets no new frames while ``max_in_flight`` frames it was sent
+    are not acknowledged yet, or while more than ``max_buffered`` bytes wait
+    in its transport. ``send_buffer`` caps the socket's kernel buffer.
+    """
+
+    def __init__(self, source, width=160, height=80, host="0.0.0.0", port=DEFAULT_PORT, tile=16,
+                 keyframe_interval=300, max_in_flight=2, max_buffered=0, send_buffer=SEND_BUFFER,
+                 poll_interval=0.001):
+        self.source = source
+        self.width, self.height, self.tile = width, height, tile
+        self.host, self.port = host, port
+        self.encoder = DeltaEncoder(width, height, tile, keyframe_interval)
+        self.max_in_flight = max_in_flight
+        self.max_buffered = max_buffered
+        self.send_buffer = send_buffer
+        self.poll_interval = poll_interval  # The source can't wake us up, so it is polled
+        self.server = None
+        self.clients = set()
+        self.handlers = set()  # Tasks serving the clients
+        self.sequence = -1
+
+        # Statistics
+        self.frames = 0          # Frames taken from the source
+        self.frames_sent = 0     # Frames sent to a client, summed over the clients
+        self.frames_dropped = 0  # Frames a busy client did not get
+        self.bytes_sent = 0
+        self.connections = 0
+
+    async def start(self):
+        """Listen for clients, ``port`` 0 picks a free port."""
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def handle_client(self, reader, writer):
+        sock = writer.get_extra_info('socket')
+        if sock is not None and self.send_buffer:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        writer.write(HELLO.pack(MAGIC, self.width, self.height, self.tile))
+        client = ServerClient(writer)
+        self.clients.add(client)
+        self.handlers.add(asyncio.current_task())
+        self.connections += 1
+        try:
+            while True:
+                await reader.readexactly(ACK.size)
+                client.acked += 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # The client left
+        finally:
+            self.clients.discard(client)
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def run(self, stop=None):
+        """Send new frames until ``stop`` (a ``threading.Event``) is set."""
+        while stop is None or not stop.is_set():
+            slot = self.source.acquire_latest(self.sequence)
+            if slot is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            try:
+                self.broadcast(slot)
+            finally:
+                self.source.release(slot)
+            await asyncio.sleep(0)  # Let the transports and new clients in
+
+    def broadcast(self, slot):
+        """Encode a frame once and write it to every client that has room for it."""
+        self.sequence = slot.sequence
+        self.frames += 1
+        kind, payload = self.encoder.encode(slot.frame)
+        # Same picture as the previous frame: synced clients have it, only the others need it
+        unchanged = kind != KEYFRAME and len(payload) == self.encoder.grid.bitmap_size
+        # perf_counter means nothing on another machine, send the wall clock time
+        captured = time.time() - (time.perf_counter() - slot.timestamp)
+        message = MESSAGE.pack(kind, len(payload), slot.sequence, captured) + payload
+        keyframe = message if kind == KEYFRAME else None
+
+        for client in list(self.clients):
+            transport = client.writer.transport
+            if transport.is_closing() or (unchanged and client.synced):
+                continue
+            if client.sent - client.acked >= self.max_in_flight or transport.get_write_buffer_size() > self.max_buffered:
+                # Still busy with earlier frames: skip this one, it would only be stale by the time it gets there
+                client.dropped += 1
+                client.synced = False
+                self.frames_dropped += 1
+                continue
+            if client.synced:
+                data = message
+            else:
+                if keyframe is None:
+                    payload = self.encoder.keyframe(slot.frame)
+                    keyframe = MESSAGE.pack(KEYFRAME, len(payload), slot.sequence, captured) + payload
+                data = keyframe
+            client.writer.write(data)
+            client.synced = True
+            client.sent += 1
+            client.bytes_sent += len(data)
+            self.frames_sent += 1
+            self.bytes_sent += len(data)
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for client in list(self.clients):
+                client.writer.close()
+            # Closing a connection ends its handler, let them all finish before the loop goes
+            await asyncio.gather(*self.handlers, return_exceptions=True)
+            await self.server.wait_closed()
+            self.server = None
+
+    async def serve(self, stop=None):
+        """Listen and send frames until ``stop`` is set."""
+        await self.start()
+        try:
+            await self.run(stop)
+        finally:
+            await self.close()
+
+
+class FrameClient:
+    """Receives the frames of a ``FrameServer`` on a background thread.
+
+    Decoded frames are published into a ``FrameRing``, so the viewers take
+    them with the same ``acquire_latest``/``release`` as captured ones. The
+    ``requested`` time of a frame is its capture time on this machine's
+    clock, which makes the telemetry latency the end to end one.
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT, timeout=5.0):
+        self.host, self.port = host, port
+        self.timeout = timeout
+        self.width = self.height = None
+        self.ring = None
+        self.decoder = None
+        self.thread = None
+        self.loop = None
+        self.task = None
+        self.connected = threading.Event()
+        self.running = False
+        self.error = None
+
+        # Statistics
+        self.frames = 0
+        self.keyframes = 0
+        self.skipped = 0  # Frames the server did not send us, unchanged or dropped
+        self.dropped = 0  # Frames received while every ring slot was held, never shown
+        self.bytes_received = 0
+        self.last_sequence = None
+
+    def start(self):
+        """Connect and start receiving, returns False if the server can't be reached."""
+        self.running = True
+        self.thread = threading.Thread(target=asyncio.run, args=(self.receive(),), daemon=True)
+        self.thread.start()
+        if not self.connected.wait(self.timeout) and self.error is None:
+            self.error = f"No answer from {self.host}:{self.port}"
+        if self.error is not None:
+            self.stop()
+            return False
+        return True
+
+    async def receive(self):
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(open_connection(self.host, self.port), self.timeout)
+            magic, width, height, tile = HELLO.unpack(await reader.readexactly(HELLO.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.host}:{self.port} is not an O3C frame server")
+            self.width, self.height = width, height
+            self.decoder = DeltaDecoder(width, height, tile)
+            # The viewer and an exporter may each hold a frame while the next one comes in
+            plan = get_request_plan(width, height, CHUNK_SIZE)
+            self.ring = FrameRing(plan, FrameReader.ring_slots(plan, 0, consumers=2))
+            self.connected.set()
+
+            while self.running:
+                kind, length, sequence, captured = MESSAGE.unpack(await reader.readexactly(MESSAGE.size))
+                payload = await reader.readexactly(length)
+                self.publish(kind, payload, sequence, captured)
+                writer.write(ACK.pack(sequence))
+        except asyncio.CancelledError:
+            pass
+        except asyncio.IncompleteReadError:
+            if self.running:
+                self.error = f"The frame server at {self.host}:{self.port} closed the connection"
+        except (OSError, EOFError, ValueError, asyncio.TimeoutError) as e:
+            if self.running:
+                self.error = f"Connection to {self.host}:{self.port} lost: {e}" if self.connected.is_set() \
+                    else f"Failed to connect to {self.host}:{self.port}: {e}"
+        finally:
+            self.running = False
+            if writer is not None:
+                writer.close()
+
+    def publish(self, kind, payload, sequence, captured):
+        """Decode a message and make it the latest frame."""
+        received = time.time()
+        self.decoder.apply(kind, payload)
+        try:
+            slot = self.ring.acquire_write()
+        except RuntimeError:
+            # Every slot is held by a reader, the decoder stays current and the next frame gets through
+            self.dropped += 1
+            return
+        np.copyto(slot.frame, self.decoder.frame)
+        slot.valid[:] = True
+        slot.requested = time.perf_counter() - (received - captured)
+        self.ring.publish(slot)
+
+        self.frames += 1
+        self.keyframes += kind == KEYFRAME
+        self.bytes_received += MESSAGE.size + len(payload)
+        if self.last_sequence is not None:
+            self.skipped += max(0, sequence - self.last_sequence - 1)
+        self.last_sequence = sequence
+
+    def poll(self):
+        """Whether frames are still coming in."""
+        return self.running
+
+    def acquire_latest(self, after=-1):
+        return self.ring.acquire_latest(after)
+
+    def release(self, slot):
+        self.ring.release(slot)
+
+    def stop(self):
+        self.running = False
+        if self.loop is not None and self.task is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.task.cancel)
+            except RuntimeError:
+                pass  # The loop has finished already
+        if self.thread is not None:
+            self.thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="capture the O3C and serve its frames")
+    serve.add_argument("--host", default="0.0.0.0", help="address to listen on (default: all)")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    serve.add_argument("--duration", type=float, help="stop after this many seconds")
+    serve.add_argument("--window", type=int,
+                       help="chunk requests kept in flight, 0 is lockstep (default: the tuned profile's, else 0)")
+    serve.add_argument("--blocking", action="store_true", help="wait for responses in timed reads")
+    serve.add_argument("--capture-rate", type=float, default=0, help="frames read per second, 0 is unlimited")
+    view = commands.add_parser("view", help="show the frames of a server in the OpenGL viewer")
+    view.add_argument("address", help="host[:port] of the server")
+    view.add_argument("--fps", type=int, default=60, help="display rate (default: 60)")
+    args = parser.parse_args()
+
+    from main_opengl import HIDListener
+    if args.command == "serve":
+        listener = HIDListener(pipeline_window=args.window, blocking_reads=args.blocking, capture_rate=args.capture_rate)
+        listener.start_server(args.host, args.port, args.duration)
+    else:
+        HIDListener(fps_limit=args.fps, remote=args.address).start()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Frame pacing on absolute deadlines."""
+import math
+import time
+
+
+def sleep_until(deadline, spin=0.001):
+    """Sleep until a ``time.perf_counter`` deadline.
+
+    The OS sleep is only trusted up to ``spin`` seconds before the deadline,
+    the rest is spent yielding in a tight loop, so wake-ups are precise
+    even with coarse kernel timers.
+    """
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+        time.sleep(remaining - spin if remaining > spin else 0)
+
+
+class FrameScheduler:
+    """Paces a loop at ``rate`` ticks per second on a fixed grid of deadlines.
+
+    Deadlines are absolute, so the time spent working between ticks does not
+    add up to drift. A tick that wakes up after the next deadline already
+    passed skips ahead on the grid and counts the deadlines it missed.
+    A rate of 0 never waits.
+    """
+
+    def __init__(self, rate, spin=0.001):
+        self.period = 1 / rate if rate > 0 else 0.0
+        self.spin = spin
+        self.deadline = time.perf_counter()
+        self.ticks = 0
+        self.missed = 0
+
+    def remaining(self):
+        """Seconds until the next deadline, 0 if it already passed."""
+        return max(0.0, self.deadline - time.perf_counter())
+
+    def wait(self):
+        """Sleep until the next deadline, then move on to the one after."""
+        if self.period:
+            sleep_until(self.deadline, self.spin)
+        self.advance()
+
+    def advance(self):
+        """Move on to the next deadline without sleeping, counting the ones already missed."""
+        self.ticks += 1
+        if not self.period:
+            return
+        now = time.perf_counter()
+        self.deadline += self.period
+        if now >= self.deadline:
+            late = math.floor((now - self.deadline) / self.period) + 1
+            self.missed += late
+            self.deadline += late * self.period
@@ -0,0 +1,201 @@
+"""Device capture in a child process, handing frames over through shared memory.
+
+Reading and decoding then run in their own interpreter, so they never
+compete with the renderer for the GIL. The child owns the device and a
+``SharedFrameRing``; the viewer maps the ring and takes frames from it
+through the same ``acquire_latest``/``release`` calls as a ``FrameRing``.
+"""
+import functools
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+
+from o3c_capture import (CONNECTED, RECONNECTING, DeviceSupervisor, FrameReader, FrameRing, describe_busy, import_hid,
+                         open_device)
+from o3c_pacing import FrameScheduler
+from o3c_protocol import get_request_plan
+from o3c_shm import SharedFrameClient, SharedFrameRing
+
+
+def capture_main(options, stop, messages):
+    """Child process: read frames into the shared ring until ``stop`` is set.
+
+    Everything the parent needs to know goes through ``messages``:
+    ("ready", description), ("error", text), ("state", (state, text)) when
+    the device is lost or back, and finally ("stopped", stats).
+    """
+    try:
+        hid = options['hid_factory']()
+        reopen = functools.partial(open_device, hid, options['vendor_id'], options['product_id'],
+                                   options['usage_page'], options['blocking'])
+        device = reopen()
+    except Exception as e:
+        messages.put(("error", f"Failed to open device: {e}"))
+        return
+
+    shared = None
+    supervisor = None
+    try:
+        plan = get_request_plan(options['width'], options['height'], options['chunk_size'])
+        # Nobody reads the local ring, the frames go out through the shared one
+        ring = FrameRing(plan, FrameReader.ring_slots(plan, options['window'], consumers=0))
+        try:
+            shared = SharedFrameRing(plan.width, plan.height, name=options['name'])
+        except FileExistsError as e:
+            messages.put(("error", f"Failed to share frames with the viewer: {e}"))
+            return
+        # An unplugged device is reopened here, the viewer just sees no new frames meanwhile and hears why
+        supervisor = DeviceSupervisor(device, ring, reopen, lambda device: FrameReader(
+            device, ring, window=options['window'], timeout=options['timeout'], blocking=options['blocking'], shared=shared),
+            report=lambda text: messages.put(("state", (supervisor.state, text))))
+        messages.put(("ready", f"{device.get_manufacturer_string()} {device.get_product_string()}"))
+
+        capture = FrameScheduler(options['capture_rate'])
+        while not stop.is_set():
+            supervisor.read_frame()
+            capture.wait()
+    except Exception as e:
+        messages.put(("error", f"Error reading from device: {e}"))
+    finally:
+        if supervisor is not None:
+            supervisor.close()
+        else:
+            device.close()
+        if shared is not None:
+            shared.close()
+        stats = {}
+        if supervisor is not None:
+            reader = supervisor.reader
+            wait_time, work_time = supervisor.reader_times()
+            stats = {'frames': supervisor.frames, 'disconnects': supervisor.disconnects,
+                     'recover_times': supervisor.recover_times, 'wait_time': wait_time, 'work_time': work_time,
+                     'busy_ratio': work_time / (wait_time + work_time) if wait_time + work_time else 0.0}
+            if reader is not None:
+                stats.update(partial_frames=reader.partial_frames, timeouts=reader.timeouts)
+        messages.put(("stopped", stats))
+
+
+class CaptureProcess:
+    """Runs the capture of one device in a child process.
+
+    ``hid_factory`` must be picklable and return the ``hid`` module or a
+    stand-in such as ``O3CEmulator``; it is called in the child.
+    """
+
+    def __init__(self, vendor_id=0x8089, product_id=0x0009, usage_page=0xFF12, width=160, height=80,
+                 chunk_size=0x3F4, window=0, blocking=False, capture_rate=0, hid_factory=import_hid, name=None,
+                 timeout=0.05):
+        self.options = {
+            'vendor_id': vendor_id, 'product_id': product_id, 'usage_page': usage_page,
+            'width': width, 'height': height, 'chunk_size': chunk_size,
+            'window': window, 'timeout': timeout, 'blocking': blocking, 'capture_rate': capture_rate,
+            'hid_factory': hid_factory,
+            'name': name or f"o3c_capture_{os.getpid()}",  # One ring per viewer
+        }
+        context = multiprocessing.get_context("spawn")  # No GL or Tk state carried into the child
+        self.stop_event = context.Event()
+        self.messages = context.Queue()
+        self.process = context.Process(target=capture_main, args=(self.options, self.stop_event, self.messages),
+                                       daemon=True)
+        self.client = None
+        self.description = None
+        self.error = None
+        self.stats = None
+        self.state = None     # The child's device state, as of the last message
+        self.buffers = []     # Local copies of frames, handed out by acquire_latest and back on release
+        self.torn_frames = 0  # Copies the child overwrote while they were made, read again
+        self.dropped_frames = 0  # Torn on every retry, never handed out
+
+    def start(self, timeout=10.0):
+        """Start the child and wait until it is capturing, returns False if it failed."""
+        self.process.start()
+        kind, value = "error", "Capture process did not start in time"
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            try:
+                kind, value = self.messages.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if not self.process.is_alive() and self.messages.empty():
+                    kind, value = "error", f"Capture process exited with code {self.process.exitcode}"
+                    break
+        if kind != "ready":
+            self.error = value
+            self.stop()
+            return False
+        self.description = value
+        self.state = CONNECTED
+        self.client = SharedFrameClient(self.options['name'])
+        return True
+
+    def poll(self):
+        """Pick up messages from the child, returns False once it stopped capturing."""
+        while True:
+            try:
+                kind, value = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "error":
+                self.error = value
+            elif kind == "state":
+                self.state, text = value
+                print(f"{text} (capture process)")
+            elif kind == "stopped":
+                self.stats = value
+        return self.error is None and self.stats is None and self.process.is_alive()
+
+    def acquire_latest(self, after=-1, retries=3):
+        """The newest frame if newer than ``after``, copied out of shared memory, else None.
+
+        The child may overwrite the slot at any time, so the pixels are
+        copied and the copy checked against the slot's seqlock. A torn copy
+        is made again from the newest frame, and after ``retries`` torn
+        copies the frame is dropped, the renderer never gets one.
+        """
+        if self.client is None:
+            return None
+        height, width = self.options['height'], self.options['width']
+        buffer = self.buffers.pop() if self.buffers else np.empty((height, width), dtype=np.uint16)
+        for _ in range(retries):
+            frame = self.client.latest(after)
+            if frame is None:
+                break
+            np.copyto(buffer, frame.frame)
+            if frame.valid():
+                frame.frame = buffer
+                return frame
+            self.torn_frames += 1
+        else:
+            self.dropped_frames += 1
+        self.buffers.append(buffer)
+        return None
+
+    def release(self, frame):
+        """Done with a frame from ``acquire_latest``."""
+        self.buffers.append(frame.frame)
+
+    def summary(self):
+        stats = self.stats or {}
+        text = (f"Capture process: {stats.get('frames', 0)} frames, {stats.get('disconnects', 0)} disconnects, "
+                f"{self.torn_frames} torn copies read again, {self.dropped_frames} dropped")
+        if 'wait_time' in stats:
+            text += f", {describe_busy(stats['wait_time'], stats['work_time'])}"
+        if self.state == RECONNECTING:
+            text += ", still disconnected"
+        return text
+
+    def stop(self, timeout=2.0):
+        """Stop the child and unmap the ring."""
+        self.stop_event.set()
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+        if self.process.pid is not None:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        self.poll()
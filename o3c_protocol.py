@@ -0,0 +1,92 @@
+"""Wire format of the O3C screen read reports, shared by both viewers."""
+from functools import lru_cache
+
+import numpy as np
+
+REPORT_ID = 0x22
+REPORT_SIZE = 1024            # Requests and responses are always full 1 KB reports
+SCREEN_READ_COMMAND = 0x25
+RESPONSE_DATA_OFFSET = 0xC    # Pixel data starts at offset 12
+MAX_RESPONSE_LENGTH = 0x3FC   # Largest length field a response may claim
+CHUNK_SIZE = 0x3F4            # Bytes of screen data requested per packet
+
+
+def packet_checksum(packet):
+    """16-bit sum of the little-endian words of a report, counting the checksum field as 0."""
+    if not isinstance(packet, (bytes, bytearray, memoryview)):
+        packet = bytes(packet)
+    words = np.frombuffer(packet, dtype='<u2', count=len(packet) // 2)
+    return (int(words.sum()) - int(words[1])) & 0xFFFF
+
+
+def build_request(offset):
+    """Build the checksummed screen read request for the chunk at byte ``offset``."""
+    packet = bytearray(REPORT_SIZE)
+    packet[0:8] = bytes([REPORT_ID, 0x03, 0x00, 0x00, 0x08, 0x00, SCREEN_READ_COMMAND, 0x00])
+    packet[8:12] = offset.to_bytes(4, 'little')
+
+    checksum = packet_checksum(packet)
+    packet[2] = checksum & 0xFF
+    packet[3] = (checksum >> 8) & 0xFF
+    return bytes(packet)
+
+
+class RequestPlan:
+    """The finished, immutable request packets that read one whole frame.
+
+    Requests never change between frames, so they are built and checksummed
+    once per (width, height, chunk size) and written to the device as is.
+    """
+
+    __slots__ = ('width', 'height', 'chunk_size', 'offsets', 'packets')
+
+    def __init__(self, width, height, chunk_size=CHUNK_SIZE):
+        if not 0 < chunk_size <= MAX_RESPONSE_LENGTH - 8:
+            raise ValueError(f"Chunk size must be between 1 and {MAX_RESPONSE_LENGTH - 8}, got {chunk_size}")
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.offsets = tuple(range(0, width * height * 2, chunk_size))
+        self.packets = tuple(build_request(offset) for offset in self.offsets)
+
+    def __len__(self):
+        return len(self.packets)
+
+    def matches(self, width, height, chunk_size=CHUNK_SIZE):
+        """Whether this plan was built for the given geometry and chunk size."""
+        return (self.width, self.height, self.chunk_size) == (width, height, chunk_size)
+
+
+@lru_cache(maxsize=8)
+def get_request_plan(width, height, chunk_size=CHUNK_SIZE):
+    """Return the shared ``RequestPlan`` for a geometry, building it only the first time."""
+    return RequestPlan(width, height, chunk_size)
+
+
+def response_offset(response):
+    """Byte offset into the screen that a response report carries."""
+    return response[8] | (response[9] << 8) | (response[10] << 16) | (response[11] << 24)
+
+
+def decode_report(response, frame):
+    """Copy the RGB565 payload of a response report into a flat uint16 ``frame``.
+
+    The payload is reinterpreted as little-endian uint16 in one go and copied
+    into its slice of the frame, clamped to both the report and the frame.
+    Returns the number of pixels the report carried (0 for an empty report).
+    """
+    data_len = min(response[4] | (response[5] << 8), MAX_RESPONSE_LENGTH) - 8
+    if data_len <= 0:
+        return 0
+
+    count = data_len // 2
+    pos = response_offset(response) // 2  # Convert byte offset to 16-bit word offset
+
+    if not isinstance(response, (bytes, bytearray, memoryview)):
+        response = bytes(response)  # hidapi returns a list of ints
+
+    available = min(count, (len(response) - RESPONSE_DATA_OFFSET) // 2)
+    end = min(pos + available, frame.size)
+    if end > pos:
+        frame[pos:end] = np.frombuffer(response, dtype='<u2', count=end - pos, offset=RESPONSE_DATA_OFFSET)
+    return count
@@ -0,0 +1,312 @@
+"""Recorded O3C sessions: a compact delta-encoded file and an mmap player.
+
+File layout, little-endian::
+
+    header   magic "O3CREC01", width, height, tile size, keyframe interval (u16), padding to 32 bytes
+    records  kind (u8), payload length (u32), payload
+    index    frame offsets (u64), timestamps (f64), keyframe of each frame (u32)
+    footer   index offset (u64), frame count (u64), magic "O3CIDX01"
+
+A keyframe's payload is the zlib-compressed RGB565 frame. A delta's payload
+is a bitmap of the tiles that changed since the previous frame followed by
+the zlib-compressed XOR of those tiles, which is left out when none did, so
+a static screen costs a few bytes per frame. Keyframes come at least every
+``keyframe_interval`` frames, which bounds the work of a seek. The index is
+written on ``close``; a file without one (say the viewer crashed) is
+scanned once when opened instead. ``DeltaEncoder`` and ``DeltaDecoder`` do
+the encoding, ``o3c_net`` streams the same payloads.
+"""
+import mmap
+import struct
+import time
+import zlib
+
+import numpy as np
+
+MAGIC = b"O3CREC01"
+INDEX_MAGIC = b"O3CIDX01"
+HEADER = struct.Struct("<8sHHHH16x")
+RECORD = struct.Struct("<BI")
+FOOTER = struct.Struct("<QQ8s")
+KEYFRAME, DELTA = 0, 1
+
+
+class TileGrid:
+    """Splits frames into square tiles for delta encoding."""
+
+    def __init__(self, width, height, tile):
+        if width % tile or height % tile:
+            raise ValueError(f"{width}x{height} frames can't be split into {tile}x{tile} tiles")
+        self.width, self.height, self.tile = width, height, tile
+        self.shape = (height // tile, width // tile)
+        self.count = self.shape[0] * self.shape[1]
+        self.bitmap_size = (self.count + 7) // 8
+
+    def tiles(self, frame):
+        """(rows, columns, tile, tile) view of a frame."""
+        tile = self.tile
+        return frame.reshape(self.shape[0], tile, self.shape[1], tile).swapaxes(1, 2)
+
+
+class DeltaEncoder:
+    """Encodes frames as keyframes or as tile deltas against the previous frame.
+
+    Shared by the recorder and the network server, each payload is what a
+    record of the file carries.
+    """
+
+    def __init__(self, width, height, tile=16, keyframe_interval=300, level=1):
+        self.grid = TileGrid(width, height, tile)
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self.previous = np.zeros((height, width), dtype='<u2')
+        self.difference = np.zeros((height, width), dtype='<u2')
+        self.frames = 0
+        self.last_keyframe = 0
+        self.keyframe_count = 0
+
+    def keyframe(self, frame):
+        """A keyframe payload for ``frame``, leaving the delta chain alone."""
+        return zlib.compress(frame.astype('<u2', copy=False), self.level)
+
+    def encode(self, frame):
+        """(kind, payload) of the next frame, a delta against the previous one when that is cheaper."""
+        np.bitwise_xor(frame, self.previous, out=self.difference)
+        changed = self.grid.tiles(self.difference).any(axis=(2, 3))
+        # A delta that touches most tiles is no cheaper than a keyframe
+        keyframe = (not self.frames or self.frames - self.last_keyframe >= self.keyframe_interval
+                    or np.count_nonzero(changed) * 2 > self.grid.count)
+
+        if keyframe:
+            kind = KEYFRAME
+            payload = self.keyframe(frame)
+            self.last_keyframe = self.frames
+            self.keyframe_count += 1
+        else:
+            kind = DELTA
+            payload = np.packbits(changed.ravel()).tobytes()
+            if changed.any():
+                payload += zlib.compress(self.grid.tiles(self.difference)[changed], self.level)
+        self.frames += 1
+        np.copyto(self.previous, frame)
+        return kind, payload
+
+
+class DeltaDecoder:
+    """Rebuilds frames from the payloads of a ``DeltaEncoder``."""
+
+    def __init__(self, width, height, tile=16):
+        self.grid = TileGrid(width, height, tile)
+        self.frame = np.zeros((height, width), dtype='<u2')  # The decoded frame
+
+    def apply(self, kind, payload):
+        """Decode a payload on top of the current frame."""
+        if kind == KEYFRAME:
+            self.frame[:] = np.frombuffer(zlib.decompress(payload), dtype='<u2').reshape(self.frame.shape)
+            return
+        bitmap_size = self.grid.bitmap_size
+        if len(payload) == bitmap_size:
+            return  # Nothing changed
+        changed = np.unpackbits(np.frombuffer(payload[:bitmap_size], dtype=np.uint8), count=self.grid.count)
+        changed = changed.astype(bool).reshape(self.grid.shape)
+        tile = self.grid.tile
+        tiles = np.frombuffer(zlib.decompress(payload[bitmap_size:]), dtype='<u2').reshape(-1, tile, tile)
+        view = self.grid.tiles(self.frame)
+        view[changed] ^= tiles
+
+
+class SessionRecorder:
+    """Appends frames to a recording file.
+
+    ``write_frame`` is cheap enough to call from the reader thread: an XOR
+    against the previous frame, a per-tile change check and zlib on the
+    tiles that changed.
+    """
+
+    def __init__(self, path, width, height, tile=16, keyframe_interval=300, level=1):
+        self.encoder = DeltaEncoder(width, height, tile, keyframe_interval, level)
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, width, height, tile, keyframe_interval))
+        self.start_time = None
+
+        # Index, written on close
+        self.offsets = []
+        self.timestamps = []
+        self.keyframes = []
+
+        # Statistics
+        self.frames = 0
+        self.bytes_written = HEADER.size
+
+    @property
+    def keyframe_count(self):
+        return self.encoder.keyframe_count
+
+    def write_frame(self, frame, timestamp=None):
+        """Append an RGB565 frame captured at ``timestamp`` (``time.perf_counter`` seconds)."""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = timestamp
+
+        kind, payload = self.encoder.encode(frame)
+        self.offsets.append(self.bytes_written)
+        self.timestamps.append(timestamp - self.start_time)
+        self.keyframes.append(self.encoder.last_keyframe)
+        self.file.write(RECORD.pack(kind, len(payload)))
+        self.file.write(payload)
+        self.bytes_written += RECORD.size + len(payload)
+        self.frames += 1
+
+    def close(self):
+        """Write the index and close the file."""
+        if self.file is None:
+            return
+        index_offset = self.bytes_written
+        self.file.write(np.array(self.offsets, dtype='<u8').tobytes())
+        self.file.write(np.array(self.timestamps, dtype='<f8').tobytes())
+        self.file.write(np.array(self.keyframes, dtype='<u4').tobytes())
+        self.file.write(FOOTER.pack(index_offset, self.frames, INDEX_MAGIC))
+        self.file.close()
+        self.file = None
+
+
+class PlaybackFrame:
+    """The frame a ``SessionPlayer`` hands out, shaped like a ``FrameSlot``."""
+
+    __slots__ = ('sequence', 'frame', 'timestamp', 'requested')
+
+    def __init__(self, sequence, frame, timestamp):
+        self.sequence = sequence
+        self.frame = frame
+        self.timestamp = timestamp
+        self.requested = timestamp
+
+
+class SessionPlayer:
+    """Plays a recording from a memory-mapped file.
+
+    ``frame_at`` decodes any frame: the index gives its offset and its
+    keyframe, so a seek costs at most one keyframe interval of deltas, and
+    stepping forward costs a single delta. With ``acquire_latest`` and
+    ``release`` the player also stands in for the viewers' ``FrameRing``,
+    handing out frames in real time, looping at the end if asked.
+
+    Every frame is decoded into the same buffer, on top of the one before,
+    so a player belongs to one thread: ``fork`` gives another thread a
+    player of its own, in step with this one.
+    """
+
+    def __init__(self, path, loop=True, speed=1.0):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, width, height, tile, self.keyframe_interval = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an O3C recording")
+        self.width, self.height = width, height
+        self.decoder = DeltaDecoder(width, height, tile)
+        self.frame = self.decoder.frame  # The decoded frame
+        self.loop = loop
+        self.speed = speed
+
+        self.offsets, self.timestamps, self.keyframes = self.read_index()
+        if not len(self.offsets):
+            self.close()
+            raise ValueError(f"{path} has no frames")
+
+        self.position = -1  # Which frame ``frame`` holds
+        self.start_time = None
+
+    def read_index(self):
+        """The index from the footer, or rebuilt by scanning the records."""
+        size = len(self.map)
+        if size >= HEADER.size + FOOTER.size:
+            index_offset, count, magic = FOOTER.unpack_from(self.map, size - FOOTER.size)
+            if magic == INDEX_MAGIC:
+                offsets = np.frombuffer(self.map, dtype='<u8', count=count, offset=index_offset)
+                timestamps = np.frombuffer(self.map, dtype='<f8', count=count, offset=index_offset + 8 * count)
+                keyframes = np.frombuffer(self.map, dtype='<u4', count=count, offset=index_offset + 16 * count)
+                return offsets, timestamps, keyframes
+
+        # No index, the recording was not closed properly: timing is lost, assume 30 fps
+        offsets, keyframes = [], []
+        offset = HEADER.size
+        while offset + RECORD.size <= size:
+            kind, length = RECORD.unpack_from(self.map, offset)
+            if offset + RECORD.size + length > size:
+                break  # Cut off mid-record
+            if kind == KEYFRAME:
+                keyframe = len(offsets)
+            elif not offsets:
+                break
+            offsets.append(offset)
+            keyframes.append(keyframe)
+            offset += RECORD.size + length
+        return np.array(offsets, dtype='<u8'), np.arange(len(offsets)) / 30, np.array(keyframes, dtype='<u4')
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def duration(self):
+        """Seconds from the first to the last frame."""
+        return float(self.timestamps[-1])
+
+    def frame_at(self, index):
+        """Decode frame ``index``, returned in a buffer reused by the next call."""
+        keyframe = int(self.keyframes[index])
+        # Keep going from the current frame when it is on the way
+        start = self.position + 1 if keyframe <= self.position <= index else keyframe
+        for position in range(start, index + 1):
+            self.apply(position)
+        self.position = index
+        return self.frame
+
+    def apply(self, position):
+        """Decode record ``position`` on top of the previous frame."""
+        offset = int(self.offsets[position])
+        kind, length = RECORD.unpack_from(self.map, offset)
+        payload = memoryview(self.map)[offset + RECORD.size:offset + RECORD.size + length]
+        try:
+            self.decoder.apply(kind, payload)
+        finally:
+            payload.release()
+
+    def index_at(self, seconds):
+        """The frame showing ``seconds`` into the recording."""
+        return max(0, int(np.searchsorted(self.timestamps, seconds, side='right')) - 1)
+
+    def acquire_latest(self, after=-1):
+        """The frame due now if newer than sequence ``after``, else None."""
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+        elapsed = (now - self.start_time) * self.speed
+        # Looping keeps the sequence growing across passes
+        period = self.duration + (self.duration / max(len(self) - 1, 1))
+        passes = 0
+        if self.loop and period > 0:
+            passes, elapsed = divmod(elapsed, period)
+        index = self.index_at(elapsed)
+        sequence = int(passes) * len(self) + index
+        if sequence <= after:
+            return None
+        return PlaybackFrame(sequence, self.frame_at(index), self.start_time + (passes * period + self.timestamps[index]) / self.speed)
+
+    def release(self, frame):
+        pass
+
+    def fork(self):
+        """Another player of the same recording with its own decoder, handing out the same frames at the same time."""
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        player = SessionPlayer(self.path, self.loop, self.speed)
+        player.start_time = self.start_time
+        return player
+
+    def close(self):
+        self.offsets = self.timestamps = self.keyframes = None
+        self.map.close()
+        self.file.close()
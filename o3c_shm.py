@@ -0,0 +1,247 @@
+"""Frame ring in shared memory, for consumers in other processes.
+
+The viewer publishes every decoded frame into a ``multiprocessing``
+shared memory block that any process can map by name and read without
+copying. All fields are little-endian 64-bit words::
+
+    header   magic, version, format, width, height, slots, slot stride, frames, writer PID, padding to 128 bytes
+    slot     seq, frame number, timestamp, request time, then the pixels
+
+``frames`` counts the frames published so far, the newest one sits in slot
+``(frames - 1) % slots``. Each slot is guarded by a seqlock: the writer
+makes its ``seq`` odd while it fills the slot and even again when done, so
+a reader that sees the same even ``seq`` before and after looking at the
+pixels knows they were not overwritten meanwhile.
+
+    client = SharedFrameClient()
+    frame = client.latest()
+    if frame is not None:
+        use(frame.frame)          # Read-only (height, width) uint16 view
+        if not frame.valid():     # Overwritten while in use, try again
+            ...
+"""
+import os
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+DEFAULT_NAME = "o3c_frames"
+MAGIC = 0x4D48535F43334F  # "O3C_SHM"
+VERSION = 2
+FORMAT_RGB565 = 1
+
+HEADER_WORDS = 9
+HEADER_SIZE = 128  # Padded, the slots stay cache line aligned
+SLOT_HEADER_SIZE = 32
+(MAGIC_FIELD, VERSION_FIELD, FORMAT_FIELD, WIDTH_FIELD, HEIGHT_FIELD, SLOTS_FIELD, STRIDE_FIELD, FRAMES_FIELD,
+ OWNER_FIELD) = range(9)
+SEQ_FIELD, NUMBER_FIELD = 0, 1
+
+
+def slot_stride(width, height):
+    """Bytes from one slot to the next, cache line aligned."""
+    return (SLOT_HEADER_SIZE + width * height * 2 + 63) & ~63
+
+
+def attach(name):
+    """Map an existing block without handing it to this process's resource tracker.
+
+    The tracker would remove the block when this process exits, but it
+    belongs to the writer. Python 3.13 has ``track=False`` for that, older
+    versions register every block they open.
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+def process_alive(pid):
+    """Whether process ``pid`` still runs."""
+    if os.name == "nt":
+        # os.kill would end it, and Windows removes a block once nobody has it open, so its owner is there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Runs, as another user
+    return True
+
+
+class SharedMemoryView:
+    """Numpy views of the header and slots of a mapped ring."""
+
+    def map(self, shm, width, height, slots, stride):
+        buffer = shm.buf
+        self.header = np.ndarray(HEADER_WORDS, dtype='<u8', buffer=buffer)
+        self.slot_headers = []
+        self.timestamps = []
+        self.pixels = []
+        for i in range(slots):
+            offset = HEADER_SIZE + i * stride
+            self.slot_headers.append(np.ndarray(2, dtype='<u8', buffer=buffer, offset=offset))
+            self.timestamps.append(np.ndarray(2, dtype='<f8', buffer=buffer, offset=offset + 16))  # Published, requested
+            self.pixels.append(np.ndarray((height, width), dtype='<u2', buffer=buffer, offset=offset + SLOT_HEADER_SIZE))
+
+    def unmap(self):
+        # The block can only be closed once no view points into it
+        self.header = None
+        self.slot_headers = self.timestamps = self.pixels = []
+
+
+class SharedFrameRing(SharedMemoryView):
+    """Writer side: publishes frames into a named shared memory block.
+
+    Only one process may write, its PID is kept in the header. The block is
+    removed again on ``close``. A block of the same name left behind by a
+    writer that died is replaced, one whose writer still runs is not.
+    """
+
+    def __init__(self, width, height, slots=8, name=DEFAULT_NAME):
+        self.width, self.height = width, height
+        self.slots = slots
+        self.name = name
+        self.stride = slot_stride(width, height)
+        size = HEADER_SIZE + slots * self.stride
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            remove_stale(name)
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+
+        self.map(self.shm, width, height, slots, self.stride)
+        self.header[:] = (MAGIC, VERSION, FORMAT_RGB565, width, height, slots, self.stride, 0, os.getpid())
+        self.frames = 0
+
+    def publish(self, frame, timestamp, requested=0.0):
+        """Copy an RGB565 frame into the next slot and make it the latest."""
+        index = self.frames % self.slots
+        slot_header = self.slot_headers[index]
+        slot_header[SEQ_FIELD] += 1  # Odd, readers keep off
+        np.copyto(self.pixels[index], frame)
+        self.timestamps[index][:] = (timestamp, requested)
+        slot_header[NUMBER_FIELD] = self.frames
+        slot_header[SEQ_FIELD] += 1  # Even again, the slot is consistent
+        self.frames += 1
+        self.header[FRAMES_FIELD] = self.frames
+
+    def close(self):
+        self.unmap()
+        self.shm.close()
+        self.shm.unlink()
+
+
+def remove_stale(name):
+    """Remove the block ``name`` left behind by a writer that is gone, raising FileExistsError if it is not."""
+    block = attach(name)
+    owner = None
+    if block.size >= HEADER_SIZE:
+        header = np.ndarray(HEADER_WORDS, dtype='<u8', buffer=block.buf)
+        if header[MAGIC_FIELD] == MAGIC and header[VERSION_FIELD] == VERSION:
+            owner = int(header[OWNER_FIELD])
+        del header
+    block.close()
+    if owner is None:
+        raise FileExistsError(f"Shared memory {name!r} exists and is not an O3C frame ring of version {VERSION}, "
+                              f"remove it or pick another name")
+    if process_alive(owner):
+        raise FileExistsError(f"Shared memory {name!r} is in use by process {owner}, pick another name")
+    # Left behind by a viewer that did not exit cleanly
+    stale = shared_memory.SharedMemory(name)
+    stale.close()
+    stale.unlink()
+
+
+class SharedFrame:
+    """A frame of a ``SharedFrameClient``, viewed in place in shared memory."""
+
+    __slots__ = ('number', 'timestamp', 'requested', 'frame', 'seq', 'slot_header')
+
+    def __init__(self, number, timestamp, requested, frame, seq, slot_header):
+        self.number = number        # Frames published before this one
+        self.timestamp = timestamp  # time.perf_counter() of the publishing process
+        self.requested = requested  # When its first request was written, if the writer knows
+        self.frame = frame          # Read-only (height, width) RGB565 view
+        self.seq = seq
+        self.slot_header = slot_header
+
+    @property
+    def sequence(self):
+        """Same as ``number``, the name a ``FrameSlot`` uses."""
+        return self.number
+
+    def valid(self):
+        """Whether the writer has left this frame's slot alone so far."""
+        return self.slot_header[SEQ_FIELD] == self.seq
+
+
+class SharedFrameClient(SharedMemoryView):
+    """Reader side: maps a ring published by a viewer, any number of processes at once."""
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.shm = attach(name)
+
+        header = np.ndarray(HEADER_WORDS, dtype='<u8', buffer=self.shm.buf)
+        if header[MAGIC_FIELD] != MAGIC or header[VERSION_FIELD] != VERSION:
+            del header
+            self.shm.close()
+            raise ValueError(f"{name} is not an O3C frame ring (version {VERSION})")
+        self.format = int(header[FORMAT_FIELD])
+        self.width, self.height = int(header[WIDTH_FIELD]), int(header[HEIGHT_FIELD])
+        self.slots, self.stride = int(header[SLOTS_FIELD]), int(header[STRIDE_FIELD])
+        del header
+
+        self.map(self.shm, self.width, self.height, self.slots, self.stride)
+        for pixels in self.pixels:
+            pixels.flags.writeable = False
+
+    @property
+    def frames(self):
+        """Frames published so far."""
+        return int(self.header[FRAMES_FIELD])
+
+    def latest(self, after=-1, retries=3):
+        """The newest frame if its number is above ``after``, else None.
+
+        Nothing is copied: the frame stays valid until the writer comes
+        around to its slot again, which ``SharedFrame.valid`` tells.
+        """
+        for _ in range(retries):
+            frames = self.frames
+            if not frames or frames - 1 <= after:
+                return None
+            index = (frames - 1) % self.slots
+            slot_header = self.slot_headers[index]
+            seq = int(slot_header[SEQ_FIELD])
+            if seq & 1 or slot_header[NUMBER_FIELD] != frames - 1:
+                continue  # Being rewritten, look again
+            timestamp, requested = self.timestamps[index]
+            frame = SharedFrame(frames - 1, float(timestamp), float(requested), self.pixels[index], seq, slot_header)
+            if frame.valid():
+                return frame
+        return None
+
+    def read(self, out, after=-1, retries=3):
+        """Copy the newest frame into ``out``, returning its ``SharedFrame`` or None.
+
+        Unlike ``latest`` the copy is checked, so ``out`` never holds a torn frame.
+        """
+        for _ in range(retries):
+            frame = self.latest(after)
+            if frame is None:
+                return None
+            np.copyto(out, frame.frame)
+            if frame.valid():
+                return frame
+        return None
+
+    def close(self):
+        self.unmap()
+        self.shm.close()
@@ -0,0 +1,233 @@
+"""The frames of an O3C as an iterator, for using the capture in other programs.
+
+    async with O3CStream() as stream:
+        async for frame in stream:
+            handle(frame.frame, frame.sequence, frame.timestamp)
+
+    with O3CStream() as stream:
+        for frame in stream:
+            ...
+
+Nothing here imports a GUI toolkit. The device is read on a background
+thread into a ``FrameRing``, and the stream keeps up to ``buffer`` of the
+newest frames for the consumer, dropping the oldest when it falls behind.
+A frame is a read-only view into the ring that stays valid until the next
+frame is taken, copy ``frame.frame`` to keep it longer. Cancelling a task
+waiting for a frame leaves the stream usable, ``close`` (or leaving the
+``with`` block) stops the capture and ends every iteration. With ``async``
+the device is opened and closed on the loop's executor, never on the loop.
+"""
+import asyncio
+import threading
+from collections import deque
+
+from o3c_capture import FrameReader, FrameRing, import_hid, open_device
+from o3c_pacing import FrameScheduler
+from o3c_protocol import CHUNK_SIZE, get_request_plan
+
+
+class StreamFrame:
+    """A captured frame handed out by an ``O3CStream``."""
+
+    __slots__ = ('sequence', 'timestamp', 'requested', 'frame')
+
+    def __init__(self, slot):
+        self.sequence = slot.sequence    # Frames published before this one
+        self.timestamp = slot.timestamp  # time.perf_counter() when it was decoded
+        self.requested = slot.requested  # When its first request was written
+        self.frame = slot.frame.view()   # Read-only (height, width) RGB565 view
+        self.frame.flags.writeable = False
+
+
+class O3CStream:
+    """Iterates over the frames of an O3C, synchronously or with ``async for``.
+
+    ``hid`` is the ``hid`` module or a stand-in such as ``O3CEmulator``, by
+    default ``hid`` is imported when the stream opens. The other arguments
+    are those of ``FrameReader``, plus the ``capture_rate`` in frames/s (0
+    reads as fast as the device answers).
+    """
+
+    def __init__(self, vendor_id=0x8089, product_id=0x0009, usage_page=0xFF12, width=160, height=80,
+                 chunk_size=CHUNK_SIZE, window=0, blocking=False, capture_rate=0, buffer=4, hid=None):
+        if buffer < 1:
+            raise ValueError("The stream needs room for at least one frame")
+        self.vendor_id, self.product_id, self.usage_page = vendor_id, product_id, usage_page
+        self.plan = get_request_plan(width, height, chunk_size)
+        self.window = window
+        self.blocking = blocking
+        self.capture_rate = capture_rate
+        self.buffer = buffer
+        self.hid = hid
+        self.device = None
+        self.ring = None
+        self.reader = None
+        self.thread = None
+        self.running = False
+        self.closed = False
+        self.error = None
+
+        self.condition = threading.Condition()
+        self.queue = deque()  # Ring slots waiting for the consumer, oldest first
+        self.held = None      # Slot of the frame the consumer has now
+        self.waiter = None    # (loop, asyncio.Event) of an async consumer
+
+        # Statistics
+        self.frames = 0   # Frames captured
+        self.dropped = 0  # Frames pushed out of a full buffer before the consumer got to them
+
+    def open(self):
+        """Open the device and start capturing, raising IOError if it can't be opened."""
+        if self.thread is not None:
+            return
+        if self.closed:
+            raise ValueError("The stream is closed")
+        hid = self.hid if self.hid is not None else import_hid()
+        self.device = open_device(hid, self.vendor_id, self.product_id, self.usage_page, self.blocking)
+        # The buffered frames and the consumer's hold slots on top of what the reader needs
+        slots = FrameReader.ring_slots(self.plan, self.window, consumers=0) + self.buffer + 1
+        self.ring = FrameRing(self.plan, slots)
+        self.reader = FrameReader(self.device, self.ring, window=self.window, blocking=self.blocking)
+        self.running = True
+        self.thread = threading.Thread(target=self.capture_loop, daemon=True)
+        self.thread.start()
+
+    def capture_loop(self):
+        capture = FrameScheduler(self.capture_rate)
+        sequence = -1
+        try:
+            while self.running:
+                self.reader.read_frame()
+                slot = self.ring.acquire_latest(sequence)
+                if slot is not None:
+                    sequence = slot.sequence
+                    self.push(slot)
+                capture.wait()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self.condition:
+                self.running = False
+                self.condition.notify_all()
+            self.wake()
+
+    def push(self, slot):
+        """Queue a new frame for the consumer, dropping the oldest one if the buffer is full."""
+        with self.condition:
+            if len(self.queue) >= self.buffer:
+                self.ring.release(self.queue.popleft())
+                self.dropped += 1
+            self.queue.append(slot)
+            self.frames += 1
+            self.condition.notify()
+        self.wake()
+
+    def wake(self):
+        """Wake an async consumer waiting on its event loop."""
+        waiter = self.waiter
+        if waiter is not None:
+            loop, event = waiter
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Its loop is closed
+
+    def take(self):
+        """The next queued frame, or None when there is none right now."""
+        with self.condition:
+            self.release_held()
+            if not self.queue:
+                return None
+            self.held = self.queue.popleft()
+        return StreamFrame(self.held)
+
+    def release_held(self):
+        if self.held is not None:
+            self.ring.release(self.held)
+            self.held = None
+
+    def finished(self):
+        """Whether the capture stopped and every frame was handed out, raising IOError if the device failed."""
+        if self.running or self.queue:
+            return False
+        if self.error is not None:
+            raise IOError(f"Error reading from device: {self.error}") from self.error
+        return True
+
+    def get(self, timeout=None):
+        """Wait for the next frame, None after ``timeout`` seconds or once the stream has ended."""
+        if self.thread is None:
+            self.open()
+        with self.condition:
+            self.condition.wait_for(lambda: self.queue or not self.running, timeout)
+        return self.take()
+
+    async def get_async(self):
+        """Wait for the next frame without blocking the event loop, None once the stream has ended."""
+        loop = asyncio.get_running_loop()
+        if self.thread is None:
+            await loop.run_in_executor(None, self.open)
+        while True:
+            with self.condition:
+                if self.waiter is None or self.waiter[0] is not loop:
+                    self.waiter = (loop, asyncio.Event())
+                event = self.waiter[1]
+                # Cleared under the lock, so a frame pushed from now on sets it again
+                event.clear()
+            frame = self.take()
+            if frame is not None or self.finished():
+                return frame
+            await event.wait()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            # Wake up now and then, so Ctrl+C gets through on every platform
+            frame = self.get(timeout=0.5)
+            if frame is not None:
+                return frame
+            if self.finished():
+                raise StopIteration
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self.get_async()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+    def close(self):
+        """Stop the capture, close the device and end every iteration."""
+        self.closed = True
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        with self.condition:
+            self.release_held()
+            while self.queue:
+                self.ring.release(self.queue.popleft())
+        if self.device is not None:
+            self.device.close()
+            self.device = None
+        self.wake()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def __aenter__(self):
+        # Opening the device and joining the reader block, they run on the executor
+        await asyncio.get_running_loop().run_in_executor(None, self.open)
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
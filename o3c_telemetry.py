@@ -0,0 +1,142 @@
+"""Per-stage frame timings with rolling percentiles and CSV/JSON lines export.
+
+Capture stages are timed by ``FrameReader`` from the timestamps it keeps on
+each ``FrameSlot``, display stages by the viewer around its own calls. All
+timestamps are ``time.perf_counter`` seconds, stage durations are exported
+in milliseconds. Nothing here runs unless a viewer is created with
+telemetry enabled, the disabled path is a single ``is None`` check.
+"""
+import csv
+import json
+import threading
+
+import numpy as np
+
+# write: first to last request of the frame written
+# first_response: first request written to first response read (device latency)
+# last_response: first to last response read (transfer)
+# decode: time spent decoding the frame's responses and publishing it
+CAPTURE_STAGES = ('write', 'first_response', 'last_response', 'decode')
+# queue: frame published to picked up by the display
+# convert: CPU color conversion (0 with packed uploads)
+# upload: texture upload
+# swap: drawing and swapping buffers
+# latency: first request written to frame on screen
+DISPLAY_STAGES = ('queue', 'convert', 'upload', 'swap', 'latency')
+STAGES = CAPTURE_STAGES + DISPLAY_STAGES
+
+EXPORT_COLUMNS = ('event', 'sequence', 'timestamp', 'missing_chunks') + STAGES
+
+
+class RollingHistogram:
+    """The last ``size`` samples of one stage, in seconds."""
+
+    def __init__(self, size=1024):
+        self.samples = np.zeros(size, dtype=np.float64)
+        self.count = 0
+
+    def add(self, value):
+        self.samples[self.count % len(self.samples)] = value
+        self.count += 1
+
+    def percentiles(self, qs=(50, 95, 99)):
+        """Percentiles of the samples kept, NaN until there is one."""
+        if not self.count:
+            return [float("nan")] * len(qs)
+        return list(np.percentile(self.samples[:min(self.count, len(self.samples))], qs))
+
+
+class Telemetry:
+    """Stage timings of captured and displayed frames.
+
+    ``export`` is a path ending in ``.csv`` or ``.jsonl`` that gets one row
+    per captured and per displayed frame.
+    """
+
+    def __init__(self, history=1024, export=None):
+        self.histograms = {stage: RollingHistogram(history) for stage in STAGES}
+        self.frames = 0
+        self.partial_frames = 0
+        self.lost_frames = 0
+        self.timeouts = 0  # Chunks that never arrived
+        self.displayed = 0
+        self.skipped = 0  # Frames taken but not drawn, identical to the one on screen
+
+        self.lock = threading.Lock()  # Rows come from both the reader and the display thread
+        self.export_file = None
+        self.writer = None
+        if export:
+            self.export_file = open(export, "w", newline="")
+            if export.endswith(".csv"):
+                self.writer = csv.DictWriter(self.export_file, fieldnames=EXPORT_COLUMNS)
+                self.writer.writeheader()
+
+    def record_capture(self, slot, missing):
+        """Record a frame the reader published, ``slot`` is None when nothing of it arrived."""
+        self.frames += 1
+        self.timeouts += missing
+        if slot is None:
+            self.lost_frames += 1
+            return
+        if missing:
+            self.partial_frames += 1
+
+        stages = {
+            'write': slot.written - slot.requested,
+            'first_response': slot.first_response - slot.requested,
+            'last_response': slot.last_response - slot.first_response,
+            'decode': slot.decode_time,
+        }
+        for stage, value in stages.items():
+            self.histograms[stage].add(value)
+        self.export('capture', slot.sequence, slot.timestamp, stages, missing_chunks=missing)
+
+    def record_display(self, sequence, requested, published, picked, converted=None, uploaded=None, swapped=None):
+        """Record a frame the viewer took, from the timestamps of its stages.
+
+        Without ``swapped`` the frame was skipped, identical to the one on
+        screen: only its time in the queue counts, the drawing stages and the
+        latency only ever hold frames that were drawn.
+        """
+        stages = {'queue': picked - published}
+        if swapped is None:
+            self.skipped += 1
+        else:
+            self.displayed += 1
+            stages.update(convert=converted - picked, upload=uploaded - converted, swap=swapped - uploaded,
+                          latency=swapped - requested)
+        for stage, value in stages.items():
+            self.histograms[stage].add(value)
+        self.export('display' if swapped is not None else 'skipped', sequence, picked if swapped is None else swapped,
+                    stages)
+
+    def export(self, event, sequence, timestamp, stages, **extra):
+        if self.export_file is None:
+            return
+        row = {'event': event, 'sequence': sequence, 'timestamp': round(timestamp, 6), **extra}
+        row.update((stage, round(value * 1000, 4)) for stage, value in stages.items())
+        with self.lock:
+            if self.writer is not None:
+                self.writer.writerow(row)
+            else:
+                self.export_file.write(json.dumps(row) + "\n")
+
+    def percentiles(self, stage):
+        """p50, p95 and p99 of a stage, in milliseconds."""
+        return [value * 1000 for value in self.histograms[stage].percentiles()]
+
+    def summary(self):
+        """Multi-line text of every stage's percentiles and the frame counters."""
+        lines = [f"{'stage':<15}{'p50':>8}{'p95':>8}{'p99':>8}  ms"]
+        for stage in STAGES:
+            if self.histograms[stage].count:
+                lines.append(f"{stage:<15}" + "".join(f"{value:8.2f}" for value in self.percentiles(stage)))
+        lines.append(f"frames {self.frames}, partial {self.partial_frames}, lost {self.lost_frames}, "
+                     f"timeouts {self.timeouts}, displayed {self.displayed}, skipped {self.skipped}")
+        return "\n".join(lines)
+
+    def close(self):
+        with self.lock:
+            if self.export_file is not None:
+                self.export_file.close()
+                self.export_file = None
@@ -0,0 +1,257 @@
+"""Tuning the transfer to a connected O3C, and the profiles the viewers start with.
+
+    python o3c_tuning.py              # Tune the connected O3C and save its profile
+    python o3c_tuning.py --blocking   # The same for viewers using blocking reads
+
+The request geometry used to be fixed: 0x3F4 bytes per chunk, a pipeline
+window picked by hand and 50 ms to wait for each chunk. ``calibrate`` asks
+the device how much data one response carries, then sweeps the pipeline
+window (in whole frames of requests, however many chunks a frame takes),
+the chunk size and the chunk timeout one after the other, measuring
+the sustained frame rate and the share of chunks that never arrived. The
+best settings are saved per VID/PID/firmware release in ``PROFILE_PATH``,
+and the viewers take them with ``find_profile`` and ``TransferProfile.apply_to``
+when they open the device. The timeout only applies to the read mode,
+polled or blocking, it was tuned with.
+The report size and the response length cap are set by the firmware's
+report descriptor, so they are probed rather than swept.
+"""
+import argparse
+import json
+import os
+import time
+
+from o3c_capture import FrameReader, FrameRing, device_infos, import_hid, open_device
+from o3c_protocol import CHUNK_SIZE, MAX_RESPONSE_LENGTH, REPORT_SIZE, build_request, get_request_plan
+
+PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".o3c_profiles.json")
+
+# Swept values, the most conservative first: it wins whenever the others are not clearly faster
+WINDOW_FRAMES = (0, 1, 2, 4)  # Frames of requests in flight, below one a window only slows down
+TIMEOUTS = (0.05, 0.02, 0.01, 0.005)  # Seconds to wait for a chunk
+MAX_ERROR_RATE = 0.01    # Share of chunks a usable setting may lose
+CLEARLY_FASTER = 1.05    # How much faster a riskier setting must be to win, trials vary by a few percent
+
+
+def profile_key(info):
+    """Identity of a device in the profile file, VID:PID:firmware release from its ``hid.enumerate`` entry."""
+    return f"{info['vendor_id']:04x}:{info['product_id']:04x}:{info.get('release_number', 0):04x}"
+
+
+class TransferProfile:
+    """Transfer settings for one kind of device, as found by ``calibrate``."""
+
+    def __init__(self, chunk_size=CHUNK_SIZE, window=0, timeout=0.05, blocking=False, fps=0.0, error_rate=0.0,
+                 tuned=None):
+        self.chunk_size = chunk_size  # Bytes of screen data per request
+        self.window = window          # Chunk requests kept in flight, 0 reads frames in lockstep
+        self.timeout = timeout        # Seconds to wait for a chunk
+        self.blocking = blocking      # Reader mode it was tuned with
+        self.fps = fps                # Measured with these settings
+        self.error_rate = error_rate
+        self.tuned = tuned            # When, as an ISO 8601 string
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**{name: values[name] for name in ('chunk_size', 'window', 'timeout', 'blocking', 'fps',
+                                                       'error_rate', 'tuned') if name in values})
+
+    def to_dict(self):
+        return dict(chunk_size=self.chunk_size, window=self.window, timeout=self.timeout, blocking=self.blocking,
+                    fps=round(self.fps, 1), error_rate=round(self.error_rate, 5), tuned=self.tuned)
+
+    def settings(self, chunk_size=None, window=None, blocking=False):
+        """Chunk size, window and timeout to read with, the given ones winning, the timeout None unless tuned for ``blocking``."""
+        return (self.chunk_size if chunk_size is None else chunk_size,
+                self.window if window is None else window,
+                self.timeout if blocking == self.blocking else None)
+
+    def apply_to(self, listener):
+        """Give a viewer's ``HIDListener`` these settings, where it was given none."""
+        listener.chunk_size, listener.pipeline_window, timeout = self.settings(
+            listener.chunk_size, listener.pipeline_window, listener.blocking_reads)
+        if timeout is not None:
+            listener.read_timeout = timeout
+
+    def describe(self):
+        return (f"chunk {self.chunk_size} bytes, window {self.window}, timeout {self.timeout * 1000:g} ms "
+                f"({self.fps:.0f} fps, {self.error_rate:.2%} chunks lost)")
+
+
+def read_profiles(path=PROFILE_PATH):
+    """Every saved profile by device key, empty when there is no profile file."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_profile(key, path=PROFILE_PATH):
+    """The saved ``TransferProfile`` of the device ``key``, or None."""
+    try:
+        values = read_profiles(path).get(key)
+        return TransferProfile.from_dict(values) if values else None
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Ignoring the transfer profiles in {path}: {e}")
+        return None
+
+
+def find_profile(info, path=PROFILE_PATH, blocking=False):
+    """The saved profile of the device of this ``hid.enumerate`` entry, told about, or None."""
+    key = profile_key(info)
+    profile = load_profile(key, path)
+    if profile is not None:
+        text = f"Using the transfer profile of {key}: {profile.describe()}"
+        if profile.blocking != blocking:
+            text += f", but not its timeout: it was tuned for {'blocking' if profile.blocking else 'polled'} reads"
+        print(text)
+    return profile
+
+
+def save_profile(key, profile, path=PROFILE_PATH):
+    """Store ``profile`` for the device ``key``, keeping the profiles of other devices."""
+    try:
+        profiles = read_profiles(path)
+    except (OSError, ValueError):
+        profiles = {}  # Unreadable, start over rather than fail after a whole calibration
+    profiles[key] = profile.to_dict()
+    # Written next to the old file and swapped in, a viewer starting meanwhile never reads half of it
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def drain(device, quiet=0.05):
+    """Read and drop responses until none arrived for ``quiet`` seconds."""
+    end = time.perf_counter() + quiet
+    while time.perf_counter() < end:
+        if device.read(REPORT_SIZE, max(1, int(quiet * 1000))):
+            end = time.perf_counter() + quiet
+
+
+def probe_payload(device, attempts=3, timeout=0.5):
+    """Bytes of screen data the device sends in one response, asked with a request at offset 0."""
+    for _ in range(attempts):
+        device.write(build_request(0))
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            response = device.read(REPORT_SIZE, max(1, int((deadline - time.perf_counter()) * 1000)))
+            if response and (response[8] | response[9] | response[10] | response[11]) == 0:
+                drain(device)
+                return min(response[4] | (response[5] << 8), MAX_RESPONSE_LENGTH) - 8
+    raise IOError("The device did not answer the screen read request")
+
+
+def chunk_sizes(payload, frame_bytes):
+    """Chunk sizes worth trying for a device sending ``payload`` bytes per response, largest first.
+
+    Larger chunks than the payload would leave holes in every frame. Sizes
+    are even, a chunk never splits a pixel.
+    """
+    largest = min(payload, MAX_RESPONSE_LENGTH - 8) & ~1
+    chunks = -(-frame_bytes // largest)
+    balanced = (-(-frame_bytes // chunks) + 1) & ~1  # Same number of chunks, the last one not a sliver
+    return sorted({largest, balanced, (largest // 2) & ~1}, reverse=True)
+
+
+def measure(device, width, height, chunk_size, window, timeout, blocking, duration):
+    """Read frames with one setting for ``duration`` seconds, returning a ``TransferProfile`` with what it did."""
+    plan = get_request_plan(width, height, chunk_size)
+    ring = FrameRing(plan, FrameReader.ring_slots(plan, window, consumers=0))
+    reader = FrameReader(device, ring, window=window, timeout=timeout, blocking=blocking)
+    try:
+        # The first frames fill the window, they are not counted
+        for _ in range(2):
+            reader.read_frame()
+        frames, partial, lost = reader.frames, reader.partial_frames, reader.timeouts
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            reader.read_frame()
+        elapsed = time.perf_counter() - start
+    finally:
+        # Responses to requests still in flight must not reach the next setting's reader
+        drain(device, max(timeout, 0.05))
+    frames = reader.frames - frames
+    complete = frames - (reader.partial_frames - partial)
+    error_rate = (reader.timeouts - lost) / (frames * len(plan)) if frames else 1.0
+    return TransferProfile(chunk_size, window, timeout, blocking, complete / elapsed, error_rate)
+
+
+def best(trials, max_error_rate=MAX_ERROR_RATE):
+    """The fastest trial that loses few enough chunks, preferring earlier ones unless a later one is clearly faster."""
+    usable = [trial for trial in trials if trial.error_rate <= max_error_rate]
+    if not usable:
+        lowest = min(trial.error_rate for trial in trials)
+        usable = [trial for trial in trials if trial.error_rate == lowest]
+    fastest = max(trial.fps for trial in usable)
+    return next(trial for trial in usable if trial.fps * CLEARLY_FASTER >= fastest)
+
+
+def calibrate(device, width=160, height=80, blocking=False, duration=1.0, window_frames=WINDOW_FRAMES,
+              timeouts=TIMEOUTS, max_error_rate=MAX_ERROR_RATE, report=print):
+    """Find the fastest reliable chunk size, window and timeout for an open ``device``.
+
+    Sweeps the window first, then the chunk size with the best window, then
+    the timeout with both, measuring every setting once. Windows are tried
+    as ``window_frames`` frames of requests, so they stay whole frames
+    whatever the geometry and chunk size. Every trial is passed to
+    ``report`` as it ends. Returns the best ``TransferProfile``.
+    """
+    payload = probe_payload(device)
+    report(f"The device sends {payload} bytes per response")
+    trials = {}  # (chunk size, window, timeout) -> TransferProfile
+
+    def sweep(settings):
+        results = []
+        for setting in settings:
+            if setting not in trials:
+                trials[setting] = trial = measure(device, width, height, *setting, blocking, duration)
+                chunk_size, window, timeout = setting
+                report(f"  chunk {chunk_size:4d}, window {window:2d}, timeout {timeout * 1000:4g} ms: "
+                       f"{trial.fps:7.1f} fps, {trial.error_rate:.2%} chunks lost")
+            results.append(trials[setting])
+        return best(results, max_error_rate)
+
+    def chunks(chunk_size):
+        return len(get_request_plan(width, height, chunk_size))
+
+    chunk_size = min(CHUNK_SIZE, payload) & ~1
+    chosen = sweep((chunk_size, frames * chunks(chunk_size), TIMEOUTS[0]) for frames in window_frames)
+    frames = chosen.window // chunks(chosen.chunk_size)
+    chosen = sweep((size, frames * chunks(size), chosen.timeout) for size in chunk_sizes(payload, width * height * 2))
+    chosen = sweep((chosen.chunk_size, chosen.window, timeout) for timeout in timeouts)
+    chosen.tuned = time.strftime("%Y-%m-%dT%H:%M:%S")
+    return chosen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds per setting (default: 1)")
+    parser.add_argument("--blocking", action="store_true", help="tune for blocking reads")
+    parser.add_argument("--profile", default=PROFILE_PATH, help=f"profile file (default: {PROFILE_PATH})")
+    parser.add_argument("--dry-run", action="store_true", help="only show the best settings, save nothing")
+    args = parser.parse_args()
+
+    hid = import_hid()
+    try:
+        info = device_infos(hid, 0x8089, 0x0009, 0xFF12)[0]
+        device = open_device(hid, 0x8089, 0x0009, 0xFF12, args.blocking, info['path'])
+    except Exception as e:
+        raise SystemExit(f"Failed to open device: {e}")
+    key = profile_key(info)
+    print(f"Tuning {info.get('manufacturer_string')} {info.get('product_string')} ({key})")
+    try:
+        profile = calibrate(device, blocking=args.blocking, duration=args.duration)
+    except OSError as e:
+        raise SystemExit(f"Failed to tune the device: {e}")
+    finally:
+        device.close()
+    print(f"Best: {profile.describe()}")
+    if not args.dry_run:
+        save_profile(key, profile, args.profile)
+        print(f"Saved to {args.profile}, the viewers use it from their next start")
+
+
+if __name__ == "__main__":
+    main()